@@ -1,10 +1,25 @@
 # analytics.py
-from datetime import datetime
+import time
+from datetime import date, datetime
+from typing import Iterator
 
 import pandas as pd
+from psycopg import sql
 
+from lobster_assessment.config import Config
 from lobster_assessment.db import SessionLocal, get_engine
 from lobster_assessment.db_models import Block, UniswapV3Swap
+from lobster_assessment.domain.models import SwapArrays
+from lobster_assessment.instrumentation import instrumented_query, phase
+from lobster_assessment.pgcopy import (
+    SWAP_COPY_COLUMNS,
+    BinaryCopyParser,
+    swap_arrays_from_columns,
+)
+from lobster_assessment.swap_cache import SwapRangeCache
+
+TABLE_SWAPS = f"uniswap_v3_swap_{Config.CHAIN_ID}"
+TABLE_BLOCKS = f"blocks_{Config.CHAIN_ID}"
 
 
 def run_uniswap_query(
@@ -13,14 +28,27 @@ def run_uniswap_query(
     end_date: str,
     rows_to_fetch: int = 100,
     total_rows: int = 0,
+    cache: SwapRangeCache | None = None,
 ):
-    table_swaps = "uniswap_v3_swap_42161"
-    table_blocks = "blocks_42161"
+    """
+    One page of a pool's swaps between two dates, newest first. With a
+    `cache` (see `make_swap_cache`), the page is cut from cached block
+    ranges and only blocks not seen before are queried.
+    """
+    if cache is not None:
+        with instrumented_query(
+            "run_uniswap_query", pool_address, start_date, end_date
+        ) as record:
+            df = fetch_swaps_cached(cache, pool_address, start_date, end_date)
+            df = df.iloc[::-1].iloc[total_rows : total_rows + rows_to_fetch]
+            record.rows = len(df)
+        print(df.head())
+        return df
 
     query = f"""
         SELECT s.*, b.block_date AS timestamp
-        FROM public.{table_swaps} s
-        JOIN public.{table_blocks} b ON s.block_number = b.block_number
+        FROM public.{TABLE_SWAPS} s
+        JOIN public.{TABLE_BLOCKS} b ON s.block_number = b.block_number
         WHERE LOWER(s.pool_address) = LOWER(%s)
         AND b.block_date BETWEEN %s AND %s
         ORDER BY b.block_date DESC
@@ -29,15 +57,31 @@ def run_uniswap_query(
 
     engine = get_engine()
 
-    with engine.connect() as connection:
-        df = pd.read_sql_query(
-            sql=query, con=connection, params=(pool_address, start_date, end_date)
-        )
+    with instrumented_query(
+        "run_uniswap_query", pool_address, start_date, end_date
+    ) as record:
+        with engine.connect() as connection:
+            with phase("decode"):
+                df = pd.read_sql_query(
+                    sql=query,
+                    con=connection,
+                    params=(pool_address, start_date, end_date),
+                )
+        record.rows = len(df)
+        record.bytes = int(df.memory_usage(deep=True).sum())
     print(df.head())
     return df
 
 
-def run_orm_query(pool: str, start: str, end: str):
+def run_orm_query(pool: str, start: str, end: str, cache: SwapRangeCache | None = None):
+    if cache is not None:
+        with instrumented_query("run_orm_query", pool, start, end) as record:
+            df = fetch_swaps_cached(cache, pool, start, end).iloc[::-1].head(100)
+            record.rows = len(df)
+        for row in df.itertuples():
+            print(row.tx_hash, row.timestamp)
+        return
+
     session = SessionLocal()
     try:
         start_dt = datetime.strptime(start, "%Y-%m-%d")
@@ -51,8 +95,161 @@ def run_orm_query(pool: str, start: str, end: str):
             .order_by(Block.block_date.desc())
             .limit(100)
         )
-        results = query.all()
+        with instrumented_query("run_orm_query", pool, start, end) as record:
+            with phase("model"):
+                results = query.all()
+            record.rows = len(results)
         for swap, timestamp in results:
             print(swap.tx_hash, timestamp)
     finally:
         session.close()
+
+
+# Block ranges of date ranges that ended before today: blocks are only appended
+# for the current day, so these never change and a full cache hit needs no query.
+_settled_block_ranges: dict[tuple[str, str], tuple[int, int] | None] = {}
+
+
+def _is_settled(end_date: str) -> bool:
+    try:
+        return datetime.fromisoformat(end_date).date() < date.today()
+    except ValueError:
+        return False
+
+
+def block_range(start_date: str, end_date: str) -> tuple[int, int] | None:
+    """
+    First and last block dated between the two dates, or None if none are.
+    Ranges ending before today are remembered for the life of the process.
+    """
+    key = (start_date, end_date)
+    if key in _settled_block_ranges:
+        return _settled_block_ranges[key]
+    query = f"""
+        SELECT MIN(block_number), MAX(block_number)
+        FROM public.{TABLE_BLOCKS}
+        WHERE block_date BETWEEN %s AND %s
+    """
+    with get_engine().connect() as connection:
+        first, last = connection.exec_driver_sql(query, (start_date, end_date)).one()
+    blocks = None if first is None else (int(first), int(last))
+    if _is_settled(end_date):
+        _settled_block_ranges[key] = blocks
+    return blocks
+
+
+def fetch_swap_blocks(pool_address: str, start_block: int, end_block: int):
+    """Swap rows of a pool with `start_block <= block_number < end_block`."""
+    query = f"""
+        SELECT s.*, b.block_date AS timestamp
+        FROM public.{TABLE_SWAPS} s
+        JOIN public.{TABLE_BLOCKS} b ON s.block_number = b.block_number
+        WHERE LOWER(s.pool_address) = LOWER(%s)
+        AND s.block_number >= %s AND s.block_number < %s
+        ORDER BY s.block_number, s.event_index
+    """
+    with get_engine().connect() as connection:
+        with phase("decode"):
+            return pd.read_sql_query(
+                sql=query,
+                con=connection,
+                params=(pool_address, start_block, end_block),
+            )
+
+
+def make_swap_cache(max_bytes: int = 256 * 1024 * 1024) -> SwapRangeCache:
+    return SwapRangeCache(fetch_swap_blocks, max_bytes=max_bytes)
+
+
+def fetch_swaps_cached(
+    cache: SwapRangeCache, pool_address: str, start_date: str, end_date: str
+) -> pd.DataFrame:
+    """A pool's swaps between two dates, oldest first, through `cache`."""
+    blocks = block_range(start_date, end_date)
+    if blocks is None:
+        return pd.DataFrame()
+    return cache.get(pool_address, blocks[0], blocks[1] + 1)
+
+
+def build_swap_copy_query(
+    pool_address: str, start_date: str, end_date: str, binary: bool = True
+) -> sql.Composed:
+    """
+    COPY statement streaming a pool's swaps in chronological order.
+
+    The binary form casts every column to a fixed-width type so the stream can
+    be decoded column-wise (see `pgcopy`); the CSV form keeps the stored text
+    values, which preserves exact decimals for archiving.
+    """
+    if binary:
+        columns = sql.SQL(", ").join(
+            sql.SQL("{} AS {}").format(sql.SQL(expression), sql.Identifier(name))
+            for name, expression, _ in SWAP_COPY_COLUMNS
+        )
+        options = sql.SQL("FORMAT BINARY")
+    else:
+        columns = sql.SQL("s.*, b.block_date AS timestamp")
+        options = sql.SQL("FORMAT CSV, HEADER")
+
+    select = sql.SQL(
+        "SELECT {columns} FROM {swaps} s "
+        "JOIN {blocks} b ON s.block_number = b.block_number "
+        "WHERE LOWER(s.pool_address) = LOWER({pool}) "
+        "AND b.block_date BETWEEN {start} AND {end} "
+        "ORDER BY b.block_date, s.block_number, s.event_index"
+    ).format(
+        columns=columns,
+        swaps=sql.Identifier("public", TABLE_SWAPS),
+        blocks=sql.Identifier("public", TABLE_BLOCKS),
+        pool=sql.Literal(pool_address),
+        start=sql.Literal(start_date),
+        end=sql.Literal(end_date),
+    )
+    return sql.SQL("COPY ({select}) TO STDOUT ({options})").format(
+        select=select, options=options
+    )
+
+
+def stream_swap_copy(
+    pool_address: str, start_date: str, end_date: str, binary: bool = True
+) -> Iterator[bytes]:
+    query = build_swap_copy_query(pool_address, start_date, end_date, binary)
+    connection = get_engine().raw_connection()
+    try:
+        with connection.driver_connection.cursor() as cursor:
+            with cursor.copy(query) as copy:
+                for block in copy:
+                    yield block
+    finally:
+        connection.close()
+
+
+def copy_swap_arrays(pool_address: str, start_date: str, end_date: str) -> SwapArrays:
+    """Bulk-load a pool's swaps through binary COPY straight into arrays."""
+    with instrumented_query(
+        "copy_swap_arrays", pool_address, start_date, end_date
+    ) as record:
+        parser = BinaryCopyParser()
+        began = time.perf_counter()
+        for block in stream_swap_copy(pool_address, start_date, end_date):
+            record.bytes += len(block)
+            with phase("decode"):
+                parser.feed(block)
+        with phase("decode"):
+            arrays = swap_arrays_from_columns(parser.finish())
+        # COPY bypasses the cursor hooks: the rest of the loop waited on the server.
+        record.server_seconds += time.perf_counter() - began - record.decode_seconds
+        record.rows = len(arrays)
+    return arrays
+
+
+def copy_swaps_to_file(
+    pool_address: str, start_date: str, end_date: str, path: str, binary: bool = True
+) -> int:
+    """Write the raw COPY stream to `path` and return the number of bytes written."""
+    written = 0
+    with open(path, "wb") as f:
+        for block in stream_swap_copy(pool_address, start_date, end_date, binary):
+            f.write(block)
+            written += len(block)
+    return written
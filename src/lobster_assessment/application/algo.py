@@ -4,6 +4,7 @@ from decimal import Decimal
 from pydantic import BaseModel
 
 from lobster_assessment.domain.models import Position, Swap, SwapSeries
+from lobster_assessment.domain.validation import construct
 
 
 class ActivityTimeseries(BaseModel):
@@ -18,7 +19,8 @@ class ActivityTracker(BaseModel):
         return self.position.tick_lower <= tick <= self.position.tick_upper
 
     def track(self, swap_series: SwapSeries) -> ActivityTimeseries:
-        return ActivityTimeseries(
+        return construct(
+            ActivityTimeseries,
             timestamps=swap_series.timestamps,
             activity=[self.is_active(s.tick) for s in swap_series.swaps],
         )
@@ -47,7 +49,8 @@ class FeeCalculator(BaseModel):
         )
 
     def track(self, swap_series: SwapSeries) -> FeeTimeseries:
-        return FeeTimeseries(
+        return construct(
+            FeeTimeseries,
             timestamps=swap_series.timestamps,
             fees=[self.compute_fee_for_swap(s) for s in swap_series.swaps],
         )
@@ -0,0 +1,239 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+from lobster_assessment.application.rebalancing import RebalancingStrategy
+from lobster_assessment.domain.models import Position, Swap
+
+CACHE_VERSION = 6
+
+
+class SwapDataFingerprint(BaseModel):
+    pool: str
+    first_timestamp: datetime | None
+    last_timestamp: datetime | None
+    rows: int
+    checksum: str
+
+
+def fingerprint_swaps(pool_address: str, swaps: list[Swap]) -> SwapDataFingerprint:
+    digest = hashlib.sha256()
+    for s in swaps:
+        digest.update(
+            f"{s.tick},{s.volume_token0},{s.volume_token1},{s.liquidity},"
+            f"{s.sqrt_price_x96},{s.timestamp.isoformat()}\n".encode()
+        )
+    return SwapDataFingerprint(
+        pool=pool_address.lower(),
+        first_timestamp=swaps[0].timestamp if swaps else None,
+        last_timestamp=swaps[-1].timestamp if swaps else None,
+        rows=len(swaps),
+        checksum=digest.hexdigest(),
+    )
+
+
+def _component(component: BaseModel | None, exclude: tuple = ()) -> dict | None:
+    """
+    Type and fields of `component`, with nested models serialized the same
+    way: a field declared as a base class (e.g. the sub-strategies of a
+    MultiConditionRebalancer) would otherwise dump only the base's fields.
+    """
+    if component is None:
+        return None
+    cls = type(component)
+    return {
+        "type": f"{cls.__module__}.{cls.__qualname__}",
+        "config": {
+            name: _field(getattr(component, name))
+            for name in cls.model_fields
+            if name not in exclude
+        },
+    }
+
+
+def _field(value):
+    if isinstance(value, BaseModel):
+        return _component(value)
+    if isinstance(value, (list, tuple)):
+        return [_field(v) for v in value]
+    return to_jsonable_python(value)
+
+
+def canonical_config(
+    position: Position,
+    rebalancer: RebalancingStrategy | None,
+    rebalance_bias: float,
+    created_at: datetime | None,
+    tracker: BaseModel | None = None,
+    calculator: BaseModel | None = None,
+) -> dict:
+    return {
+        "version": CACHE_VERSION,
+        "position": position.model_dump(mode="json"),
+        "rebalancer": _component(rebalancer),
+        "rebalance_bias": rebalance_bias,
+        "created_at": created_at.isoformat() if created_at else None,
+        # Simulations rebind these to their own copy of the position, so the
+        # position they were built with does not affect the result.
+        "tracker": _component(tracker, exclude=("position",)),
+        "calculator": _component(calculator, exclude=("position",)),
+    }
+
+
+def backtest_cache_key(config: dict, data: SwapDataFingerprint) -> str:
+    payload = json.dumps(
+        {"config": config, "data": data.model_dump(mode="json")},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent, content-addressed store of serialized backtest results.
+
+    Entries live in a SQLite file and are mirrored in a small in-process LRU so
+    repeated hits skip disk entirely. Entries older than `max_age` are dropped,
+    and the least recently used ones are evicted once payloads exceed
+    `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int | None = 256 * 1024 * 1024,
+        max_age: timedelta | None = None,
+        memory_entries: int = 4096,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.memory_entries = memory_entries
+
+        self._memory: OrderedDict[str, tuple[float, BaseModel]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_memory"] = OrderedDict()
+        state["_lock"] = None
+        state["_connection"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self, key: str, model: type[BaseModel]) -> BaseModel | None:
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            db = self._db()
+            if cached is not None and not self._expired(cached[0], now):
+                self._memory.move_to_end(key)
+                db.execute(
+                    "UPDATE results SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                return cached[1].model_copy()
+
+            row = db.execute(
+                "SELECT payload, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            payload, created_at = row
+            if self._expired(created_at, now):
+                db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._memory.pop(key, None)
+                return None
+
+            db.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            result = model.model_validate_json(payload)
+            self._remember(key, created_at, result)
+            return result.model_copy()
+
+    def put(self, key: str, result: BaseModel) -> None:
+        payload = result.model_dump_json()
+        now = time.time()
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO results "
+                "(key, payload, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now),
+            )
+            self._remember(key, now, result.model_copy())
+            self._evict(now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db().execute("DELETE FROM results")
+            self._memory.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS results_accessed_at "
+                "ON results (accessed_at)"
+            )
+        return self._connection
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.max_age is not None and now - created_at >= (
+            self.max_age.total_seconds()
+        )
+
+    def _remember(self, key: str, created_at: float, result: BaseModel) -> None:
+        self._memory[key] = (created_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float) -> None:
+        db = self._db()
+        if self.max_age is not None:
+            db.execute(
+                "DELETE FROM results WHERE created_at <= ?",
+                (now - self.max_age.total_seconds(),),
+            )
+        if self.max_bytes is not None:
+            (total,) = db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+            if total > self.max_bytes:
+                rows = db.execute(
+                    "SELECT key, size FROM results ORDER BY accessed_at ASC, rowid ASC"
+                ).fetchall()
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._memory.pop(key, None)
+                    total -= size
+        if self.max_age is not None:
+            cutoff = now - self.max_age.total_seconds()
+            for key in [k for k, (c, _) in self._memory.items() if c <= cutoff]:
+                del self._memory[key]
@@ -1,6 +1,8 @@
 from datetime import datetime
 from decimal import Decimal
+from typing import Iterable
 
+import numpy as np
 from pydantic import BaseModel
 
 from lobster_assessment.application.algo import (
@@ -10,19 +12,42 @@ from lobster_assessment.application.algo import (
     FeeCalculator,
     FeeTimeseries,
 )
+from lobster_assessment.application.cache import (
+    ResultCache,
+    SwapDataFingerprint,
+    backtest_cache_key,
+    canonical_config,
+    fingerprint_swaps,
+)
+from lobster_assessment.application.executors import (
+    ExecutorKind,
+    ProgressCallback,
+    TaskFailure,
+    map_in_order,
+)
 from lobster_assessment.application.math import compute_usd_apr
-from lobster_assessment.application.rebalancing import RebalancingStrategy
+from lobster_assessment.application.rebalancing import (
+    RebalancingStrategy,
+    next_tick_range,
+)
+from lobster_assessment.application.valuation import (
+    ValueTimeseries,
+    compute_value_timeseries,
+)
 from lobster_assessment.domain.models import (
     Position,
     Swap,
     SwapSeries,
 )
+from lobster_assessment.domain.validation import construct
 
 
 class BacktestResult(BaseModel):
     total_fees_token0: Decimal
     total_fees_token1: Decimal
     apr: Decimal
+    impermanent_loss: Decimal | None = None
+    max_drawdown: Decimal | None = None
 
 
 class MultiPositionBacktestRunner:
@@ -34,6 +59,7 @@ class MultiPositionBacktestRunner:
         calculators: list[FeeCalculator],
         rebalancers: list[RebalancingStrategy],
         rebalance_bias: float,
+        cache: ResultCache | None = None,
     ):
         if len(positions) != len(swap_series_list):
             raise ValueError("Each position must have a corresponding swap series.")
@@ -53,11 +79,36 @@ class MultiPositionBacktestRunner:
                     calculator=calculator,
                     rebalancer=rebalancer,
                     rebalance_bias=rebalance_bias,
+                    cache=cache,
                 )
             )
 
-    def run(self) -> list[BacktestResult]:
-        return [runner.run() for runner in self.runners]
+    def run(
+        self,
+        executor: ExecutorKind = ExecutorKind.SERIAL,
+        max_workers: int | None = None,
+        chunksize: int | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> list[BacktestResult | TaskFailure]:
+        """
+        Run every position, in order, on the chosen executor.
+
+        A runner that raises yields a TaskFailure in its slot instead of
+        aborting the batch. With a process pool the runners are simulated in
+        worker copies, so their per-run series are not populated here.
+        """
+        return map_in_order(
+            _run_backtest,
+            self.runners,
+            kind=executor,
+            max_workers=max_workers,
+            chunksize=chunksize,
+            progress=progress,
+        )
+
+
+def _run_backtest(runner: "BacktestRunner") -> BacktestResult:
+    return runner.run()
 
 
 class BacktestRunner:
@@ -70,80 +121,236 @@ class BacktestRunner:
         rebalance_bias: float,
         created_at: datetime | None = None,
         rebalancer: RebalancingStrategy | None = None,
+        cache: ResultCache | None = None,
     ):
         self.position = position
         self.tracker = tracker
         self.calculator = calculator
         self.rebalancer = rebalancer
         self.rebalance_bias = rebalance_bias
-        self.swap_series = SwapSeries(swaps=swaps)
+        self.swap_series = construct(SwapSeries, swaps=swaps)
         self.created_at = created_at or self.swap_series.timestamps[0]
+        self.cache = cache
+        self._fingerprint: SwapDataFingerprint | None = None
 
         # Internal tracking
         self.total_fees = Fee(token0=Decimal("0"), token1=Decimal("0"))
         self.activity_series: ActivityTimeseries
         self.fee_series: FeeTimeseries
+        self.value_series: ValueTimeseries
+        self.final_position: Position
+
+    def cache_key(self) -> str:
+        config = canonical_config(
+            position=self.position,
+            rebalancer=self.rebalancer,
+            rebalance_bias=self.rebalance_bias,
+            created_at=self.created_at,
+            tracker=self.tracker,
+            calculator=self.calculator,
+        )
+        pool = self.position.pool.address.lower()
+        if self._fingerprint is None or self._fingerprint.pool != pool:
+            # Hashing every swap is O(n); the series is fixed for the runner.
+            self._fingerprint = fingerprint_swaps(pool, self.swap_series.swaps)
+        return backtest_cache_key(config, self._fingerprint)
 
     def run(self) -> BacktestResult:
-        activities: list[bool] = []
-        fees: list[Fee] = []
+        """
+        Simulate the position over the swap series.
 
-        initial_token0, initial_token1 = self.position.amount0, self.position.amount1
+        When a cache is configured, a hit returns the stored result without
+        simulating; `activity_series` and `fee_series` are then left unset.
+        """
+        cache_key = self.cache_key() if self.cache is not None else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key, BacktestResult)
+            if cached is not None:
+                return cached
 
-        for swap in self.swap_series.swaps:
-            if self.rebalancer and self.rebalancer.should_rebalance(
+        result = self._simulate()
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return result
+
+    def _simulate(self) -> BacktestResult:
+        simulation = BacktestSimulation(
+            position=self.position,
+            tracker=self.tracker,
+            calculator=self.calculator,
+            rebalance_bias=self.rebalance_bias,
+            created_at=self.created_at,
+            rebalancer=self.rebalancer,
+        )
+        simulation.process(self.swap_series.swaps)
+        result = simulation.finish()
+
+        self.total_fees = simulation.total_fees
+        self.final_position = simulation.position
+        self.activity_series = simulation.activity_series
+        self.fee_series = simulation.fee_series
+        self.value_series = simulation.value_series
+        return result
+
+
+class BacktestSimulation:
+    """
+    Step-wise backtest state: swaps are fed in order, in any number of
+    `process` calls, and `finish` computes the result once the last one is in.
+
+    `created_at` defaults to the timestamp of the first swap processed. The
+    simulation works on its own copy of the position, bound to copies of the
+    tracker and calculator, and keeps the rebalancer's run state apart from
+    its configuration, so none of the given objects are mutated.
+    """
+
+    def __init__(
+        self,
+        position: Position,
+        tracker: ActivityTracker,
+        calculator: FeeCalculator,
+        rebalance_bias: float,
+        created_at: datetime | None = None,
+        rebalancer: RebalancingStrategy | None = None,
+    ):
+        self.position = position.model_copy()
+        self.tracker = tracker.model_copy(update={"position": self.position})
+        self.calculator = calculator.model_copy(update={"position": self.position})
+        self.rebalancer = rebalancer
+        self.rebalancer_state = rebalancer.initial_state() if rebalancer else None
+        self.rebalance_bias = rebalance_bias
+        self.created_at = created_at
+
+        self.initial_token0 = position.amount0
+        self.initial_token1 = position.amount1
+        self.total_fees = Fee(token0=Decimal("0"), token1=Decimal("0"))
+        self.timestamps: list[datetime] = []
+        self.ticks: list[int] = []
+        self.activities: list[bool] = []
+        self.fees: list[Fee] = []
+        self.lowers: list[int] = []
+        self.uppers: list[int] = []
+        self.first_swap: Swap | None = None
+        self.last_swap: Swap | None = None
+
+        self.activity_series: ActivityTimeseries
+        self.fee_series: FeeTimeseries
+        self.value_series: ValueTimeseries
+
+    def process(self, swaps: Iterable[Swap]) -> None:
+        for swap in swaps:
+            is_active, fee = self.step(swap)
+            self.timestamps.append(swap.timestamp)
+            self.ticks.append(swap.tick)
+            self.lowers.append(self.position.tick_lower)
+            self.uppers.append(self.position.tick_upper)
+            self.activities.append(is_active)
+            self.fees.append(fee)
+
+    def step(self, swap: Swap) -> tuple[bool, Fee]:
+        """
+        Apply one swap to the position and fee totals without recording it,
+        returning whether the position was active and the swap's fee.
+        """
+        if self.first_swap is None:
+            self.first_swap = swap
+            if self.created_at is None:
+                self.created_at = swap.timestamp
+        self.last_swap = swap
+
+        if self.rebalancer is not None:
+            new_lower, new_upper = next_tick_range(
+                self.rebalancer,
+                self.rebalancer_state,
                 tick=swap.tick,
                 timestamp=swap.timestamp,
                 tick_lower=self.position.tick_lower,
                 tick_upper=self.position.tick_upper,
                 created_at=self.created_at,
-            ):
-                new_lower, new_upper = self.rebalancer.rebalance(
-                    tick=swap.tick,
-                    tick_lower=self.position.tick_lower,
-                    tick_upper=self.position.tick_upper,
-                    bias=self.rebalance_bias,
-                )
-                self.position.tick_lower = new_lower
-                self.position.tick_upper = new_upper
+                bias=self.rebalance_bias,
+            )
+            self.position.tick_lower = new_lower
+            self.position.tick_upper = new_upper
 
-            is_active = self.tracker.is_active(swap.tick)
-            activities.append(is_active)
+        is_active = self.tracker.is_active(swap.tick)
+        fee = self.calculator.compute_fee_for_swap(swap)
+        if is_active:
+            self.total_fees.token0 += fee.token0
+            self.total_fees.token1 += fee.token1
+        return is_active, fee
 
-            fee = self.calculator.compute_fee_for_swap(swap)
-            fees.append(fee)
+    def extend(
+        self,
+        swaps: list[Swap],
+        lowers: list[int],
+        uppers: list[int],
+        activities: list[bool],
+        fees: list[Fee],
+    ) -> None:
+        """Append swaps whose per-swap state was simulated elsewhere."""
+        if not swaps:
+            return
+        if self.first_swap is None:
+            self.first_swap = swaps[0]
+            if self.created_at is None:
+                self.created_at = swaps[0].timestamp
+        self.last_swap = swaps[-1]
 
+        self.timestamps.extend(s.timestamp for s in swaps)
+        self.ticks.extend(s.tick for s in swaps)
+        self.lowers.extend(lowers)
+        self.uppers.extend(uppers)
+        self.activities.extend(activities)
+        self.fees.extend(fees)
+        for is_active, fee in zip(activities, fees):
             if is_active:
                 self.total_fees.token0 += fee.token0
                 self.total_fees.token1 += fee.token1
 
-        self.activity_series = ActivityTimeseries(
-            timestamps=self.swap_series.timestamps,
-            activity=activities,
+    def finish(self) -> BacktestResult:
+        if self.first_swap is None:
+            raise ValueError("Cannot backtest an empty swap series.")
+
+        self.activity_series = construct(
+            ActivityTimeseries,
+            timestamps=self.timestamps,
+            activity=self.activities,
+        )
+        self.fee_series = construct(
+            FeeTimeseries,
+            timestamps=self.timestamps,
+            fees=self.fees,
         )
-        self.fee_series = FeeTimeseries(
-            timestamps=self.swap_series.timestamps,
-            fees=fees,
+        active = np.array(self.activities, dtype=bool)
+        fees0 = [float(f.token0) for f in self.fees]
+        fees1 = [float(f.token1) for f in self.fees]
+        self.value_series = compute_value_timeseries(
+            ticks=np.array(self.ticks, dtype=np.int64),
+            tick_lower=np.array(self.lowers, dtype=np.int64),
+            tick_upper=np.array(self.uppers, dtype=np.int64),
+            amount0=float(self.initial_token0),
+            amount1=float(self.initial_token1),
+            earned_fees_token0=np.where(active, fees0, 0.0),
+            earned_fees_token1=np.where(active, fees1, 0.0),
+            timestamps=np.array(self.timestamps, dtype="datetime64[us]"),
         )
 
-        end_token0 = initial_token0 + self.total_fees.token0
-        end_token1 = initial_token1 + self.total_fees.token1
+        end_token0 = self.initial_token0 + self.total_fees.token0
+        end_token1 = self.initial_token1 + self.total_fees.token1
 
-        sqrt_start = self.swap_series.swaps[0].sqrt_price_x96
-        sqrt_end = self.swap_series.swaps[-1].sqrt_price_x96
+        sqrt_start = self.first_swap.sqrt_price_x96
+        sqrt_end = self.last_swap.sqrt_price_x96
         price0_start = sqrt_start**2
         price0_end = sqrt_end**2
         price1_start = Decimal("1")
         price1_end = Decimal("1")
 
-        duration = (
-            self.swap_series.timestamps[-1] - self.swap_series.timestamps[0]
-        ).days or 1
+        duration = (self.timestamps[-1] - self.timestamps[0]).days or 1
 
         apr = compute_usd_apr(
-            token0_start=initial_token0,
+            token0_start=self.initial_token0,
             token0_end=end_token0,
-            token1_start=initial_token1,
+            token1_start=self.initial_token1,
             token1_end=end_token1,
             price0_start=price0_start,
             price0_end=price0_end,
@@ -156,4 +363,6 @@ class BacktestRunner:
             total_fees_token0=self.total_fees.token0,
             total_fees_token1=self.total_fees.token1,
             apr=apr,
+            impermanent_loss=Decimal(repr(self.value_series.final_impermanent_loss)),
+            max_drawdown=Decimal(repr(self.value_series.max_drawdown)),
         )
@@ -0,0 +1,96 @@
+import os
+import traceback
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Callable, Iterable, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class ExecutorKind(Enum):
+    SERIAL = "serial"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+class TaskFailure(BaseModel):
+    index: int
+    error_type: str
+    message: str
+    traceback: str
+
+
+def make_executor(kind: ExecutorKind, max_workers: int | None = None) -> Executor:
+    if kind == ExecutorKind.THREAD:
+        return ThreadPoolExecutor(max_workers=max_workers)
+    if kind == ExecutorKind.PROCESS:
+        return ProcessPoolExecutor(max_workers=max_workers)
+    raise ValueError(f"No pool executor for {kind}")
+
+
+class _Captured:
+    """Picklable wrapper turning exceptions raised by `fn` into TaskFailures."""
+
+    def __init__(self, fn: Callable[[T], R]):
+        self.fn = fn
+
+    def __call__(self, item: tuple[int, T]) -> R | TaskFailure:
+        index, value = item
+        try:
+            return self.fn(value)
+        except Exception as exc:
+            return TaskFailure(
+                index=index,
+                error_type=type(exc).__name__,
+                message=str(exc),
+                traceback=traceback.format_exc(),
+            )
+
+
+def map_in_order(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    kind: ExecutorKind = ExecutorKind.SERIAL,
+    max_workers: int | None = None,
+    chunksize: int | None = None,
+    progress: ProgressCallback | None = None,
+) -> list[R | TaskFailure]:
+    """
+    Apply `fn` to every item and return results in input order.
+
+    Exceptions are captured per item as TaskFailure instead of aborting the
+    batch. Process pools receive tasks in chunks of `chunksize` (by default,
+    about four chunks per worker); `fn` and the items must then be picklable.
+    `progress(done, total)` is called after each result.
+    """
+    tasks = list(enumerate(items))
+    total = len(tasks)
+    captured = _Captured(fn)
+
+    if kind == ExecutorKind.SERIAL or total <= 1:
+        results = map(captured, tasks)
+        return _collect(results, total, progress)
+
+    if chunksize is None:
+        workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, total // (workers * 4))
+
+    with make_executor(kind, max_workers) as executor:
+        results = executor.map(captured, tasks, chunksize=chunksize)
+        return _collect(results, total, progress)
+
+
+def _collect(
+    results: Iterable[R], total: int, progress: ProgressCallback | None
+) -> list[R]:
+    collected = []
+    for result in results:
+        collected.append(result)
+        if progress is not None:
+            progress(len(collected), total)
+    return collected
@@ -0,0 +1,314 @@
+import math
+from datetime import datetime
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from lobster_assessment.domain.models import Position, SwapArrays
+
+
+class FeeGrowthIndex(BaseModel):
+    """
+    Per-pool fee growth per unit of liquidity, indexed by time and tick.
+
+    Each swap with liquidity L contributes `volume * fee / L` of growth to its
+    tick, as Uniswap's feeGrowthGlobal does. A position with liquidity L_pos
+    that is active (`tick_lower <= tick <= tick_upper`) over a window earns
+    approximately `L_pos * growth_inside`. FeeCalculator instead credits
+    `L_pos / (L + L_pos)` of each swap's fee, so per swap the approximation
+    overshoots by a factor of exactly `1 + L_pos / L`; over a window the
+    relative error is at most `L_pos / min L` (see `relative_error_bound`).
+    Swaps reporting zero liquidity carry no growth, while FeeCalculator
+    credits the position with their whole fee, so they make the estimate too
+    low, by up to 100% of the fees in range; `zero_liquidity_swaps` counts
+    them.
+
+    Growth is summed into prefix tables over (checkpoint, tick bucket), one
+    row every `checkpoint_interval` swaps and one column per `tick_spacing`
+    ticks, and into cumulative arrays over the swaps ordered by bucket and
+    by tick, each then by time. A query reads four table cells for the bulk
+    of the window; the time edges of the fully covered buckets and the
+    partially covered edge buckets are summed from the cumulative arrays,
+    with two binary searches per bucket or per distinct tick. No swap is
+    scanned, so a query costs O(B log n), B being the buckets in range plus
+    up to 2 * `tick_spacing` edge ticks.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    fee: float
+    tick_spacing: int
+    checkpoint_interval: int
+    base_tick: int
+    timestamps: np.ndarray
+    ticks: np.ndarray
+    growth0: np.ndarray
+    growth1: np.ndarray
+    table0: np.ndarray
+    table1: np.ndarray
+    bucket_keys: np.ndarray
+    bucket_growth0: np.ndarray
+    bucket_growth1: np.ndarray
+    tick_values: np.ndarray
+    tick_keys: np.ndarray
+    tick_growth0: np.ndarray
+    tick_growth1: np.ndarray
+    min_liquidity: float
+    zero_liquidity_swaps: int
+
+    @classmethod
+    def build(
+        cls,
+        swaps: SwapArrays,
+        fee: float,
+        tick_spacing: int = 60,
+        checkpoint_interval: int = 4096,
+    ) -> "FeeGrowthIndex":
+        if tick_spacing < 1 or checkpoint_interval < 1:
+            raise ValueError("tick_spacing and checkpoint_interval must be positive")
+        n = len(swaps)
+        liquidity = swaps.liquidity
+        has_liquidity = liquidity > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth0 = np.where(
+                has_liquidity, swaps.volume_token0 * fee / liquidity, 0.0
+            )
+            growth1 = np.where(
+                has_liquidity, swaps.volume_token1 * fee / liquidity, 0.0
+            )
+
+        base_tick = int(swaps.ticks.min()) if n else 0
+        base_tick -= base_tick % tick_spacing
+        buckets = (swaps.ticks - base_tick) // tick_spacing
+        n_buckets = int(buckets.max()) + 1 if n else 1
+
+        # Row k of a table sums the swaps before k * checkpoint_interval, and
+        # column b those in buckets below b; the trailing partial block is
+        # left to the scans.
+        n_checkpoints = n // checkpoint_interval + 1
+        block = np.arange(n) // checkpoint_interval
+        full = block < n_checkpoints - 1
+        cells = (block[full] + 1) * (n_buckets + 1) + buckets[full] + 1
+        tables = [
+            np.bincount(
+                cells, weights=growth[full], minlength=n_checkpoints * (n_buckets + 1)
+            )
+            .reshape(n_checkpoints, n_buckets + 1)
+            .cumsum(axis=0)
+            .cumsum(axis=1)
+            for growth in (growth0, growth1)
+        ]
+
+        # Swaps ordered by (bucket, index) and by (tick, index), keyed as
+        # group * (n + 1) + index, with growth summed along each order.
+        bucket_order = np.argsort(buckets, kind="stable")
+        tick_order = np.argsort(swaps.ticks, kind="stable")
+        bucket_keys = buckets[bucket_order] * (n + 1) + bucket_order
+        tick_keys = (swaps.ticks[tick_order] - base_tick) * (n + 1) + tick_order
+
+        return cls(
+            fee=fee,
+            tick_spacing=tick_spacing,
+            checkpoint_interval=checkpoint_interval,
+            base_tick=base_tick,
+            timestamps=swaps.timestamps,
+            ticks=swaps.ticks,
+            growth0=growth0,
+            growth1=growth1,
+            table0=tables[0],
+            table1=tables[1],
+            bucket_keys=bucket_keys,
+            bucket_growth0=_prefix(growth0[bucket_order]),
+            bucket_growth1=_prefix(growth1[bucket_order]),
+            tick_values=np.unique(swaps.ticks),
+            tick_keys=tick_keys,
+            tick_growth0=_prefix(growth0[tick_order]),
+            tick_growth1=_prefix(growth1[tick_order]),
+            min_liquidity=float(liquidity[has_liquidity].min())
+            if has_liquidity.any()
+            else 0.0,
+            zero_liquidity_swaps=int((~has_liquidity).sum()),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def swap_range(
+        self, start: datetime | None = None, end: datetime | None = None
+    ) -> tuple[int, int]:
+        """Half-open range of swap indices with `start <= timestamp <= end`."""
+        i0, i1 = 0, len(self)
+        if start is not None:
+            i0 = int(np.searchsorted(self.timestamps, np.datetime64(start, "us")))
+        if end is not None:
+            end = np.datetime64(end, "us")
+            i1 = int(np.searchsorted(self.timestamps, end, side="right"))
+        return i0, max(i0, i1)
+
+    def growth_inside(
+        self,
+        tick_lower: int,
+        tick_upper: int,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> tuple[float, float]:
+        """Fee growth per unit of liquidity of swaps in range over the window."""
+        i0, i1 = self.swap_range(start, end)
+        if tick_lower > tick_upper or i0 == i1:
+            return 0.0, 0.0
+
+        c = self.checkpoint_interval
+        k0 = -(-i0 // c)
+        k1 = i1 // c
+        s = self.tick_spacing
+        n_buckets = self.table0.shape[1] - 1
+        b_lo = (tick_lower - self.base_tick) // s
+        b_hi = (tick_upper - self.base_tick) // s
+        first = b_lo if tick_lower <= self.base_tick + b_lo * s else b_lo + 1
+        last = b_hi if tick_upper >= self.base_tick + (b_hi + 1) * s - 1 else b_hi - 1
+        first, last = max(first, 0), min(last, n_buckets - 1)
+
+        g0 = g1 = 0.0
+        if first <= last:
+            buckets = np.arange(first, last + 1)
+            windows = [(i0, i1)]
+            if k0 < k1:
+                g0 = _table_sum(self.table0, k0, k1, first, last)
+                g1 = _table_sum(self.table1, k0, k1, first, last)
+                windows = [(i0, k0 * c), (k1 * c, i1)]
+            for lo, hi in windows:
+                e0, e1 = self._bucket_sum(buckets, lo, hi)
+                g0 += e0
+                g1 += e1
+
+        for bucket in {b_lo, b_hi}:
+            if 0 <= bucket < n_buckets and not first <= bucket <= last:
+                bucket_start = self.base_tick + bucket * s
+                e0, e1 = self._tick_sum(
+                    max(tick_lower, bucket_start),
+                    min(tick_upper, bucket_start + s - 1),
+                    i0,
+                    i1,
+                )
+                g0 += e0
+                g1 += e1
+        return g0, g1
+
+    def fees(
+        self,
+        tick_lower: int,
+        tick_upper: int,
+        liquidity: float,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> tuple[float, float]:
+        g0, g1 = self.growth_inside(tick_lower, tick_upper, start, end)
+        return liquidity * g0, liquidity * g1
+
+    def fees_for_position(
+        self,
+        position: Position,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> tuple[float, float]:
+        return self.fees(
+            position.tick_lower,
+            position.tick_upper,
+            float(position.liquidity),
+            start,
+            end,
+        )
+
+    def relative_error_bound(self, liquidity: float) -> float:
+        """
+        Upper bound on `(approximate - exact) / exact` against FeeCalculator
+        for a position of `liquidity`, over any range and window. Unbounded
+        (inf) when no swap reports liquidity, since the index then holds no
+        growth at all.
+
+        The estimate is never too low when `zero_liquidity_swaps` is 0.
+        Otherwise the fees FeeCalculator credits for those swaps are missing,
+        so the error also ranges down to -1 (no fees found).
+        """
+        if self.min_liquidity == 0.0:
+            return math.inf
+        return liquidity / self.min_liquidity
+
+    def _bucket_sum(self, buckets: np.ndarray, lo: int, hi: int) -> tuple[float, float]:
+        """Growth of the swaps in `buckets` with index in [lo, hi)."""
+        return _group_sum(
+            self.bucket_keys,
+            self.bucket_growth0,
+            self.bucket_growth1,
+            buckets,
+            lo,
+            hi,
+        )
+
+    def _tick_sum(self, low: int, high: int, lo: int, hi: int) -> tuple[float, float]:
+        """Growth of the swaps with tick in [low, high] and index in [lo, hi)."""
+        values = self.tick_values
+        ticks = values[
+            np.searchsorted(values, low) : np.searchsorted(values, high, side="right")
+        ]
+        return _group_sum(
+            self.tick_keys,
+            self.tick_growth0,
+            self.tick_growth1,
+            ticks - self.base_tick,
+            lo,
+            hi,
+        )
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path, **{name: getattr(self, name) for name in type(self).model_fields}
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "FeeGrowthIndex":
+        with np.load(path) as data:
+            fields = {name: data[name] for name in data.files}
+        for name in ("fee", "min_liquidity"):
+            fields[name] = float(fields[name])
+        for name in (
+            "tick_spacing",
+            "checkpoint_interval",
+            "base_tick",
+            "zero_liquidity_swaps",
+        ):
+            fields[name] = int(fields[name])
+        return cls(**fields)
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    prefix = np.zeros(len(values) + 1)
+    np.cumsum(values, out=prefix[1:])
+    return prefix
+
+
+def _group_sum(
+    keys: np.ndarray,
+    prefix0: np.ndarray,
+    prefix1: np.ndarray,
+    groups: np.ndarray,
+    lo: int,
+    hi: int,
+) -> tuple[float, float]:
+    """Sum over `groups` of the growth with index in [lo, hi), from sorted keys."""
+    if lo >= hi or not len(groups):
+        return 0.0, 0.0
+    stride = len(prefix0)
+    start = np.searchsorted(keys, groups * stride + lo)
+    stop = np.searchsorted(keys, groups * stride + hi)
+    return (
+        float((prefix0[stop] - prefix0[start]).sum()),
+        float((prefix1[stop] - prefix1[start]).sum()),
+    )
+
+
+def _table_sum(table: np.ndarray, k0: int, k1: int, first: int, last: int) -> float:
+    """Sum of rows [k0, k1) and buckets [first, last] from a 2-D prefix table."""
+    return float(
+        table[k1, last + 1] - table[k1, first] - table[k0, last + 1] + table[k0, first]
+    )
@@ -0,0 +1,142 @@
+from bisect import bisect_left, bisect_right
+from typing import Hashable, Iterable, Mapping
+
+from pydantic import BaseModel
+
+from lobster_assessment.domain.models import Position
+
+
+class ActivityChange(BaseModel):
+    tick: int
+    entered: set[Hashable]
+    exited: set[Hashable]
+
+
+class _SortedEndpoints:
+    """Tick endpoints kept sorted, with the id of the position owning each."""
+
+    def __init__(self):
+        self.ticks: list[int] = []
+        self.ids: list[Hashable] = []
+
+    def add(self, tick: int, position_id: Hashable) -> None:
+        i = bisect_right(self.ticks, tick)
+        self.ticks.insert(i, tick)
+        self.ids.insert(i, position_id)
+
+    def remove(self, tick: int, position_id: Hashable) -> None:
+        lo = bisect_left(self.ticks, tick)
+        hi = bisect_right(self.ticks, tick)
+        i = self.ids.index(position_id, lo, hi)
+        del self.ticks[i]
+        del self.ids[i]
+
+    def between(self, low: int, high: int, closed_low: bool) -> list[Hashable]:
+        """Ids with an endpoint in [low, high) when closed_low, else (low, high]."""
+        if closed_low:
+            return self.ids[
+                bisect_left(self.ticks, low) : bisect_left(self.ticks, high)
+            ]
+        return self.ids[bisect_right(self.ticks, low) : bisect_right(self.ticks, high)]
+
+
+class PositionIntervalIndex:
+    """
+    Index over many position ranges answering which are active at a tick.
+
+    A position is active when `tick_lower <= tick <= tick_upper`, as in
+    ActivityTracker. The index keeps a cursor tick and its active set; moving
+    the cursor only visits positions with an endpoint between the old and the
+    new tick, so following a swap series costs O(log n + k) per swap for k
+    crossed endpoints instead of O(n). Positions can be added, removed and
+    re-ranged (e.g. after a rebalance) in O(n) worst-case list shifts.
+    """
+
+    def __init__(self, ranges: Mapping[Hashable, tuple[int, int]] | None = None):
+        self.ranges: dict[Hashable, tuple[int, int]] = {}
+        self.tick: int | None = None
+        self._active: set[Hashable] = set()
+        self._lowers = _SortedEndpoints()
+        self._uppers = _SortedEndpoints()
+        for position_id, (tick_lower, tick_upper) in (ranges or {}).items():
+            self.add(position_id, tick_lower, tick_upper)
+
+    @classmethod
+    def from_positions(
+        cls, positions: Mapping[Hashable, Position]
+    ) -> "PositionIntervalIndex":
+        return cls({k: (p.tick_lower, p.tick_upper) for k, p in positions.items()})
+
+    def __len__(self) -> int:
+        return len(self.ranges)
+
+    def __contains__(self, position_id: Hashable) -> bool:
+        return position_id in self.ranges
+
+    @property
+    def active(self) -> frozenset[Hashable]:
+        """Positions active at the cursor tick."""
+        return frozenset(self._active)
+
+    def is_active(self, position_id: Hashable) -> bool:
+        return position_id in self._active
+
+    def add(self, position_id: Hashable, tick_lower: int, tick_upper: int) -> None:
+        if position_id in self.ranges:
+            raise KeyError(f"Position {position_id!r} is already indexed")
+        if tick_lower >= tick_upper:
+            raise ValueError("tick_lower must be strictly less than tick_upper")
+        self.ranges[position_id] = (tick_lower, tick_upper)
+        self._lowers.add(tick_lower, position_id)
+        self._uppers.add(tick_upper, position_id)
+        if self.tick is not None and tick_lower <= self.tick <= tick_upper:
+            self._active.add(position_id)
+
+    def remove(self, position_id: Hashable) -> None:
+        tick_lower, tick_upper = self.ranges.pop(position_id)
+        self._lowers.remove(tick_lower, position_id)
+        self._uppers.remove(tick_upper, position_id)
+        self._active.discard(position_id)
+
+    def update(self, position_id: Hashable, tick_lower: int, tick_upper: int) -> None:
+        """Move a position to a new range, keeping the cursor's active set exact."""
+        self.remove(position_id)
+        self.add(position_id, tick_lower, tick_upper)
+
+    def move(self, tick: int) -> ActivityChange:
+        """Move the cursor to `tick` and return the positions that changed state."""
+        if self.tick is None:
+            self.tick = tick
+            started = self._lowers.ids[: bisect_right(self._lowers.ticks, tick)]
+            self._active = {i for i in started if self.ranges[i][1] >= tick}
+            return ActivityChange(tick=tick, entered=set(self._active), exited=set())
+
+        low, high = sorted((self.tick, tick))
+        self.tick = tick
+        entered, exited = set(), set()
+        if low == high:
+            return ActivityChange(tick=tick, entered=entered, exited=exited)
+
+        # Only positions with a lower in (low, high] or an upper in [low, high)
+        # can change state between the two ticks.
+        candidates = set(self._lowers.between(low, high, closed_low=False))
+        candidates.update(self._uppers.between(low, high, closed_low=True))
+        for position_id in candidates:
+            tick_lower, tick_upper = self.ranges[position_id]
+            now = tick_lower <= tick <= tick_upper
+            if now and position_id not in self._active:
+                self._active.add(position_id)
+                entered.add(position_id)
+            elif not now and position_id in self._active:
+                self._active.remove(position_id)
+                exited.add(position_id)
+        return ActivityChange(tick=tick, entered=entered, exited=exited)
+
+    def active_at(self, tick: int) -> frozenset[Hashable]:
+        """Positions active at `tick`; also moves the cursor there."""
+        self.move(tick)
+        return self.active
+
+    def track(self, ticks: Iterable[int]) -> Iterable[ActivityChange]:
+        for tick in ticks:
+            yield self.move(tick)
@@ -0,0 +1,366 @@
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+
+from lobster_assessment.application.core import BacktestResult
+from lobster_assessment.application.math import (
+    compute_liquidity_from_amounts_array,
+    compute_usd_apr,
+    liquidity_at_sqrt_prices,
+    liquidity_bounds,
+    sqrt_price_at_tick,
+)
+from lobster_assessment.application.rebalancing import (
+    LogicMode,
+    MultiConditionRebalancer,
+    OutOfRangeDurationRebalancer,
+    OutOfRangeRebalancer,
+    RebalancingStrategy,
+    TimeTriggeredRebalancer,
+)
+from lobster_assessment.application.valuation import (
+    ValueTimeseries,
+    compute_value_timeseries,
+)
+from lobster_assessment.domain.models import Position, SwapArrays
+
+try:
+    from numba import njit
+    from numba.extending import register_jitable
+except ImportError:  # pragma: no cover - depends on the environment
+    njit = None
+
+JIT_AVAILABLE = njit is not None
+
+_OUT_OF_RANGE = 0
+_TIME_TRIGGERED = 1
+_OUT_OF_RANGE_DURATION = 2
+
+_MODE_OR = 0
+_MODE_AND = 1
+
+_NAT = np.iinfo(np.int64).min
+
+
+def rebalance_check(
+    kinds, params, state, mode, tick, timestamp, tick_lower, tick_upper, created_at
+):
+    """
+    Whether an encoded rebalancer (see `encode_rebalancer`) fires at a swap.
+
+    Mirrors `should_rebalance` of the built-in strategies, including their
+    state updates. Works elementwise: `tick` and the range are scalars for
+    one position or arrays over many (with `state` of shape
+    (strategies, positions)); timestamps are int64 microseconds.
+    """
+    # Selections are spelled as arithmetic on booleans (x ^ True negates) so
+    # the same code runs on Python scalars, arrays and under Numba.
+    in_range = (tick_lower <= tick) & (tick <= tick_upper)
+    if len(kinds) == 0:
+        return in_range & False
+    should = mode == _MODE_AND
+    for k in range(len(kinds)):
+        kind = kinds[k]
+        if kind == _OUT_OF_RANGE:
+            check = in_range ^ True
+        else:
+            if kind == _OUT_OF_RANGE_DURATION:
+                state[k] = in_range * _NAT + (in_range ^ True) * state[k]
+            unset = state[k] == _NAT
+            reference = unset * created_at + (unset ^ True) * state[k]
+            check = timestamp - reference >= params[k]
+            if kind == _OUT_OF_RANGE_DURATION:
+                check = check & (in_range ^ True)
+        if mode == _MODE_AND:
+            should = should & check
+        else:
+            should = should | check
+    return should
+
+
+def on_rebalance(kinds, state, fired, timestamp):
+    """State update of `rebalance` where `fired`; the first strategy handles it."""
+    if kinds[0] == _TIME_TRIGGERED:
+        state[0] = fired * timestamp + (fired ^ True) * state[0]
+    elif kinds[0] == _OUT_OF_RANGE_DURATION:
+        state[0] = fired * _NAT + (fired ^ True) * state[0]
+
+
+# The scan calls the shared helpers through these aliases, which are
+# rebound to compiled copies when Numba is available.
+_sqrt_price = sqrt_price_at_tick
+_liquidity_bound = liquidity_at_sqrt_prices
+_check = rebalance_check
+_update = on_rebalance
+
+
+def _liquidity(tick_lower, tick_upper, amount0, amount1):
+    return _liquidity_bound(
+        _sqrt_price(tick_lower), _sqrt_price(tick_upper), amount0, amount1
+    )
+
+
+def _scan(
+    ticks,
+    volume_token0,
+    volume_token1,
+    swap_liquidity,
+    timestamps,
+    tick_lower,
+    tick_upper,
+    amount0,
+    amount1,
+    bias,
+    created_at,
+    kinds,
+    params,
+    state,
+    mode,
+    activity,
+    shares,
+    lowers,
+    uppers,
+):
+    """
+    Sequential per-swap scan: rebalance checks, range updates and fee shares.
+
+    Mirrors BacktestRunner.run for the built-in rebalancers encoded in
+    `kinds`/`params`/`state`. Writes per-swap activity, liquidity shares and
+    tick range into the output arrays and returns the final range.
+    """
+    liquidity = _liquidity(tick_lower, tick_upper, amount0, amount1)
+
+    for i in range(len(ticks)):
+        tick = ticks[i]
+        timestamp = timestamps[i]
+        if _check(
+            kinds,
+            params,
+            state,
+            mode,
+            tick,
+            timestamp,
+            tick_lower,
+            tick_upper,
+            created_at,
+        ):
+            _update(kinds, state, True, timestamp)
+            width = tick_upper - tick_lower
+            left = int(width * bias)
+            tick_lower = tick - left
+            tick_upper = tick + width - left
+            liquidity = _liquidity(tick_lower, tick_upper, amount0, amount1)
+
+        total = swap_liquidity[i] + liquidity
+        activity[i] = tick_lower <= tick <= tick_upper
+        lowers[i] = tick_lower
+        uppers[i] = tick_upper
+        shares[i] = liquidity / total if total > 0 else 0.0
+
+    return tick_lower, tick_upper
+
+
+if JIT_AVAILABLE:  # pragma: no cover - depends on the environment
+    # Called by liquidity_at_sqrt_prices; registered so compiled code can too.
+    register_jitable(liquidity_bounds)
+    _sqrt_price = njit(cache=True)(sqrt_price_at_tick)
+    _liquidity_bound = njit(cache=True)(liquidity_at_sqrt_prices)
+    _check = njit(cache=True)(rebalance_check)
+    _update = njit(cache=True)(on_rebalance)
+    _liquidity = njit(cache=True)(_liquidity)
+    _scan = njit(cache=True)(_scan)
+
+
+def encode_rebalancer(
+    rebalancer: RebalancingStrategy | None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Flatten a built-in rebalancer into (kinds, params, state, mode) arrays,
+    as read by `rebalance_check` and `on_rebalance`. A MultiConditionRebalancer
+    may combine the other built-ins but not nest further.
+    """
+    if rebalancer is None:
+        strategies, mode = [], _MODE_OR
+    elif type(rebalancer) is MultiConditionRebalancer:
+        strategies = rebalancer.strategies
+        mode = _MODE_AND if rebalancer.mode == LogicMode.AND else _MODE_OR
+    else:
+        strategies, mode = [rebalancer], _MODE_OR
+
+    kinds, params, state = [], [], []
+    for s in strategies:
+        if type(s) is OutOfRangeRebalancer:
+            kinds.append(_OUT_OF_RANGE)
+            params.append(0)
+            state.append(_NAT)
+        elif type(s) is TimeTriggeredRebalancer:
+            kinds.append(_TIME_TRIGGERED)
+            params.append(_to_micros(s.interval))
+            state.append(_NAT)
+        elif type(s) is OutOfRangeDurationRebalancer:
+            kinds.append(_OUT_OF_RANGE_DURATION)
+            params.append(_to_micros(s.duration))
+            state.append(_NAT)
+        else:
+            raise TypeError(
+                f"{type(s).__name__} is not supported by vectorized backtests"
+            )
+
+    return (
+        np.array(kinds, dtype=np.int64),
+        np.array(params, dtype=np.int64),
+        np.array(state, dtype=np.int64),
+        mode,
+    )
+
+
+def _to_micros(delta) -> int:
+    return int(np.timedelta64(delta, "us").astype(np.int64))
+
+
+def _datetime_to_micros(value: datetime | None) -> int:
+    if value is None:
+        return _NAT
+    return int(np.datetime64(value, "us").astype(np.int64))
+
+
+class CompiledBacktestRunner:
+    """
+    Array-based counterpart of BacktestRunner for the built-in rebalancers.
+
+    The sequential scan runs under Numba when it is installed and as plain
+    Python over NumPy arrays otherwise; static positions are reduced with
+    NumPy in a single pass. Time-based rebalancer state follows simulated
+    swap timestamps. The given position and rebalancer are not mutated.
+    """
+
+    def __init__(
+        self,
+        position: Position,
+        swaps: SwapArrays,
+        rebalance_bias: float,
+        created_at: datetime | None = None,
+        rebalancer: RebalancingStrategy | None = None,
+    ):
+        if not 0.0 <= rebalance_bias <= 1.0:
+            raise ValueError("Bias must be between 0.0 and 1.0")
+        if len(swaps) == 0:
+            raise ValueError("Cannot backtest an empty swap series.")
+
+        self.position = position
+        self.swaps = swaps
+        self.rebalance_bias = rebalance_bias
+        self.created_at = created_at
+        self.rebalancer = rebalancer
+        self.encoded_rebalancer = encode_rebalancer(rebalancer)
+
+        self.activity: np.ndarray
+        self.fees_token0: np.ndarray
+        self.fees_token1: np.ndarray
+        self.value_series: ValueTimeseries
+        self.tick_lower = position.tick_lower
+        self.tick_upper = position.tick_upper
+
+    def run(self) -> BacktestResult:
+        swaps = self.swaps
+        amount0 = float(self.position.amount0)
+        amount1 = float(self.position.amount1)
+        fee_rate = float(self.position.pool.fee)
+        kinds, params, state, mode = self.encoded_rebalancer
+
+        if len(kinds) == 0:
+            self.activity = (self.tick_lower <= swaps.ticks) & (
+                swaps.ticks <= self.tick_upper
+            )
+            liquidity = compute_liquidity_from_amounts_array(
+                self.tick_lower, self.tick_upper, amount0, amount1
+            )
+            total = swaps.liquidity + liquidity
+            with np.errstate(divide="ignore", invalid="ignore"):
+                shares = np.where(total > 0, liquidity / total, 0.0)
+            lowers = np.full(len(swaps), self.tick_lower, dtype=np.int64)
+            uppers = np.full(len(swaps), self.tick_upper, dtype=np.int64)
+        else:
+            created_at = (
+                _datetime_to_micros(self.created_at)
+                if self.created_at is not None
+                else int(swaps.timestamps[0].astype(np.int64))
+            )
+            columns = (
+                swaps.ticks,
+                swaps.volume_token0,
+                swaps.volume_token1,
+                swaps.liquidity,
+                swaps.timestamps.astype(np.int64),
+            )
+            state = state.copy()
+            if not JIT_AVAILABLE:
+                # Python floats and ints are much cheaper to index than NumPy scalars.
+                columns = tuple(c.tolist() for c in columns)
+                kinds, params, state = kinds.tolist(), params.tolist(), state.tolist()
+
+            self.activity = np.zeros(len(swaps), dtype=np.bool_)
+            shares = np.zeros(len(swaps), dtype=np.float64)
+            lowers = np.zeros(len(swaps), dtype=np.int64)
+            uppers = np.zeros(len(swaps), dtype=np.int64)
+            self.tick_lower, self.tick_upper = _scan(
+                *columns,
+                self.tick_lower,
+                self.tick_upper,
+                amount0,
+                amount1,
+                self.rebalance_bias,
+                created_at,
+                kinds,
+                params,
+                state,
+                mode,
+                self.activity,
+                shares,
+                lowers,
+                uppers,
+            )
+
+        self.fees_token0 = shares * swaps.volume_token0 * fee_rate
+        self.fees_token1 = shares * swaps.volume_token1 * fee_rate
+        earned0 = np.where(self.activity, self.fees_token0, 0.0)
+        earned1 = np.where(self.activity, self.fees_token1, 0.0)
+        total_fees0 = Decimal(repr(float(earned0.sum())))
+        total_fees1 = Decimal(repr(float(earned1.sum())))
+        self.value_series = compute_value_timeseries(
+            ticks=swaps.ticks,
+            tick_lower=lowers,
+            tick_upper=uppers,
+            amount0=amount0,
+            amount1=amount1,
+            earned_fees_token0=earned0,
+            earned_fees_token1=earned1,
+            timestamps=swaps.timestamps,
+        )
+
+        sqrt_start = Decimal(repr(float(swaps.sqrt_price_x96[0])))
+        sqrt_end = Decimal(repr(float(swaps.sqrt_price_x96[-1])))
+        duration = (
+            int((swaps.timestamps[-1] - swaps.timestamps[0]) // np.timedelta64(1, "D"))
+            or 1
+        )
+        apr = compute_usd_apr(
+            token0_start=self.position.amount0,
+            token0_end=self.position.amount0 + total_fees0,
+            token1_start=self.position.amount1,
+            token1_end=self.position.amount1 + total_fees1,
+            price0_start=sqrt_start**2,
+            price0_end=sqrt_end**2,
+            price1_start=Decimal("1"),
+            price1_end=Decimal("1"),
+            duration_days=duration,
+        )
+
+        return BacktestResult(
+            total_fees_token0=total_fees0,
+            total_fees_token1=total_fees1,
+            apr=apr,
+            impermanent_loss=Decimal(repr(self.value_series.final_impermanent_loss)),
+            max_drawdown=Decimal(repr(self.value_series.max_drawdown)),
+        )
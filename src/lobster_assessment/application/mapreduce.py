@@ -0,0 +1,243 @@
+import math
+from decimal import (
+    MAX_EMAX,
+    MAX_PREC,
+    MIN_EMIN,
+    Context,
+    Decimal,
+    Inexact,
+    localcontext,
+)
+
+import numpy as np
+from pydantic import BaseModel
+
+from lobster_assessment.application.core import BacktestResult
+from lobster_assessment.application.executors import (
+    ExecutorKind,
+    ProgressCallback,
+    TaskFailure,
+    map_in_order,
+)
+from lobster_assessment.application.math import compute_usd_apr
+from lobster_assessment.application.valuation import compute_value_timeseries
+from lobster_assessment.domain.models import Position, Swap, SwapArrays
+
+
+class FeePartial(BaseModel):
+    """Fee totals and activity counts of one chunk, or of several combined."""
+
+    swaps: int
+    active_swaps: int
+    total_fees_token0: Decimal
+    total_fees_token1: Decimal
+
+
+def _exact_context() -> Context:
+    # Wide enough that additions never round; Inexact guards the assumption.
+    return Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN, traps=[Inexact])
+
+
+def _decimal_partial(
+    chunk: list[Swap], liquidity: Decimal, tick_lower: int, tick_upper: int, fee
+) -> FeePartial:
+    fees0: list[Decimal] = []
+    fees1: list[Decimal] = []
+    for swap in chunk:
+        if tick_lower <= swap.tick <= tick_upper:
+            # Same operations, in the same order, as FeeCalculator.
+            share = liquidity / (swap.liquidity + liquidity)
+            fees0.append(share * (swap.volume_token0 * fee))
+            fees1.append(share * (swap.volume_token1 * fee))
+    with localcontext(_exact_context()):
+        return FeePartial(
+            swaps=len(chunk),
+            active_swaps=len(fees0),
+            total_fees_token0=sum(fees0, Decimal(0)),
+            total_fees_token1=sum(fees1, Decimal(0)),
+        )
+
+
+def _float_partial(
+    chunk: SwapArrays, liquidity: float, tick_lower: int, tick_upper: int, fee: float
+) -> FeePartial:
+    active = (tick_lower <= chunk.ticks) & (chunk.ticks <= tick_upper)
+    share = liquidity / (chunk.liquidity[active] + liquidity)
+    fees0 = share * (chunk.volume_token0[active] * fee)
+    fees1 = share * (chunk.volume_token1[active] * fee)
+    # fsum rounds each chunk once; Decimal(float) is exact, so combining the
+    # partials adds no further error.
+    return FeePartial(
+        swaps=len(chunk),
+        active_swaps=int(active.sum()),
+        total_fees_token0=Decimal(math.fsum(fees0.tolist())),
+        total_fees_token1=Decimal(math.fsum(fees1.tolist())),
+    )
+
+
+def _map_chunk(task: tuple) -> FeePartial:
+    exact, chunk, liquidity, tick_lower, tick_upper, fee = task
+    partial = _decimal_partial if exact else _float_partial
+    return partial(chunk, liquidity, tick_lower, tick_upper, fee)
+
+
+def reduce_partials(partials: list[FeePartial]) -> FeePartial:
+    """Combine chunk partials exactly; the order of `partials` does not matter."""
+    with localcontext(_exact_context()):
+        return FeePartial(
+            swaps=sum(p.swaps for p in partials),
+            active_swaps=sum(p.active_swaps for p in partials),
+            total_fees_token0=sum((p.total_fees_token0 for p in partials), Decimal(0)),
+            total_fees_token1=sum((p.total_fees_token1 for p in partials), Decimal(0)),
+        )
+
+
+class MapReduceFeeRunner:
+    """
+    Backtest of a static position (no rebalancer) as a chunked map-reduce.
+
+    The swaps are split into chunks of `chunk_size`; each chunk's fee totals
+    and activity count are computed independently, on the chosen executor,
+    and the partials are summed exactly. Results therefore do not depend on
+    the chunking or the executor.
+
+    With `exact`, per-swap fees are computed in Decimal exactly as
+    FeeCalculator does and summed without intermediate rounding, then
+    rounded once to the current context. BacktestRunner rounds after every
+    addition instead, so the two can differ in the last digits. Otherwise
+    the swaps are processed as float64 arrays.
+
+    `result` also derives the APR and final impermanent loss, which need
+    only the first and last swaps; max drawdown depends on the whole value
+    path and is left unset.
+    """
+
+    def __init__(
+        self,
+        position: Position,
+        swaps: list[Swap] | SwapArrays,
+        chunk_size: int = 1_000_000,
+        exact: bool = False,
+    ):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        if not len(swaps):
+            raise ValueError("Cannot backtest an empty swap series.")
+        if exact and isinstance(swaps, SwapArrays):
+            raise ValueError("Exact mode needs Swap objects, not float arrays.")
+        if not exact and not isinstance(swaps, SwapArrays):
+            swaps = SwapArrays.from_swaps(swaps)
+        self.position = position
+        self.swaps = swaps
+        self.chunk_size = chunk_size
+        self.exact = exact
+        self.partials: list[FeePartial]
+
+    def tasks(self) -> list[tuple]:
+        position = self.position
+        if self.exact:
+            liquidity, fee = position.liquidity, position.pool.fee
+        else:
+            liquidity, fee = float(position.liquidity), float(position.pool.fee)
+        return [
+            (
+                self.exact,
+                self._slice(start, start + self.chunk_size),
+                liquidity,
+                position.tick_lower,
+                position.tick_upper,
+                fee,
+            )
+            for start in range(0, len(self.swaps), self.chunk_size)
+        ]
+
+    def reduce(
+        self,
+        executor: ExecutorKind = ExecutorKind.SERIAL,
+        max_workers: int | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> FeePartial:
+        """Fee totals and activity counts over the whole series."""
+        partials = map_in_order(
+            _map_chunk,
+            self.tasks(),
+            kind=executor,
+            max_workers=max_workers,
+            chunksize=1,
+            progress=progress,
+        )
+        for partial in partials:
+            if isinstance(partial, TaskFailure):
+                raise RuntimeError(
+                    f"Chunk {partial.index} failed: "
+                    f"{partial.error_type}: {partial.message}"
+                )
+        self.partials = partials
+        total = reduce_partials(partials)
+        # Unary plus rounds the exact sums once, to the caller's context.
+        total.total_fees_token0 = +total.total_fees_token0
+        total.total_fees_token1 = +total.total_fees_token1
+        if not self.exact:
+            total.total_fees_token0 = Decimal(repr(float(total.total_fees_token0)))
+            total.total_fees_token1 = Decimal(repr(float(total.total_fees_token1)))
+        return total
+
+    def run(
+        self,
+        executor: ExecutorKind = ExecutorKind.SERIAL,
+        max_workers: int | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> BacktestResult:
+        total = self.reduce(executor, max_workers, progress)
+        position = self.position
+        first, last = self._endpoint(0), self._endpoint(-1)
+
+        # Impermanent loss only needs the entry and the final swap.
+        endpoints = compute_value_timeseries(
+            ticks=np.array([first[0], last[0]]),
+            tick_lower=np.full(2, position.tick_lower),
+            tick_upper=np.full(2, position.tick_upper),
+            amount0=float(position.amount0),
+            amount1=float(position.amount1),
+            earned_fees_token0=np.zeros(2),
+            earned_fees_token1=np.zeros(2),
+            timestamps=np.array([first[2], last[2]], dtype="datetime64[us]"),
+        )
+        apr = compute_usd_apr(
+            token0_start=position.amount0,
+            token0_end=position.amount0 + total.total_fees_token0,
+            token1_start=position.amount1,
+            token1_end=position.amount1 + total.total_fees_token1,
+            price0_start=first[1] ** 2,
+            price0_end=last[1] ** 2,
+            price1_start=Decimal("1"),
+            price1_end=Decimal("1"),
+            duration_days=(last[2] - first[2]).days or 1,
+        )
+        return BacktestResult(
+            total_fees_token0=total.total_fees_token0,
+            total_fees_token1=total.total_fees_token1,
+            apr=apr,
+            impermanent_loss=Decimal(repr(endpoints.final_impermanent_loss)),
+        )
+
+    def _slice(self, start: int, end: int) -> list[Swap] | SwapArrays:
+        if isinstance(self.swaps, SwapArrays):
+            return SwapArrays(
+                **{
+                    name: getattr(self.swaps, name)[start:end]
+                    for name in SwapArrays.model_fields
+                }
+            )
+        return self.swaps[start:end]
+
+    def _endpoint(self, index: int) -> tuple:
+        """Tick, sqrt price and timestamp of the swap at `index`."""
+        if isinstance(self.swaps, SwapArrays):
+            return (
+                int(self.swaps.ticks[index]),
+                Decimal(repr(float(self.swaps.sqrt_price_x96[index]))),
+                self.swaps.timestamps[index].astype("datetime64[us]").item(),
+            )
+        swap = self.swaps[index]
+        return swap.tick, swap.sqrt_price_x96, swap.timestamp
@@ -1,9 +1,110 @@
 from decimal import Decimal
+from enum import Enum
+
+import numpy as np
+
+
+class Precision(Enum):
+    """
+    Number type of the array functions: float64 and float32 are vectorized,
+    decimal evaluates the exact Decimal formulas elementwise over object arrays.
+    float32 halves memory but keeps only about four significant digits on
+    narrow ranges, where sqrt_PB - sqrt_PA cancels.
+    """
+
+    FLOAT64 = "float64"
+    FLOAT32 = "float32"
+    DECIMAL = "decimal"
+
+
+_SQRT_BASE = Decimal(1.0001)
+# log(sqrt(1.0001)), so that sqrt_price = exp(tick * _LOG_SQRT_BASE); float32
+# goes through it because float32(1.0001) ** (tick / 2) loses too much.
+_LOG_SQRT_BASE = np.log(1.0001) / 2
+
+
+def _decimal(value) -> Decimal:
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, (int, np.integer)):
+        return Decimal(int(value))
+    return Decimal(repr(float(value)))
+
+
+def _is_scalar(*values) -> bool:
+    for value in values:
+        if isinstance(value, (np.ndarray, list, tuple)):
+            return False
+    return True
+
+
+def _precision(precision: Precision | str) -> Precision:
+    return precision if isinstance(precision, Precision) else Precision(precision)
+
+
+def _elementwise(kernel, *values):
+    """Apply a Decimal `kernel` over broadcast arguments, as an object array."""
+    if _is_scalar(*values):
+        return kernel(*values)
+    return np.asarray(np.frompyfunc(kernel, len(values), 1)(*values), dtype=object)
+
+
+def _asarray(values, precision: Precision) -> np.ndarray:
+    return np.asarray(values, dtype=precision.value)
+
+
+# Formulas shared by the precision paths. They use only arithmetic and NumPy
+# ufuncs, so they apply to Decimals, floats and arrays alike, and compile
+# unchanged under Numba (see application.kernel).
+
+
+def sqrt_price_at_tick(tick):
+    """Float sqrt price of a tick, for scalars or arrays."""
+    return np.power(1.0001, tick / 2)
+
+
+def liquidity_bounds(sqrt_PA, sqrt_PB, amount0, amount1):
+    """Liquidity that each of the amounts supports over [sqrt_PA, sqrt_PB]."""
+    L0 = (amount0 * sqrt_PA * sqrt_PB) / (sqrt_PB - sqrt_PA)
+    L1 = amount1 / (sqrt_PB - sqrt_PA)
+    return L0, L1
+
+
+def liquidity_at_sqrt_prices(sqrt_PA, sqrt_PB, amount0, amount1):
+    """Liquidity of amounts over [sqrt_PA, sqrt_PB], bounded by the scarcer asset."""
+    return np.minimum(*liquidity_bounds(sqrt_PA, sqrt_PB, amount0, amount1))
+
+
+def token_amounts_at_sqrt_price(liquidity, sqrt_P, sqrt_PA, sqrt_PB):
+    """
+    Token amounts held by `liquidity` over [sqrt_PA, sqrt_PB] at `sqrt_P`,
+    clamped into the range: below it all token0, above it all token1.
+    """
+    sqrt_P = np.minimum(np.maximum(sqrt_P, sqrt_PA), sqrt_PB)
+    amount0 = liquidity * (sqrt_PB - sqrt_P) / (sqrt_PB * sqrt_P)
+    amount1 = liquidity * (sqrt_P - sqrt_PA)
+    return amount0, amount1
 
 
 def tick_to_sqrt_price(tick: int) -> Decimal:
     """Convert a tick to its corresponding square root price (P = sqrt(price))."""
-    return Decimal(1.0001) ** Decimal(tick / 2)
+    return tick_to_sqrt_price_array(tick, precision=Precision.DECIMAL)
+
+
+def _sqrt_price_decimal(tick) -> Decimal:
+    return _SQRT_BASE ** Decimal(tick / 2)
+
+
+def tick_to_sqrt_price_array(
+    ticks: np.ndarray, precision: Precision | str = Precision.FLOAT64
+) -> np.ndarray:
+    """Vectorized tick_to_sqrt_price over an array of ticks."""
+    precision = _precision(precision)
+    if precision is Precision.DECIMAL:
+        return _elementwise(_sqrt_price_decimal, ticks)
+    if precision is Precision.FLOAT32:
+        return np.exp(_asarray(ticks, precision) * np.float32(_LOG_SQRT_BASE))
+    return sqrt_price_at_tick(np.asarray(ticks, dtype=np.float64))
 
 
 def compute_liquidity_from_amounts(
@@ -16,16 +117,49 @@ def compute_liquidity_from_amounts(
     Compute liquidity from token amounts given a tick range.
     Assumes both tokens are deposited at once, so liquidity is limited by the scarcer asset.
     """
+    # Position.liquidity calls this per swap: skip the array dispatch.
     if tick_lower >= tick_upper:
         raise ValueError("tick_lower must be less than tick_upper")
+    return _liquidity_decimal(tick_lower, tick_upper, amount0, amount1)
 
-    sqrt_PA = tick_to_sqrt_price(tick_lower)
-    sqrt_PB = tick_to_sqrt_price(tick_upper)
 
-    L0 = (amount0 * sqrt_PA * sqrt_PB) / (sqrt_PB - sqrt_PA)
-    L1 = amount1 / (sqrt_PB - sqrt_PA)
+def _liquidity_decimal(tick_lower, tick_upper, amount0, amount1) -> Decimal:
+    return min(
+        *liquidity_bounds(
+            _sqrt_price_decimal(tick_lower),
+            _sqrt_price_decimal(tick_upper),
+            _decimal(amount0),
+            _decimal(amount1),
+        )
+    )
+
 
-    return min(L0, L1)
+def compute_liquidity_from_amounts_array(
+    tick_lower: np.ndarray,
+    tick_upper: np.ndarray,
+    amount0: np.ndarray,
+    amount1: np.ndarray,
+    precision: Precision | str = Precision.FLOAT64,
+) -> np.ndarray:
+    """Vectorized compute_liquidity_from_amounts; arguments are broadcast together."""
+    precision = _precision(precision)
+    if _is_scalar(tick_lower, tick_upper):
+        invalid = tick_lower >= tick_upper
+    else:
+        invalid = np.any(np.asarray(tick_lower) >= np.asarray(tick_upper))
+    if invalid:
+        raise ValueError("tick_lower must be less than tick_upper")
+    if precision is Precision.DECIMAL:
+        return _elementwise(
+            _liquidity_decimal, tick_lower, tick_upper, amount0, amount1
+        )
+
+    return liquidity_at_sqrt_prices(
+        tick_to_sqrt_price_array(tick_lower, precision),
+        tick_to_sqrt_price_array(tick_upper, precision),
+        _asarray(amount0, precision),
+        _asarray(amount1, precision),
+    )
 
 
 def compute_token0_amount(
@@ -49,8 +183,25 @@ def compute_token_amounts_from_liquidity(
     Given liquidity and a tick range, compute the equivalent token0 and token1 amounts.
     Useful for estimating balance at mint or at burn.
     """
-    sqrt_PA = tick_to_sqrt_price(tick_lower)
-    sqrt_PB = tick_to_sqrt_price(tick_upper)
+    return compute_token_amounts_from_liquidity_array(
+        liquidity, tick_lower, tick_upper, precision=Precision.DECIMAL
+    )
+
+
+def compute_token_amounts_from_liquidity_array(
+    liquidity: np.ndarray,
+    tick_lower: np.ndarray,
+    tick_upper: np.ndarray,
+    precision: Precision | str = Precision.FLOAT64,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized compute_token_amounts_from_liquidity; arguments are broadcast."""
+    precision = _precision(precision)
+    if precision is Precision.DECIMAL:
+        liquidity = _elementwise(_decimal, liquidity)
+    else:
+        liquidity = _asarray(liquidity, precision)
+    sqrt_PA = tick_to_sqrt_price_array(tick_lower, precision)
+    sqrt_PB = tick_to_sqrt_price_array(tick_upper, precision)
 
     amount0 = compute_token0_amount(liquidity, sqrt_PA, sqrt_PB)
     amount1 = compute_token1_amount(liquidity, sqrt_PA, sqrt_PB)
@@ -58,16 +209,69 @@ def compute_token_amounts_from_liquidity(
     return amount0, amount1
 
 
+def compute_token_amounts_at_price_array(
+    liquidity: np.ndarray,
+    sqrt_price: np.ndarray,
+    tick_lower: np.ndarray,
+    tick_upper: np.ndarray,
+    precision: Precision | str = Precision.FLOAT64,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Token amounts held by `liquidity` over a tick range at the current sqrt price.
+
+    Same formulas as compute_token_amounts_from_liquidity, with the current
+    price clamped into the range (see token_amounts_at_sqrt_price).
+    """
+    precision = _precision(precision)
+    if precision is Precision.DECIMAL:
+        liquidity = _elementwise(_decimal, liquidity)
+        sqrt_price = _elementwise(_decimal, sqrt_price)
+    else:
+        liquidity = _asarray(liquidity, precision)
+        sqrt_price = _asarray(sqrt_price, precision)
+    sqrt_PA = tick_to_sqrt_price_array(tick_lower, precision)
+    sqrt_PB = tick_to_sqrt_price_array(tick_upper, precision)
+    return token_amounts_at_sqrt_price(liquidity, sqrt_price, sqrt_PA, sqrt_PB)
+
+
 def compute_token_native_apr(
     token_start: Decimal, token_end: Decimal, duration_days: int
 ) -> Decimal:
+    return compute_token_native_apr_array(
+        token_start, token_end, duration_days, precision=Precision.DECIMAL
+    )
+
+
+def _native_apr_decimal(token_start, token_end, duration_days) -> Decimal:
+    token_start, token_end = _decimal(token_start), _decimal(token_end)
     if token_start == 0 or duration_days == 0:
         return Decimal(0)
     return (
-        ((token_end / token_start) - 1) * (Decimal(365) / Decimal(duration_days)) * 100
+        ((token_end / token_start) - 1)
+        * (Decimal(365) / Decimal(int(duration_days)))
+        * 100
     )
 
 
+def compute_token_native_apr_array(
+    token_start: np.ndarray,
+    token_end: np.ndarray,
+    duration_days: np.ndarray,
+    precision: Precision | str = Precision.FLOAT64,
+) -> np.ndarray:
+    """Vectorized compute_token_native_apr; arguments are broadcast together."""
+    precision = _precision(precision)
+    if precision is Precision.DECIMAL:
+        return _elementwise(_native_apr_decimal, token_start, token_end, duration_days)
+
+    start = _asarray(token_start, precision)
+    end = _asarray(token_end, precision)
+    days = _asarray(duration_days, precision)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        apr = (end / start - 1) * (365 / days) * 100
+    return np.where((start == 0) | (days == 0), start.dtype.type(0), apr)
+
+
 def compute_usd_apr(
     token0_start: Decimal,
     token0_end: Decimal,
@@ -78,16 +282,83 @@ def compute_usd_apr(
     price1_start: Decimal,
     price1_end: Decimal,
     duration_days: int,
+) -> Decimal:
+    return compute_usd_apr_array(
+        token0_start,
+        token0_end,
+        token1_start,
+        token1_end,
+        price0_start,
+        price0_end,
+        price1_start,
+        price1_end,
+        duration_days,
+        precision=Precision.DECIMAL,
+    )
+
+
+def _usd_apr_decimal(
+    token0_start,
+    token0_end,
+    token1_start,
+    token1_end,
+    price0_start,
+    price0_end,
+    price1_start,
+    price1_end,
+    duration_days,
 ) -> Decimal:
     if duration_days == 0:
         return Decimal(0)
 
-    usd_start = token0_start * price0_start + token1_start * price1_start
-    usd_end = token0_end * price0_end + token1_end * price1_end
+    usd_start = _decimal(token0_start) * _decimal(price0_start) + _decimal(
+        token1_start
+    ) * _decimal(price1_start)
+    usd_end = _decimal(token0_end) * _decimal(price0_end) + _decimal(
+        token1_end
+    ) * _decimal(price1_end)
 
     if usd_start == 0:
         return Decimal(0)
 
     performance = usd_end / usd_start
-    apr = (performance - 1) * Decimal(365) / Decimal(duration_days) * 100
+    apr = (performance - 1) * Decimal(365) / Decimal(int(duration_days)) * 100
     return apr
+
+
+def compute_usd_apr_array(
+    token0_start: np.ndarray,
+    token0_end: np.ndarray,
+    token1_start: np.ndarray,
+    token1_end: np.ndarray,
+    price0_start: np.ndarray,
+    price0_end: np.ndarray,
+    price1_start: np.ndarray,
+    price1_end: np.ndarray,
+    duration_days: np.ndarray,
+    precision: Precision | str = Precision.FLOAT64,
+) -> np.ndarray:
+    """Vectorized compute_usd_apr; arguments are broadcast together."""
+    precision = _precision(precision)
+    args = (
+        token0_start,
+        token0_end,
+        token1_start,
+        token1_end,
+        price0_start,
+        price0_end,
+        price1_start,
+        price1_end,
+        duration_days,
+    )
+    if precision is Precision.DECIMAL:
+        return _elementwise(_usd_apr_decimal, *args)
+
+    t0s, t0e, t1s, t1e, p0s, p0e, p1s, p1e, days = (
+        _asarray(a, precision) for a in args
+    )
+    usd_start = t0s * p0s + t1s * p1s
+    usd_end = t0e * p0e + t1e * p1e
+    with np.errstate(divide="ignore", invalid="ignore"):
+        apr = (usd_end / usd_start - 1) * 365 / days * 100
+    return np.where((days == 0) | (usd_start == 0), usd_start.dtype.type(0), apr)
@@ -0,0 +1,358 @@
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field
+
+from lobster_assessment.application.core import BacktestResult
+from lobster_assessment.application.kernel import (
+    encode_rebalancer,
+    on_rebalance,
+    rebalance_check,
+)
+from lobster_assessment.application.math import (
+    compute_liquidity_from_amounts_array,
+    tick_to_sqrt_price_array,
+)
+from lobster_assessment.application.rebalancing import (
+    LogicMode,
+    MultiConditionRebalancer,
+    RebalancingStrategy,
+)
+from lobster_assessment.domain.models import Position, SwapArrays
+
+
+class PathBatch(BaseModel):
+    """A (paths × swaps) batch of price paths sharing a single timeline."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    ticks: np.ndarray
+    volume_token0: np.ndarray
+    volume_token1: np.ndarray
+    liquidity: np.ndarray
+    sqrt_price_x96: np.ndarray
+    timestamps: np.ndarray
+
+    @property
+    def n_paths(self) -> int:
+        return self.ticks.shape[0]
+
+    @property
+    def n_swaps(self) -> int:
+        return self.ticks.shape[1]
+
+    @classmethod
+    def repeat(cls, swaps: SwapArrays, n_paths: int) -> "PathBatch":
+        """Batch of `n_paths` identical copies of `swaps` (broadcast views, no copy)."""
+        shape = (n_paths, len(swaps))
+        return cls(
+            ticks=np.broadcast_to(swaps.ticks, shape),
+            volume_token0=np.broadcast_to(swaps.volume_token0, shape),
+            volume_token1=np.broadcast_to(swaps.volume_token1, shape),
+            liquidity=np.broadcast_to(swaps.liquidity, shape),
+            sqrt_price_x96=np.broadcast_to(swaps.sqrt_price_x96, shape),
+            timestamps=swaps.timestamps,
+        )
+
+
+class PathGenerator(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def generate(self, n_paths: int, rng: np.random.Generator) -> PathBatch:
+        raise NotImplementedError
+
+
+class BlockBootstrap(PathGenerator):
+    """
+    Resample a real swap series by moving-block bootstrap of its tick increments.
+
+    Each path starts at the first observed tick and chains resampled blocks of
+    consecutive tick moves; volume and liquidity come from the same source rows
+    as the moves, and sqrt prices are rescaled from the first observed price.
+    """
+
+    swaps: SwapArrays
+    block_size: int = Field(default=50, gt=0)
+
+    def generate(self, n_paths: int, rng: np.random.Generator) -> PathBatch:
+        n_swaps = len(self.swaps)
+        if n_swaps < 2:
+            return PathBatch.repeat(self.swaps, n_paths)
+
+        steps = np.diff(self.swaps.ticks)
+        block = min(self.block_size, len(steps))
+        n_blocks = -(-len(steps) // block)
+
+        starts = rng.integers(0, len(steps) - block + 1, size=(n_paths, n_blocks))
+        step_idx = (starts[:, :, None] + np.arange(block)).reshape(n_paths, -1)
+        step_idx = step_idx[:, : len(steps)]
+
+        first = np.zeros((n_paths, 1), dtype=np.int64)
+        rows = np.concatenate([first, step_idx + 1], axis=1)
+        ticks = self.swaps.ticks[0] + np.concatenate(
+            [first, np.cumsum(steps[step_idx], axis=1)], axis=1
+        )
+        return _batch_from_ticks(self.swaps, ticks, rows)
+
+
+class RandomWalk(PathGenerator):
+    """
+    Simulate Gaussian tick random walks on the timeline of a template series.
+
+    Volume and liquidity are taken from the template row at the same position.
+    """
+
+    swaps: SwapArrays
+    tick_volatility: float = Field(gt=0)
+    drift: float = 0.0
+
+    def generate(self, n_paths: int, rng: np.random.Generator) -> PathBatch:
+        n_swaps = len(self.swaps)
+        moves = rng.normal(self.drift, self.tick_volatility, size=(n_paths, n_swaps))
+        moves[:, 0] = 0.0
+        ticks = self.swaps.ticks[0] + np.rint(np.cumsum(moves, axis=1)).astype(np.int64)
+        rows = np.broadcast_to(np.arange(n_swaps), (n_paths, n_swaps))
+        return _batch_from_ticks(self.swaps, ticks, rows)
+
+
+def _batch_from_ticks(
+    swaps: SwapArrays, ticks: np.ndarray, rows: np.ndarray
+) -> PathBatch:
+    sqrt_ratio = tick_to_sqrt_price_array(ticks - swaps.ticks[0])
+    return PathBatch(
+        ticks=ticks,
+        volume_token0=swaps.volume_token0[rows],
+        volume_token1=swaps.volume_token1[rows],
+        liquidity=swaps.liquidity[rows],
+        sqrt_price_x96=swaps.sqrt_price_x96[0] * sqrt_ratio,
+        timestamps=swaps.timestamps,
+    )
+
+
+class MonteCarloResult(BaseModel):
+    """Per-path `BacktestResult` metrics, as float64 arrays of shape (paths,)."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    total_fees_token0: np.ndarray
+    total_fees_token1: np.ndarray
+    apr: np.ndarray
+
+    @property
+    def n_paths(self) -> int:
+        return len(self.apr)
+
+    def results(self) -> list[BacktestResult]:
+        return [
+            BacktestResult(
+                total_fees_token0=Decimal(repr(fee0)),
+                total_fees_token1=Decimal(repr(fee1)),
+                apr=Decimal(repr(apr)),
+            )
+            for fee0, fee1, apr in zip(
+                self.total_fees_token0.tolist(),
+                self.total_fees_token1.tolist(),
+                self.apr.tolist(),
+            )
+        ]
+
+    def quantiles(self, q: list[float]) -> dict[str, np.ndarray]:
+        return {
+            "total_fees_token0": np.quantile(self.total_fees_token0, q),
+            "total_fees_token1": np.quantile(self.total_fees_token1, q),
+            "apr": np.quantile(self.apr, q),
+        }
+
+    @classmethod
+    def concatenate(cls, parts: list["MonteCarloResult"]) -> "MonteCarloResult":
+        return cls(
+            total_fees_token0=np.concatenate([p.total_fees_token0 for p in parts]),
+            total_fees_token1=np.concatenate([p.total_fees_token1 for p in parts]),
+            apr=np.concatenate([p.apr for p in parts]),
+        )
+
+
+class MonteCarloRunner:
+    """
+    Evaluate one strategy over many price paths at once.
+
+    Without a rebalancer the whole (paths × swaps) batch is reduced in one
+    vectorized pass; with one of the built-in rebalancers the swaps are scanned
+    in order while every path advances together. Paths are generated and
+    evaluated `chunk_size` at a time so memory stays bounded.
+
+    Time-based rebalancer state follows simulated swap timestamps.
+    """
+
+    def __init__(
+        self,
+        position: Position,
+        rebalance_bias: float,
+        created_at: datetime | None = None,
+        rebalancer: RebalancingStrategy | None = None,
+        chunk_size: int = 256,
+    ):
+        if not 0.0 <= rebalance_bias <= 1.0:
+            raise ValueError("Bias must be between 0.0 and 1.0")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.encoded_rebalancer = _EncodedRebalancer(rebalancer)
+
+        self.position = position
+        self.rebalance_bias = rebalance_bias
+        self.created_at = created_at
+        self.rebalancer = rebalancer
+        self.chunk_size = chunk_size
+
+    def run(
+        self, generator: PathGenerator, n_paths: int, seed: int | None = None
+    ) -> MonteCarloResult:
+        if n_paths < 1:
+            raise ValueError("n_paths must be positive")
+        n_chunks = -(-n_paths // self.chunk_size)
+        seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+        parts = []
+        for i, chunk_seed in enumerate(seeds):
+            size = min(self.chunk_size, n_paths - i * self.chunk_size)
+            batch = generator.generate(size, np.random.default_rng(chunk_seed))
+            parts.append(self.run_batch(batch))
+        return MonteCarloResult.concatenate(parts)
+
+    def run_batch(self, batch: PathBatch) -> MonteCarloResult:
+        n_paths = batch.n_paths
+        amount0 = float(self.position.amount0)
+        amount1 = float(self.position.amount1)
+        fee_rate = float(self.position.pool.fee)
+
+        lower = np.full(n_paths, self.position.tick_lower, dtype=np.int64)
+        upper = np.full(n_paths, self.position.tick_upper, dtype=np.int64)
+        liquidity = compute_liquidity_from_amounts_array(lower, upper, amount0, amount1)
+
+        if self.rebalancer is None:
+            active = (lower[:, None] <= batch.ticks) & (batch.ticks <= upper[:, None])
+            share = np.where(active, _share(liquidity[:, None], batch.liquidity), 0.0)
+            fees0 = (share * batch.volume_token0).sum(axis=1) * fee_rate
+            fees1 = (share * batch.volume_token1).sum(axis=1) * fee_rate
+        else:
+            fees0, fees1 = self._scan(batch, lower, upper, liquidity, amount0, amount1)
+            fees0 *= fee_rate
+            fees1 *= fee_rate
+
+        return MonteCarloResult(
+            total_fees_token0=fees0,
+            total_fees_token1=fees1,
+            apr=self._apr(batch, amount0, amount1, fees0, fees1),
+        )
+
+    def _scan(
+        self,
+        batch: PathBatch,
+        lower: np.ndarray,
+        upper: np.ndarray,
+        liquidity: np.ndarray,
+        amount0: float,
+        amount1: float,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        timestamps = batch.timestamps.astype("datetime64[us]").astype(np.int64)
+        created_at = (
+            int(np.datetime64(self.created_at, "us").astype(np.int64))
+            if self.created_at is not None
+            else int(timestamps[0])
+        )
+        encoded = self.encoded_rebalancer
+        state = encoded.initial_state(batch.n_paths)
+
+        fees0 = np.zeros(batch.n_paths)
+        fees1 = np.zeros(batch.n_paths)
+        for j in range(batch.n_swaps):
+            tick = batch.ticks[:, j]
+            timestamp = timestamps[j]
+
+            mask = encoded.check(state, tick, timestamp, lower, upper, created_at)
+            if mask.any():
+                encoded.on_rebalance(state, mask, timestamp)
+                width = upper[mask] - lower[mask]
+                left = (width * self.rebalance_bias).astype(np.int64)
+                lower[mask] = tick[mask] - left
+                upper[mask] = tick[mask] + width - left
+                liquidity[mask] = compute_liquidity_from_amounts_array(
+                    lower[mask], upper[mask], amount0, amount1
+                )
+
+            active = (lower <= tick) & (tick <= upper)
+            share = np.where(active, _share(liquidity, batch.liquidity[:, j]), 0.0)
+            fees0 += share * batch.volume_token0[:, j]
+            fees1 += share * batch.volume_token1[:, j]
+        return fees0, fees1
+
+    def _apr(
+        self,
+        batch: PathBatch,
+        amount0: float,
+        amount1: float,
+        fees0: np.ndarray,
+        fees1: np.ndarray,
+    ) -> np.ndarray:
+        price0_start = batch.sqrt_price_x96[:, 0] ** 2
+        price0_end = batch.sqrt_price_x96[:, -1] ** 2
+        duration = (
+            int((batch.timestamps[-1] - batch.timestamps[0]) // np.timedelta64(1, "D"))
+            or 1
+        )
+
+        usd_start = amount0 * price0_start + amount1
+        usd_end = (amount0 + fees0) * price0_end + (amount1 + fees1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            apr = (usd_end / usd_start - 1) * 365 / duration * 100
+        return np.where(usd_start == 0, 0.0, apr)
+
+
+class _EncodedRebalancer:
+    """
+    A rebalancer encoded for the kernel's `rebalance_check`, per path. A
+    MultiConditionRebalancer nesting others is kept as a tree whose leaves
+    are flat encodings, combined here.
+    """
+
+    def __init__(self, rebalancer: RebalancingStrategy | None):
+        self.children: list[_EncodedRebalancer] = []
+        self.flat = None
+        if type(rebalancer) is MultiConditionRebalancer and any(
+            type(s) is MultiConditionRebalancer for s in rebalancer.strategies
+        ):
+            self.mode = rebalancer.mode
+            self.children = [_EncodedRebalancer(s) for s in rebalancer.strategies]
+        else:
+            self.flat = encode_rebalancer(rebalancer)
+
+    def initial_state(self, n_paths: int):
+        if self.flat is None:
+            return [child.initial_state(n_paths) for child in self.children]
+        return np.repeat(self.flat[2][:, None], n_paths, axis=1)
+
+    def check(self, state, tick, timestamp, lower, upper, created_at) -> np.ndarray:
+        if self.flat is not None:
+            kinds, params, _, mode = self.flat
+            return rebalance_check(
+                kinds, params, state, mode, tick, timestamp, lower, upper, created_at
+            )
+        checks = [
+            child.check(s, tick, timestamp, lower, upper, created_at)
+            for child, s in zip(self.children, state)
+        ]
+        if self.mode == LogicMode.AND:
+            return np.logical_and.reduce(checks)
+        return np.logical_or.reduce(checks)
+
+    def on_rebalance(self, state, fired: np.ndarray, timestamp: int) -> None:
+        if self.flat is None:
+            self.children[0].on_rebalance(state[0], fired, timestamp)
+        else:
+            on_rebalance(self.flat[0], state, fired, timestamp)
+
+
+def _share(position_liquidity: np.ndarray, swap_liquidity: np.ndarray) -> np.ndarray:
+    total = swap_liquidity + position_liquidity
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, position_liquidity / total, 0.0)
@@ -0,0 +1,288 @@
+import heapq
+import math
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import chain
+from operator import itemgetter
+from typing import Annotated, Iterable, Iterator
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field
+
+from lobster_assessment.application.algo import ActivityTracker, FeeCalculator
+from lobster_assessment.application.core import BacktestSimulation
+from lobster_assessment.application.math import (
+    sqrt_price_at_tick,
+    token_amounts_at_sqrt_price,
+)
+from lobster_assessment.application.rebalancing import RebalancingStrategy
+from lobster_assessment.domain.models import Position, Swap
+
+
+class PortfolioLeg(BaseModel):
+    """
+    One pool position of a portfolio. Leg values are in token1 of the pool
+    times `token1_price`, the price of that token in the portfolio's unit.
+    """
+
+    position: Position
+    rebalancer: RebalancingStrategy | None = None
+    rebalance_bias: Annotated[float, Field(ge=0.0, le=1.0)] = 0.5
+    target_weight: Annotated[float, Field(ge=0.0)] | None = None
+    token1_price: Annotated[float, Field(gt=0.0)] = 1.0
+
+
+class LegResult(BaseModel):
+    pool: str
+    swaps: int
+    total_fees_token0: Decimal
+    total_fees_token1: Decimal
+    tick_lower: int
+    tick_upper: int
+    initial_value: float
+    final_value: float
+
+
+class PortfolioResult(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    initial_value: float
+    final_value: float
+    total_return: float
+    max_drawdown: float
+    reallocations: int
+    legs: list[LegResult]
+    timestamps: np.ndarray
+    values: np.ndarray
+
+
+class PortfolioState:
+    """Live view of the portfolio, updated after every merged swap."""
+
+    def __init__(self, leg_values: list[float]):
+        self.timestamp: datetime | None = None
+        self.leg_values = leg_values
+        self.total_value = math.fsum(leg_values)
+        self.peak_value = self.total_value
+        self.max_drawdown = 0.0
+
+    def update(self, leg: int, value: float, timestamp: datetime) -> None:
+        self.total_value += value - self.leg_values[leg]
+        self.leg_values[leg] = value
+        self.timestamp = timestamp
+        self.peak_value = max(self.peak_value, self.total_value)
+        if self.peak_value > 0:
+            drawdown = self.total_value / self.peak_value - 1
+            self.max_drawdown = min(self.max_drawdown, drawdown)
+
+    def reset(self, leg_values: list[float]) -> None:
+        """Replace every leg value at once, e.g. after a reallocation."""
+        self.leg_values = leg_values
+        self.total_value = math.fsum(leg_values)
+
+
+class _Leg:
+    """A leg's simulation, stepped one swap at a time without history."""
+
+    def __init__(self, config: PortfolioLeg, first_swap: Swap):
+        position = config.position
+        self.config = config
+        self.simulation = BacktestSimulation(
+            position=position,
+            tracker=ActivityTracker(position=position),
+            calculator=FeeCalculator(position=position),
+            rebalance_bias=config.rebalance_bias,
+            rebalancer=config.rebalancer,
+        )
+        self.position = self.simulation.position
+        self.tick = first_swap.tick
+        self.swaps = 0
+        # Fees earned since the last reallocation folded them into the position.
+        self.fees0 = 0.0
+        self.fees1 = 0.0
+        self._liquidity_key: tuple | None = None
+        self._liquidity = 0.0
+        self._sqrt_range = (0.0, 0.0)
+        self.initial_value = self.value()
+
+    def step(self, swap: Swap) -> float:
+        is_active, fee = self.simulation.step(swap)
+        if is_active:
+            self.fees0 += float(fee.token0)
+            self.fees1 += float(fee.token1)
+        self.tick = swap.tick
+        self.swaps += 1
+        return self.value()
+
+    def value(self) -> float:
+        lp0, lp1, price = self._holdings()
+        return (
+            (lp0 + self.fees0) * price + lp1 + self.fees1
+        ) * self.config.token1_price
+
+    def lp_value(self) -> float:
+        """Value of the position itself, without the fees earned on it."""
+        lp0, lp1, price = self._holdings()
+        return (lp0 * price + lp1) * self.config.token1_price
+
+    def resize(self, target_value: float) -> None:
+        """Fold earned fees into capital and scale the position to `target_value`."""
+        scale = Decimal(repr(target_value / self.lp_value()))
+        self.position.amount0 *= scale
+        self.position.amount1 *= scale
+        self.fees0 = self.fees1 = 0.0
+
+    def _holdings(self) -> tuple[float, float, float]:
+        position = self.position
+        key = (
+            position.tick_lower,
+            position.tick_upper,
+            position.amount0,
+            position.amount1,
+        )
+        if key != self._liquidity_key:
+            self._liquidity = float(position.liquidity)
+            self._sqrt_range = (
+                float(sqrt_price_at_tick(position.tick_lower)),
+                float(sqrt_price_at_tick(position.tick_upper)),
+            )
+            self._liquidity_key = key
+
+        sqrt_price = float(sqrt_price_at_tick(self.tick))
+        amount0, amount1 = token_amounts_at_sqrt_price(
+            self._liquidity, sqrt_price, *self._sqrt_range
+        )
+        return float(amount0), float(amount1), sqrt_price**2
+
+    def result(self) -> LegResult:
+        fees = self.simulation.total_fees
+        return LegResult(
+            pool=self.position.pool.address,
+            swaps=self.swaps,
+            total_fees_token0=fees.token0,
+            total_fees_token1=fees.token1,
+            tick_lower=self.position.tick_lower,
+            tick_upper=self.position.tick_upper,
+            initial_value=self.initial_value,
+            final_value=self.value(),
+        )
+
+
+class PortfolioBacktestRunner:
+    """
+    Backtest positions in many pools as one portfolio.
+
+    The per-pool swap streams are merged in timestamp order with a lazy
+    k-way heap merge, so only the next swap of each stream is held (plus
+    whatever chunk the stream itself buffers, e.g. SwapSource.iter_swaps).
+    Each swap steps its leg's simulation and updates the shared
+    PortfolioState. Swaps with equal timestamps are applied in leg order.
+
+    Legs are valued with the same formulas as `compute_value_timeseries`,
+    from the first tick of their stream until their first swap. With
+    `reallocate_every`, capital is moved between legs at that interval of
+    swap time so that each leg holds its `target_weight` of the total; the
+    leg's earned fees are reinvested in the process. `sample_interval`
+    thins the recorded value series; drawdown is tracked on every swap.
+    """
+
+    def __init__(
+        self,
+        legs: list[PortfolioLeg],
+        streams: list[Iterable[Swap]],
+        reallocate_every: timedelta | None = None,
+        sample_interval: timedelta | None = None,
+    ):
+        if len(legs) != len(streams):
+            raise ValueError("Each leg must have a corresponding swap stream.")
+        if reallocate_every is not None:
+            if any(leg.target_weight is None for leg in legs):
+                raise ValueError("Reallocation needs a target_weight on every leg.")
+            if not sum(leg.target_weight for leg in legs) > 0:
+                raise ValueError("Target weights must not all be zero.")
+        self.legs = legs
+        self.streams = streams
+        self.reallocate_every = reallocate_every
+        self.sample_interval = sample_interval
+        self.state: PortfolioState
+
+    def run(self) -> PortfolioResult:
+        legs: list[_Leg] = []
+        tagged: list[Iterator[tuple[datetime, int, Swap]]] = []
+        for i, (config, stream) in enumerate(zip(self.legs, self.streams)):
+            swaps = iter(stream)
+            first = next(swaps, None)
+            if first is None:
+                raise ValueError(f"Leg {i} has no swaps.")
+            legs.append(_Leg(config, first))
+            tagged.append(_tag(i, chain([first], swaps)))
+
+        self.state = state = PortfolioState([leg.value() for leg in legs])
+        initial_value = state.total_value
+        timestamps: list[datetime] = []
+        values: list[float] = []
+        next_sample: datetime | None = None
+        next_reallocation: datetime | None = None
+        reallocations = 0
+        recorded = True
+
+        for timestamp, i, swap in heapq.merge(*tagged, key=itemgetter(0)):
+            if self.reallocate_every is not None:
+                if next_reallocation is None:
+                    next_reallocation = timestamp + self.reallocate_every
+                elif timestamp >= next_reallocation:
+                    self._reallocate(legs)
+                    reallocations += 1
+                    while next_reallocation <= timestamp:
+                        next_reallocation += self.reallocate_every
+
+            state.update(i, legs[i].step(swap), timestamp)
+
+            recorded = next_sample is None or timestamp >= next_sample
+            if recorded:
+                timestamps.append(timestamp)
+                values.append(state.total_value)
+                if self.sample_interval is not None:
+                    next_sample = timestamp + self.sample_interval
+
+        if not recorded:
+            timestamps.append(state.timestamp)
+            values.append(state.total_value)
+
+        return PortfolioResult(
+            initial_value=initial_value,
+            final_value=state.total_value,
+            total_return=state.total_value / initial_value - 1
+            if initial_value
+            else 0.0,
+            max_drawdown=state.max_drawdown,
+            reallocations=reallocations,
+            legs=[leg.result() for leg in legs],
+            timestamps=np.array(timestamps, dtype="datetime64[us]"),
+            values=np.array(values, dtype=np.float64),
+        )
+
+    def _reallocate(self, legs: list[_Leg]) -> None:
+        # An empty position cannot be scaled up: such legs hand their fees to
+        # the others, which share the whole total, so no value is created or
+        # lost. Without a weighted leg to receive it, nothing moves.
+        total = math.fsum(leg.value() for leg in legs)
+        sized = [leg.lp_value() > 0 for leg in legs]
+        weight_sum = sum(leg.config.target_weight for leg, ok in zip(legs, sized) if ok)
+        if not weight_sum > 0:
+            return
+        for leg, ok in zip(legs, sized):
+            if ok:
+                leg.resize(total * leg.config.target_weight / weight_sum)
+            else:
+                leg.fees0 = leg.fees1 = 0.0
+        self.state.reset([leg.value() for leg in legs])
+
+
+def _tag(leg: int, swaps: Iterator[Swap]) -> Iterator[tuple[datetime, int, Swap]]:
+    previous: datetime | None = None
+    for swap in swaps:
+        if previous is not None and swap.timestamp < previous:
+            raise ValueError(f"Swaps of leg {leg} are not in timestamp order.")
+        previous = swap.timestamp
+        yield swap.timestamp, leg, swap
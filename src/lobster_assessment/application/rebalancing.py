@@ -1,11 +1,53 @@
+import functools
+import inspect
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Annotated, List
 
-from pydantic import BaseModel, Field, field_validator, validate_call
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    field_validator,
+)
+
+from lobster_assessment.domain.validation import validated_call
+
+
+class RebalancerState(BaseModel):
+    """
+    Mutable per-run state of a rebalancing strategy, driven by swap timestamps.
+
+    Obtain one from `strategy.initial_state()`; composite strategies keep the
+    states of their sub-strategies in `children`, in order.
+    """
+
+    last_rebalanced_at: datetime | None = None
+    out_of_range_since: datetime | None = None
+    children: list["RebalancerState"] = []
 
 
 class RebalancingStrategy(BaseModel):
+    """
+    Immutable rebalancing configuration.
+
+    Runners pass a per-run `state` (see `initial_state`) and the swap
+    `timestamp` to `should_rebalance` and `rebalance`, so one strategy can be
+    shared by concurrent and repeated runs. Strategies that keep run state
+    raise if called without one; time-triggered rebalancing also needs the
+    timestamp, so results never depend on the wall clock.
+
+    Migrating from the stateless calls: create `state = strategy.initial_state()`
+    once per run and pass `state=state, timestamp=swap.timestamp` to every
+    call. The former `last_rebalanced_at` and `out_of_range_since` fields are
+    seeded on that state instead; passing them to a strategy is an error.
+    """
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    def initial_state(self) -> RebalancerState:
+        return RebalancerState()
+
     def should_rebalance(
         self,
         tick: int,
@@ -13,23 +55,32 @@ class RebalancingStrategy(BaseModel):
         tick_lower: int,
         tick_upper: int,
         created_at: datetime,
+        state: RebalancerState | None = None,
     ) -> bool:
         raise NotImplementedError
 
-    @validate_call
+    @validated_call
     def rebalance(
         self,
         tick: int,
         tick_lower: int,
         tick_upper: int,
         bias: Annotated[float, Field(ge=0.0, le=1.0)],
+        state: RebalancerState | None = None,
+        timestamp: datetime | None = None,
     ) -> tuple[int, int]:
         raise NotImplementedError
 
+    def _resolve(self, state: RebalancerState | None) -> RebalancerState:
+        if state is None:
+            raise ValueError(
+                f"{type(self).__name__} needs a state from initial_state()"
+            )
+        return state
+
 
 class TimeTriggeredRebalancer(RebalancingStrategy):
     interval: timedelta
-    last_rebalanced_at: datetime | None = None
 
     @field_validator("interval")
     @classmethod
@@ -45,16 +96,27 @@ class TimeTriggeredRebalancer(RebalancingStrategy):
         tick_lower: int,
         tick_upper: int,
         created_at: datetime,
+        state: RebalancerState | None = None,
     ) -> bool:
         check_tick_upper_greater_than_lower(tick_lower, tick_upper)
-        reference_time = self.last_rebalanced_at or created_at
+        state = self._resolve(state)
+        reference_time = state.last_rebalanced_at or created_at
         return (timestamp - reference_time) >= self.interval
 
     def rebalance(
-        self, tick: int, tick_lower: int, tick_upper: int, bias: float
+        self,
+        tick: int,
+        tick_lower: int,
+        tick_upper: int,
+        bias: float,
+        state: RebalancerState | None = None,
+        timestamp: datetime | None = None,
     ) -> tuple[int, int]:
         check_tick_upper_greater_than_lower(tick_lower, tick_upper)
-        self.last_rebalanced_at = datetime.now()
+        state = self._resolve(state)
+        if timestamp is None:
+            raise ValueError(f"{type(self).__name__} needs the swap timestamp")
+        state.last_rebalanced_at = timestamp
         width = tick_upper - tick_lower
         return compute_tick_range(tick, width, bias)
 
@@ -67,12 +129,19 @@ class OutOfRangeRebalancer(RebalancingStrategy):
         tick_lower: int,
         tick_upper: int,
         created_at: datetime,
+        state: RebalancerState | None = None,
     ) -> bool:
         check_tick_upper_greater_than_lower(tick_lower, tick_upper)
         return not (tick_lower <= tick <= tick_upper)
 
     def rebalance(
-        self, tick: int, tick_lower: int, tick_upper: int, bias: float
+        self,
+        tick: int,
+        tick_lower: int,
+        tick_upper: int,
+        bias: float,
+        state: RebalancerState | None = None,
+        timestamp: datetime | None = None,
     ) -> tuple[int, int]:
         check_tick_upper_greater_than_lower(tick_lower, tick_upper)
         width = tick_upper - tick_lower
@@ -81,7 +150,6 @@ class OutOfRangeRebalancer(RebalancingStrategy):
 
 class OutOfRangeDurationRebalancer(RebalancingStrategy):
     duration: timedelta
-    out_of_range_since: datetime | None = None
 
     def should_rebalance(
         self,
@@ -90,21 +158,29 @@ class OutOfRangeDurationRebalancer(RebalancingStrategy):
         tick_lower: int,
         tick_upper: int,
         created_at: datetime,
+        state: RebalancerState | None = None,
     ) -> bool:
         check_tick_upper_greater_than_lower(tick_lower, tick_upper)
+        state = self._resolve(state)
         in_range = tick_lower <= tick <= tick_upper
 
         if in_range:
-            self.out_of_range_since = None
+            state.out_of_range_since = None
             return False
-        reference_time = self.out_of_range_since or created_at
+        reference_time = state.out_of_range_since or created_at
         return (timestamp - reference_time) >= self.duration
 
     def rebalance(
-        self, tick: int, tick_lower: int, tick_upper: int, bias: float
+        self,
+        tick: int,
+        tick_lower: int,
+        tick_upper: int,
+        bias: float,
+        state: RebalancerState | None = None,
+        timestamp: datetime | None = None,
     ) -> tuple[int, int]:
         check_tick_upper_greater_than_lower(tick_lower, tick_upper)
-        self.out_of_range_since = None
+        self._resolve(state).out_of_range_since = None
         width = tick_upper - tick_lower
         return compute_tick_range(tick, width, bias)
 
@@ -118,6 +194,9 @@ class MultiConditionRebalancer(RebalancingStrategy):
     strategies: List[RebalancingStrategy]
     mode: LogicMode
 
+    def initial_state(self) -> RebalancerState:
+        return RebalancerState(children=[s.initial_state() for s in self.strategies])
+
     def should_rebalance(
         self,
         tick: int,
@@ -125,21 +204,93 @@ class MultiConditionRebalancer(RebalancingStrategy):
         tick_lower: int,
         tick_upper: int,
         created_at: datetime,
+        state: RebalancerState | None = None,
     ) -> bool:
         check_tick_upper_greater_than_lower(tick_lower, tick_upper)
         if not self.strategies:
             return False
+        children = state.children if state else [None] * len(self.strategies)
         checks = [
-            s.should_rebalance(tick, timestamp, tick_lower, tick_upper, created_at)
-            for s in self.strategies
+            s.should_rebalance(
+                tick=tick,
+                timestamp=timestamp,
+                tick_lower=tick_lower,
+                tick_upper=tick_upper,
+                created_at=created_at,
+                **_supported(s.should_rebalance, state=c),
+            )
+            for s, c in zip(self.strategies, children)
         ]
         return all(checks) if self.mode == LogicMode.AND else any(checks)
 
     def rebalance(
-        self, tick: int, tick_lower: int, tick_upper: int, bias: float
+        self,
+        tick: int,
+        tick_lower: int,
+        tick_upper: int,
+        bias: float,
+        state: RebalancerState | None = None,
+        timestamp: datetime | None = None,
     ) -> tuple[int, int]:
         check_tick_upper_greater_than_lower(tick_lower, tick_upper)
-        return self.strategies[0].rebalance(tick, tick_lower, tick_upper, bias)
+        child = state.children[0] if state else None
+        strategy = self.strategies[0]
+        return strategy.rebalance(
+            tick=tick,
+            tick_lower=tick_lower,
+            tick_upper=tick_upper,
+            bias=bias,
+            **_supported(strategy.rebalance, state=child, timestamp=timestamp),
+        )
+
+
+def next_tick_range(
+    rebalancer: RebalancingStrategy | None,
+    state: RebalancerState | None,
+    tick: int,
+    timestamp: datetime,
+    tick_lower: int,
+    tick_upper: int,
+    created_at: datetime,
+    bias: float,
+) -> tuple[int, int]:
+    """The position's range after the rebalancer's check at one swap."""
+    if rebalancer is None or not rebalancer.should_rebalance(
+        tick=tick,
+        timestamp=timestamp,
+        tick_lower=tick_lower,
+        tick_upper=tick_upper,
+        created_at=created_at,
+        **_supported(rebalancer.should_rebalance, state=state),
+    ):
+        return tick_lower, tick_upper
+    return tuple(
+        rebalancer.rebalance(
+            tick=tick,
+            tick_lower=tick_lower,
+            tick_upper=tick_upper,
+            bias=bias,
+            **_supported(rebalancer.rebalance, state=state, timestamp=timestamp),
+        )
+    )
+
+
+def _supported(method, **arguments) -> dict:
+    """
+    The `arguments` that `method` accepts, so that subclasses written against
+    the stateless signatures, without `state` and `timestamp`, keep working.
+    """
+    names = _parameter_names(getattr(method, "__func__", method))
+    return {k: v for k, v in arguments.items() if names is None or k in names}
+
+
+@functools.cache
+def _parameter_names(function) -> frozenset[str] | None:
+    """Parameter names of `function`, or None if it takes **kwargs."""
+    parameters = inspect.signature(function).parameters.values()
+    if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters):
+        return None
+    return frozenset(p.name for p in parameters)
 
 
 def compute_tick_range(tick: int, width: int, bias: float) -> tuple[int, int]:
@@ -0,0 +1,344 @@
+import os
+import shutil
+import time
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from lobster_assessment.application.algo import (
+    ActivityTimeseries,
+    Fee,
+    FeeTimeseries,
+)
+from lobster_assessment.application.core import BacktestResult, BacktestRunner
+
+RESULT_COLUMNS = (
+    "total_fees_token0",
+    "total_fees_token1",
+    "apr",
+    "impermanent_loss",
+    "max_drawdown",
+)
+
+# Staging directories left this long by a crashed writer are removed on open.
+STALE_STAGING_SECONDS = 3600
+
+
+class RunSeries(BaseModel):
+    """Per-swap series of one stored run, as arrays."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    timestamps: np.ndarray
+    activity: np.ndarray
+    fees_token0: np.ndarray
+    fees_token1: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def to_timeseries(self) -> tuple[ActivityTimeseries, FeeTimeseries]:
+        timestamps = self.timestamps.astype("datetime64[us]").tolist()
+        fees = [
+            Fee(token0=Decimal(repr(f0)), token1=Decimal(repr(f1)))
+            for f0, f1 in zip(self.fees_token0.tolist(), self.fees_token1.tolist())
+        ]
+        return (
+            ActivityTimeseries(timestamps=timestamps, activity=self.activity.tolist()),
+            FeeTimeseries(timestamps=timestamps, fees=fees),
+        )
+
+
+class _Pending:
+    def __init__(self):
+        self.keys: list[str] = []
+        self.metrics: dict[str, list[float]] = {name: [] for name in RESULT_COLUMNS}
+        self.lengths: list[int] = []
+        self.activity: list[np.ndarray] = []
+        self.timestamps: list[np.ndarray] = []
+        self.fees0: list[np.ndarray] = []
+        self.fees1: list[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class ResultStore:
+    """
+    Append-only columnar store of backtest results, keyed by config hash.
+
+    Appended runs are buffered and written `partition_size` at a time as a
+    partition: a directory of .npy columns holding one row per run (config
+    hash and result metrics, NaN where a metric is None) and the runs' series
+    concatenated with offsets. Activity is bit-packed, fees are float64 and
+    timestamps int64 microseconds. Partitions are memory-mapped on read, so
+    ranking reads only the metric columns it needs and a run's series is
+    read when asked for.
+
+    Queries see flushed rows only; call `flush` (or use the store as a
+    context manager) after appending. A key appended twice resolves to its
+    latest row, and `filter` and `top_k` skip the rows it superseded.
+    Several stores may append to one directory: each flush claims the next
+    free partition name with an atomic rename and then sees every partition
+    written so far.
+    """
+
+    def __init__(self, path: str | Path, partition_size: int = 65536):
+        if partition_size < 1:
+            raise ValueError("partition_size must be positive")
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.partition_size = partition_size
+
+        self._pending = _Pending()
+        self._partitions: list[Path] = self._scan()
+        self._mapped: dict[tuple[Path, str], np.ndarray] = {}
+        self._columns: dict[str, np.ndarray] = {}
+        self._starts: np.ndarray | None = None
+        self._index: dict[str, int] | None = None
+        self._latest: np.ndarray | None = None
+        self._remove_stale_staging()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.flush()
+
+    def __len__(self) -> int:
+        return int(self._partition_starts()[-1])
+
+    def __contains__(self, key: str) -> bool:
+        return self.row(key) is not None
+
+    @property
+    def partitions(self) -> int:
+        return len(self._partitions)
+
+    def append(
+        self,
+        key: str,
+        result: BacktestResult,
+        activity_series: ActivityTimeseries | None = None,
+        fee_series: FeeTimeseries | None = None,
+    ) -> None:
+        pending = self._pending
+        pending.keys.append(key)
+        for name in RESULT_COLUMNS:
+            value = getattr(result, name)
+            pending.metrics[name].append(np.nan if value is None else float(value))
+
+        if activity_series is None and fee_series is None:
+            pending.lengths.append(0)
+        else:
+            if activity_series is None or fee_series is None:
+                raise ValueError("Store both the activity and the fee series, or none.")
+            if len(activity_series.activity) != len(fee_series.fees):
+                raise ValueError("Activity and fee series differ in length.")
+            pending.lengths.append(len(fee_series.fees))
+            pending.activity.append(
+                np.packbits(np.array(activity_series.activity, dtype=bool))
+            )
+            pending.timestamps.append(
+                np.array(fee_series.timestamps, dtype="datetime64[us]").view(np.int64)
+            )
+            pending.fees0.append(
+                np.array([float(f.token0) for f in fee_series.fees], dtype=np.float64)
+            )
+            pending.fees1.append(
+                np.array([float(f.token1) for f in fee_series.fees], dtype=np.float64)
+            )
+
+        if len(pending) >= self.partition_size:
+            self.flush()
+
+    def append_run(self, runner: BacktestRunner, result: BacktestResult) -> None:
+        """Append the result of `runner.run()`, with its series if it simulated."""
+        self.append(
+            runner.cache_key(),
+            result,
+            getattr(runner, "activity_series", None),
+            getattr(runner, "fee_series", None),
+        )
+
+    def flush(self) -> None:
+        pending = self._pending
+        if not len(pending):
+            return
+        lengths = np.array(pending.lengths, dtype=np.int64)
+        columns = {
+            "keys": np.array(pending.keys, dtype=np.str_),
+            "series_offsets": _offsets(lengths),
+            "activity_offsets": _offsets((lengths + 7) // 8),
+            "activity": _concat(pending.activity, np.uint8),
+            "timestamps": _concat(pending.timestamps, np.int64),
+            "fees_token0": _concat(pending.fees0, np.float64),
+            "fees_token1": _concat(pending.fees1, np.float64),
+        }
+        for name in RESULT_COLUMNS:
+            columns[name] = np.array(pending.metrics[name], dtype=np.float64)
+
+        staging = self.path / f".staging-{uuid.uuid4().hex}"
+        staging.mkdir()
+        for name, array in columns.items():
+            np.save(staging / f"{name}.npy", array)
+        self._publish(staging)
+
+        self._partitions = self._scan()
+        self._pending = _Pending()
+        self._columns.clear()
+        self._starts = None
+        self._index = None
+        self._latest = None
+
+    def _publish(self, staging: Path) -> None:
+        # Renaming onto an existing partition fails, so concurrent writers
+        # never share a name; the loser retries with the next free index.
+        while True:
+            parts = self._scan()
+            index = _partition_index(parts[-1]) + 1 if parts else 0
+            final = self.path / f"part-{index:06d}"
+            try:
+                os.rename(staging, final)
+                return
+            except OSError:
+                if not final.exists():
+                    raise
+
+    def _scan(self) -> list[Path]:
+        return sorted(self.path.glob("part-*"), key=_partition_index)
+
+    def _remove_stale_staging(self) -> None:
+        cutoff = time.time() - STALE_STAGING_SECONDS
+        for staging in self.path.glob(".staging-*"):
+            try:
+                if staging.stat().st_mtime < cutoff:
+                    shutil.rmtree(staging, ignore_errors=True)
+            except FileNotFoundError:
+                pass
+
+    def column(self, name: str) -> np.ndarray:
+        """One metric (or "keys") for every stored row, in row order."""
+        if name not in RESULT_COLUMNS and name != "keys":
+            raise KeyError(f"Unknown column {name!r}")
+        if name not in self._columns:
+            parts = [self._map(p, name) for p in range(len(self._partitions))]
+            empty = np.empty(0, dtype=np.str_ if name == "keys" else np.float64)
+            self._columns[name] = np.concatenate(parts) if parts else empty
+        return self._columns[name]
+
+    def filter(self, **bounds: tuple[float | None, float | None]) -> np.ndarray:
+        """
+        Rows whose metrics lie within inclusive `(low, high)` bounds, e.g.
+        `filter(apr=(0.1, None), max_drawdown=(None, 0.2))`. NaN never matches.
+        """
+        mask = self._latest_rows().copy()
+        for name, (low, high) in bounds.items():
+            values = self.column(name)
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        return np.flatnonzero(mask)
+
+    def top_k(
+        self,
+        column: str,
+        k: int,
+        largest: bool = True,
+        rows: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Rows with the `k` best values of `column`, best first; NaN ranks last."""
+        if rows is None and not self._latest_rows().all():
+            rows = np.flatnonzero(self._latest_rows())
+        values = self.column(column)
+        if rows is not None:
+            values = values[rows]
+        scores = -values if largest else values.copy()
+        scores[np.isnan(scores)] = np.inf
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        best = np.argpartition(scores, k - 1)[:k]
+        best = best[np.argsort(scores[best], kind="stable")]
+        return best if rows is None else np.asarray(rows)[best]
+
+    def key(self, row: int) -> str:
+        return str(self.column("keys")[row])
+
+    def row(self, key: str) -> int | None:
+        if self._index is None:
+            self._index = {k: i for i, k in enumerate(self.column("keys").tolist())}
+        return self._index.get(key)
+
+    def result(self, row: int) -> BacktestResult:
+        partition, local = self._locate(row)
+        values = {}
+        for name in RESULT_COLUMNS:
+            value = float(self._map(partition, name)[local])
+            values[name] = None if np.isnan(value) else Decimal(repr(value))
+        return BacktestResult(**values)
+
+    def series(self, row: int) -> RunSeries | None:
+        """The stored series of `row`, or None if it was appended without."""
+        partition, local = self._locate(row)
+        offsets = self._map(partition, "series_offsets")
+        lo, hi = int(offsets[local]), int(offsets[local + 1])
+        if lo == hi:
+            return None
+        packed = self._map(partition, "activity_offsets")
+        b0, b1 = int(packed[local]), int(packed[local + 1])
+        activity = np.unpackbits(self._map(partition, "activity")[b0:b1], count=hi - lo)
+        return RunSeries(
+            timestamps=np.array(self._map(partition, "timestamps")[lo:hi]).view(
+                "datetime64[us]"
+            ),
+            activity=activity.astype(bool),
+            fees_token0=np.array(self._map(partition, "fees_token0")[lo:hi]),
+            fees_token1=np.array(self._map(partition, "fees_token1")[lo:hi]),
+        )
+
+    def _map(self, partition: int, name: str) -> np.ndarray:
+        key = (self._partitions[partition], name)
+        if key not in self._mapped:
+            self._mapped[key] = np.load(key[0] / f"{name}.npy", mmap_mode="r")
+        return self._mapped[key]
+
+    def _latest_rows(self) -> np.ndarray:
+        """Mask of the rows that hold the latest result of their key."""
+        if self._latest is None:
+            keys = self.column("keys")
+            _, last = np.unique(keys[::-1], return_index=True)
+            self._latest = np.zeros(len(keys), dtype=bool)
+            self._latest[len(keys) - 1 - last] = True
+        return self._latest
+
+    def _partition_starts(self) -> np.ndarray:
+        if self._starts is None:
+            sizes = [len(self._map(p, "keys")) for p in range(len(self._partitions))]
+            self._starts = _offsets(np.array(sizes, dtype=np.int64))
+        return self._starts
+
+    def _locate(self, row: int) -> tuple[int, int]:
+        starts = self._partition_starts()
+        if not 0 <= row < starts[-1]:
+            raise IndexError(f"Row {row} out of range")
+        partition = int(np.searchsorted(starts, row, side="right")) - 1
+        return partition, row - int(starts[partition])
+
+
+def _partition_index(path: Path) -> int:
+    return int(path.name.removeprefix("part-"))
+
+
+def _offsets(lengths: np.ndarray) -> np.ndarray:
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def _concat(arrays: list[np.ndarray], dtype) -> np.ndarray:
+    return np.concatenate(arrays) if arrays else np.empty(0, dtype=dtype)
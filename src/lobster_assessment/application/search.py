@@ -0,0 +1,196 @@
+import math
+import random
+from decimal import Decimal
+from enum import Enum
+from itertools import product
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+from lobster_assessment.application.algo import ActivityTracker, FeeCalculator
+from lobster_assessment.application.cache import ResultCache
+from lobster_assessment.application.core import BacktestResult, BacktestRunner
+from lobster_assessment.application.math import tick_to_sqrt_price
+from lobster_assessment.application.rebalancing import (
+    RebalancingStrategy,
+    compute_tick_range,
+)
+from lobster_assessment.domain.models import Pool, Position, Swap
+
+
+class SearchCandidate(BaseModel):
+    width: Annotated[int, Field(gt=0)]
+    bias: Annotated[float, Field(ge=0.0, le=1.0)]
+    rebalancer: RebalancingStrategy | None = None
+
+
+class SearchMetric(Enum):
+    APR = "apr"
+    FEES = "fees"
+
+
+class SearchAuditEntry(BaseModel):
+    rung: int
+    candidate_id: int
+    n_swaps: int
+    score: Decimal
+    kept: bool
+
+
+class SearchEvaluation(BaseModel):
+    candidate_id: int
+    candidate: SearchCandidate
+    result: BacktestResult
+    score: Decimal
+
+
+class SearchOutcome(BaseModel):
+    ranking: list[SearchEvaluation]
+    audit_log: list[SearchAuditEntry]
+    swaps_evaluated: int
+    full_grid_swaps: int
+
+
+def grid_candidates(
+    widths: list[int],
+    biases: list[float],
+    rebalancers: list[RebalancingStrategy | None],
+) -> list[SearchCandidate]:
+    return [
+        SearchCandidate(width=w, bias=b, rebalancer=r)
+        for w, b, r in product(widths, biases, rebalancers)
+    ]
+
+
+def sample_candidates(
+    widths: list[int],
+    biases: list[float],
+    rebalancers: list[RebalancingStrategy | None],
+    n: int,
+    seed: int,
+) -> list[SearchCandidate]:
+    grid = grid_candidates(widths, biases, rebalancers)
+    return random.Random(seed).sample(grid, min(n, len(grid)))
+
+
+class SuccessiveHalvingSearch:
+    """
+    Rank candidate configs by successive halving over growing swap prefixes.
+
+    Every candidate is first evaluated on the first `min_swaps` swaps; the top
+    `keep_fraction` by score survive to the next rung, whose prefix is longer
+    by a factor of `1 / keep_fraction`. The last rung always uses the full
+    series and ranks the remaining survivors (never fewer than `top_k`).
+    Ties are broken by candidate order, so runs are reproducible.
+    """
+
+    def __init__(
+        self,
+        pool: Pool,
+        amount0: Decimal,
+        amount1: Decimal,
+        swaps: list[Swap],
+        candidates: list[SearchCandidate],
+        metric: SearchMetric = SearchMetric.APR,
+        keep_fraction: float = 0.5,
+        min_swaps: int = 100,
+        top_k: int = 1,
+        cache: ResultCache | None = None,
+    ):
+        if not 0.0 < keep_fraction < 1.0:
+            raise ValueError("keep_fraction must be between 0 and 1 (exclusive)")
+        if not swaps:
+            raise ValueError("Cannot search over an empty swap series.")
+
+        self.pool = pool
+        self.amount0 = amount0
+        self.amount1 = amount1
+        self.swaps = swaps
+        self.candidates = candidates
+        self.metric = metric
+        self.keep_fraction = keep_fraction
+        self.min_swaps = max(1, min_swaps)
+        self.top_k = max(1, top_k)
+        self.cache = cache
+
+    def schedule(self) -> list[int]:
+        growth = 1 / self.keep_fraction
+        n_swaps = len(self.swaps)
+        rungs = []
+        length = float(self.min_swaps)
+        while length < n_swaps:
+            rungs.append(int(length))
+            length *= growth
+        rungs.append(n_swaps)
+        return rungs
+
+    def run(self) -> SearchOutcome:
+        survivors = list(range(len(self.candidates)))
+        audit_log: list[SearchAuditEntry] = []
+        swaps_evaluated = 0
+        schedule = self.schedule()
+        evaluations: list[SearchEvaluation] = []
+
+        for rung, n_swaps in enumerate(schedule):
+            evaluations = [self.evaluate(i, n_swaps) for i in survivors]
+            swaps_evaluated += n_swaps * len(survivors)
+            evaluations.sort(key=lambda e: (-e.score, e.candidate_id))
+
+            last_rung = rung == len(schedule) - 1
+            keep = len(evaluations)
+            if not last_rung:
+                keep = max(self.top_k, math.ceil(len(evaluations) * self.keep_fraction))
+
+            for position, e in enumerate(evaluations):
+                audit_log.append(
+                    SearchAuditEntry(
+                        rung=rung,
+                        candidate_id=e.candidate_id,
+                        n_swaps=n_swaps,
+                        score=e.score,
+                        kept=position < keep,
+                    )
+                )
+            survivors = [e.candidate_id for e in evaluations[:keep]]
+
+        return SearchOutcome(
+            ranking=evaluations,
+            audit_log=audit_log,
+            swaps_evaluated=swaps_evaluated,
+            full_grid_swaps=len(self.swaps) * len(self.candidates),
+        )
+
+    def evaluate(self, candidate_id: int, n_swaps: int) -> SearchEvaluation:
+        candidate = self.candidates[candidate_id]
+        swaps = self.swaps[:n_swaps]
+        tick_lower, tick_upper = compute_tick_range(
+            swaps[0].tick, candidate.width, candidate.bias
+        )
+        position = Position(
+            tick_lower=tick_lower,
+            tick_upper=tick_upper,
+            amount0=self.amount0,
+            amount1=self.amount1,
+            pool=self.pool,
+        )
+        result = BacktestRunner(
+            position=position,
+            swaps=swaps,
+            tracker=ActivityTracker(position=position),
+            calculator=FeeCalculator(position=position),
+            rebalancer=candidate.rebalancer,
+            rebalance_bias=candidate.bias,
+            cache=self.cache,
+        ).run()
+        return SearchEvaluation(
+            candidate_id=candidate_id,
+            candidate=candidate,
+            result=result,
+            score=self.score(result, swaps[-1]),
+        )
+
+    def score(self, result: BacktestResult, last_swap: Swap) -> Decimal:
+        if self.metric == SearchMetric.APR:
+            return result.apr
+        price0 = tick_to_sqrt_price(last_swap.tick) ** 2
+        return result.total_fees_token0 * price0 + result.total_fees_token1
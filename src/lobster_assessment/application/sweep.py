@@ -0,0 +1,190 @@
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+from lobster_assessment.application.algo import ActivityTracker, Fee, FeeCalculator
+from lobster_assessment.application.core import BacktestResult, BacktestSimulation
+from lobster_assessment.application.rebalancing import (
+    RebalancerState,
+    RebalancingStrategy,
+    next_tick_range,
+)
+from lobster_assessment.domain.models import Position, Swap
+
+
+class SweepConfig(BaseModel):
+    rebalance_bias: Annotated[float, Field(ge=0.0, le=1.0)]
+    rebalancer: RebalancingStrategy | None = None
+
+
+class SweepStats(BaseModel):
+    swaps_simulated: int
+    naive_swaps: int
+    forks: int
+
+
+class _Branch:
+    """
+    Swaps simulated once for every config in `configs`, from swap `start`
+    until the branch forks (or the series ends); earlier swaps live in
+    `parent`.
+    """
+
+    def __init__(
+        self,
+        parent: "_Branch | None",
+        start: int,
+        configs: list[int],
+        position: Position,
+    ):
+        self.parent = parent
+        self.start = start
+        self.configs = configs
+        self.position = position
+        self.tracker = ActivityTracker(position=position)
+        self.calculator = FeeCalculator(position=position)
+        self.lowers: list[int] = []
+        self.uppers: list[int] = []
+        self.activities: list[bool] = []
+        self.fees: list[Fee] = []
+
+    def record(self, swap: Swap) -> None:
+        self.lowers.append(self.position.tick_lower)
+        self.uppers.append(self.position.tick_upper)
+        self.activities.append(self.tracker.is_active(swap.tick))
+        self.fees.append(self.calculator.compute_fee_for_swap(swap))
+
+    def lineage(self) -> list["_Branch"]:
+        branches = []
+        branch = self
+        while branch is not None:
+            branches.append(branch)
+            branch = branch.parent
+        return branches[::-1]
+
+
+class ForkingSweepRunner:
+    """
+    Backtest many (bias, rebalancer) configs of one position over the same
+    swaps, simulating shared prefixes once.
+
+    Configs whose position ranges are identical share one branch: its
+    activity and fee per swap are computed once for all of them, and only
+    the rebalancer checks run per config. When a swap sends configs to
+    different ranges, the branch forks into one child per resulting range,
+    and children keep forking as they diverge further. Results are identical
+    to running BacktestRunner per config. Each config gets its own rebalancer
+    state, so the strategies themselves are shared, not copied.
+    """
+
+    def __init__(
+        self,
+        position: Position,
+        swaps: list[Swap],
+        configs: list[SweepConfig],
+        created_at: datetime | None = None,
+    ):
+        if not swaps:
+            raise ValueError("Cannot backtest an empty swap series.")
+        self.position = position
+        self.swaps = swaps
+        self.configs = configs
+        self.created_at = created_at or swaps[0].timestamp
+        self.stats: SweepStats
+
+    def run(self) -> list[BacktestResult]:
+        states = [
+            c.rebalancer.initial_state() if c.rebalancer is not None else None
+            for c in self.configs
+        ]
+        root = _Branch(
+            None, 0, list(range(len(self.configs))), self.position.model_copy()
+        )
+        branches = [root]
+        leaves: dict[int, _Branch] = {}
+        swaps_simulated = forks = 0
+
+        for i, swap in enumerate(self.swaps):
+            next_branches = []
+            for branch in branches:
+                groups = self._step(branch, swap, states)
+                if len(groups) == 1:
+                    [(tick_lower, tick_upper)] = groups
+                    branch.position.tick_lower = tick_lower
+                    branch.position.tick_upper = tick_upper
+                    next_branches.append(branch)
+                else:
+                    forks += 1
+                    for (tick_lower, tick_upper), configs in groups.items():
+                        next_branches.append(
+                            _Branch(
+                                branch,
+                                i,
+                                configs,
+                                branch.position.model_copy(
+                                    update={
+                                        "tick_lower": tick_lower,
+                                        "tick_upper": tick_upper,
+                                    }
+                                ),
+                            )
+                        )
+            branches = next_branches
+            for branch in branches:
+                branch.record(swap)
+            swaps_simulated += len(branches)
+
+        for branch in branches:
+            for config in branch.configs:
+                leaves[config] = branch
+
+        self.stats = SweepStats(
+            swaps_simulated=swaps_simulated,
+            naive_swaps=len(self.swaps) * len(self.configs),
+            forks=forks,
+        )
+        return [self._result(i, leaves[i]) for i in range(len(self.configs))]
+
+    def _step(
+        self,
+        branch: _Branch,
+        swap: Swap,
+        states: list[RebalancerState | None],
+    ) -> dict[tuple[int, int], list[int]]:
+        """Range of each config of `branch` after its rebalance check at `swap`."""
+        tick_lower = branch.position.tick_lower
+        tick_upper = branch.position.tick_upper
+        groups: dict[tuple[int, int], list[int]] = {}
+        for config in branch.configs:
+            new_range = next_tick_range(
+                self.configs[config].rebalancer,
+                states[config],
+                tick=swap.tick,
+                timestamp=swap.timestamp,
+                tick_lower=tick_lower,
+                tick_upper=tick_upper,
+                created_at=self.created_at,
+                bias=self.configs[config].rebalance_bias,
+            )
+            groups.setdefault(new_range, []).append(config)
+        return groups
+
+    def _result(self, config: int, leaf: _Branch) -> BacktestResult:
+        simulation = BacktestSimulation(
+            position=leaf.position,
+            tracker=leaf.tracker,
+            calculator=leaf.calculator,
+            rebalance_bias=self.configs[config].rebalance_bias,
+            created_at=self.created_at,
+        )
+        for branch in leaf.lineage():
+            end = branch.start + len(branch.fees)
+            simulation.extend(
+                self.swaps[branch.start : end],
+                branch.lowers,
+                branch.uppers,
+                branch.activities,
+                branch.fees,
+            )
+        return simulation.finish()
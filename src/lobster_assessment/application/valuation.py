@@ -0,0 +1,104 @@
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from lobster_assessment.application.math import (
+    compute_liquidity_from_amounts_array,
+    compute_token_amounts_at_price_array,
+    tick_to_sqrt_price_array,
+)
+
+
+class ValueTimeseries(BaseModel):
+    """
+    Per-swap valuation of a position, in token1 units at the swap's tick price.
+
+    `position_value` includes fees earned so far. `hold_value` is the value of
+    holding the tokens the liquidity held at the first swap, and
+    `impermanent_loss` compares the liquidity alone against it; this is the
+    loss reported in BacktestResult. `range_impermanent_loss` compares it
+    instead with holding the tokens held when the current range was entered,
+    so it resets at each rebalance. `drawdown` is the position value relative
+    to its running peak (all <= 0 on losses).
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    timestamps: np.ndarray
+    amount0: np.ndarray
+    amount1: np.ndarray
+    position_value: np.ndarray
+    hold_value: np.ndarray
+    impermanent_loss: np.ndarray
+    range_impermanent_loss: np.ndarray
+    drawdown: np.ndarray
+
+    @property
+    def max_drawdown(self) -> float:
+        return float(self.drawdown.min()) if len(self.drawdown) else 0.0
+
+    @property
+    def final_impermanent_loss(self) -> float:
+        return float(self.impermanent_loss[-1]) if len(self.impermanent_loss) else 0.0
+
+
+def compute_value_timeseries(
+    ticks: np.ndarray,
+    tick_lower: np.ndarray,
+    tick_upper: np.ndarray,
+    amount0: float,
+    amount1: float,
+    earned_fees_token0: np.ndarray,
+    earned_fees_token1: np.ndarray,
+    timestamps: np.ndarray,
+) -> ValueTimeseries:
+    """
+    Value a position over a whole series in one vectorized pass.
+
+    `tick_lower`/`tick_upper` are the range in force at each swap and
+    `amount0`/`amount1` the deposited amounts that size its liquidity, as in
+    `Position.liquidity`. Earned fees are per swap and already zero where the
+    position was inactive.
+    """
+    liquidity = compute_liquidity_from_amounts_array(
+        tick_lower, tick_upper, amount0, amount1
+    )
+    sqrt_price = tick_to_sqrt_price_array(ticks)
+    price = sqrt_price**2
+    held0, held1 = compute_token_amounts_at_price_array(
+        liquidity, sqrt_price, tick_lower, tick_upper
+    )
+
+    lp_value = held0 * price + held1
+    fees_value = np.cumsum(earned_fees_token0) * price + np.cumsum(earned_fees_token1)
+    position_value = lp_value + fees_value
+
+    # Index of the swap at which the range in force was entered.
+    positions = np.arange(len(ticks))
+    tick_lower = np.broadcast_to(tick_lower, positions.shape)
+    tick_upper = np.broadcast_to(tick_upper, positions.shape)
+    entered = np.ones(len(ticks), dtype=bool)
+    entered[1:] = (tick_lower[1:] != tick_lower[:-1]) | (
+        tick_upper[1:] != tick_upper[:-1]
+    )
+    entry = np.maximum.accumulate(np.where(entered, positions, 0))
+    hold_value = held0[0] * price + held1[0] if len(ticks) else price
+    range_hold_value = held0[entry] * price + held1[entry]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        impermanent_loss = np.where(hold_value > 0, lp_value / hold_value - 1, 0.0)
+        range_impermanent_loss = np.where(
+            range_hold_value > 0, lp_value / range_hold_value - 1, 0.0
+        )
+        peak = np.maximum.accumulate(position_value)
+        drawdown = np.where(peak > 0, position_value / peak - 1, 0.0)
+
+    return ValueTimeseries(
+        timestamps=timestamps,
+        amount0=held0,
+        amount1=held1,
+        position_value=position_value,
+        hold_value=hold_value,
+        impermanent_loss=impermanent_loss,
+        range_impermanent_loss=range_impermanent_loss,
+        drawdown=drawdown,
+    )
@@ -1,20 +1,50 @@
 import os
+from functools import cache
 
 from dotenv import load_dotenv
 
-load_dotenv()
+
+@cache
+def load_env() -> None:
+    load_dotenv()
+
+
+class _Env:
+    """Class attribute read from the environment (and `.env`) on first access."""
+
+    def __init__(self, default: str | None = None, cast=str):
+        self.default = default
+        self.cast = cast
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance, owner):
+        load_env()
+        value = os.getenv(self.name, self.default)
+        return value if value is None else self.cast(value)
+
+
+def _flag(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
 
 
 class Config:
-    DB_DRIVER = os.getenv("DB_DRIVER", "postgresql+psycopg")
-    DB_HOST = os.getenv("DB_HOST")
-    DB_PORT = os.getenv("DB_PORT")
-    DB_NAME = os.getenv("DB_NAME")
-    DB_USER = os.getenv("DB_USER")
-    DB_PASSWORD = os.getenv("DB_PASSWORD")
-    DB_SSLMODE = os.getenv("DB_SSLMODE", "require")
-    DB_CONNECT_TIMEOUT = os.getenv("DB_CONNECT_TIMEOUT", "15")
-    DB_OPTIONS = os.getenv("DB_OPTIONS", "-c statement_timeout=15000")
+    DB_DRIVER = _Env("postgresql+psycopg")
+    DB_HOST = _Env()
+    DB_PORT = _Env()
+    DB_NAME = _Env()
+    DB_USER = _Env()
+    DB_PASSWORD = _Env()
+    DB_SSLMODE = _Env("require")
+    DB_CONNECT_TIMEOUT = _Env("15")
+    DB_OPTIONS = _Env("-c statement_timeout=15000")
+    DB_POOL_SIZE = _Env("5", int)
+    DB_MAX_OVERFLOW = _Env("10", int)
+    DB_POOL_TIMEOUT = _Env("30", float)
+    DB_POOL_RECYCLE = _Env("1800", int)
+    DB_POOL_PRE_PING = _Env("true", _flag)
+    CHAIN_ID = _Env("42161")
 
     @classmethod
     def sqlalchemy_url(cls):
@@ -1,12 +1,96 @@
+import os
+import threading
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
 
 from lobster_assessment.config import Config
+from lobster_assessment.instrumentation import instrument_engine
+
+_engine: Engine | None = None
+_sessionmaker: sessionmaker | None = None
+_lock = threading.Lock()
+
+
+def engine_options() -> dict:
+    return {
+        "pool_size": Config.DB_POOL_SIZE,
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+        "pool_timeout": Config.DB_POOL_TIMEOUT,
+        "pool_recycle": Config.DB_POOL_RECYCLE,
+        "pool_pre_ping": Config.DB_POOL_PRE_PING,
+    }
+
+
+def get_engine() -> Engine:
+    """The process-wide engine, created on first use with pooling from Config."""
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                engine = create_engine(Config.sqlalchemy_url(), **engine_options())
+                instrument_engine(engine)
+                _engine = engine
+    return _engine
+
+
+def get_sessionmaker() -> sessionmaker:
+    global _sessionmaker
+    if _sessionmaker is None:
+        with _lock:
+            if _sessionmaker is None:
+                _sessionmaker = sessionmaker(bind=get_engine())
+    return _sessionmaker
+
+
+def SessionLocal() -> Session:
+    return get_sessionmaker()()
+
+
+def warm_up(connections: int | None = None) -> int:
+    """
+    Open up to `connections` pooled connections (default: the pool size) so
+    later checkouts skip connection and TLS setup. Returns how many opened.
+    """
+    engine = get_engine()
+    if connections is None:
+        connections = Config.DB_POOL_SIZE
+    count = min(connections, Config.DB_POOL_SIZE)
+    opened = []
+    try:
+        for _ in range(count):
+            opened.append(engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
+def dispose_engine() -> None:
+    """Close pooled connections and drop the engine; the next use recreates it."""
+    global _engine, _sessionmaker
+    with _lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = None
+        _sessionmaker = None
+
+
+def _reset_after_fork() -> None:
+    # Connections inherited from the parent belong to the parent: replace the
+    # pool without closing them, so the child opens its own.
+    global _lock
+    _lock = threading.Lock()
+    if _engine is not None:
+        _engine.dispose(close=False)
 
 
-def get_engine():
-    return create_engine(Config.sqlalchemy_url())
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
 
 
-engine = create_engine(Config.sqlalchemy_url())
-SessionLocal = sessionmaker(bind=engine)
+def __getattr__(name: str):
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,13 @@
 from sqlalchemy import Column, DateTime, Integer, Numeric, String
 from sqlalchemy.ext.declarative import declarative_base
 
+from lobster_assessment.config import Config
+
 Base = declarative_base()
 
 
 class UniswapV3Swap(Base):
-    __tablename__ = "uniswap_v3_swap_42161"
+    __tablename__ = f"uniswap_v3_swap_{Config.CHAIN_ID}"
     __table_args__ = {"schema": "public"}
 
     tx_hash = Column(String(66), primary_key=True)
@@ -20,7 +22,7 @@ class UniswapV3Swap(Base):
 
 
 class Block(Base):
-    __tablename__ = "blocks_42161"
+    __tablename__ = f"blocks_{Config.CHAIN_ID}"
     __table_args__ = {"schema": "public"}
 
     block_number = Column(Integer, primary_key=True)
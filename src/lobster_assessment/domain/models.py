@@ -1,7 +1,8 @@
 from datetime import datetime
 from decimal import Decimal
 
-from pydantic import BaseModel, computed_field
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 
 from lobster_assessment.application.math import compute_liquidity_from_amounts
 
@@ -32,9 +33,9 @@ class Swap(BaseModel):
     tick: int
     volume_token0: Decimal
     volume_token1: Decimal
-    liquidity: Decimal
+    liquidity: Decimal = Field(ge=0)
     timestamp: datetime
-    sqrt_price_x96: Decimal
+    sqrt_price_x96: Decimal = Field(gt=0)
 
 
 class SwapSeries(BaseModel):
@@ -47,3 +48,39 @@ class SwapSeries(BaseModel):
     @property
     def timestamps(self) -> list[datetime]:
         return [s.timestamp for s in self.swaps]
+
+    def to_arrays(self) -> "SwapArrays":
+        return SwapArrays.from_swaps(self.swaps)
+
+
+class SwapArrays(BaseModel):
+    """Columnar float64 view of a swap series, for vectorized computations."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    ticks: np.ndarray
+    volume_token0: np.ndarray
+    volume_token1: np.ndarray
+    liquidity: np.ndarray
+    sqrt_price_x96: np.ndarray
+    timestamps: np.ndarray
+
+    @classmethod
+    def from_swaps(cls, swaps: list[Swap]) -> "SwapArrays":
+        return cls(
+            ticks=np.array([s.tick for s in swaps], dtype=np.int64),
+            volume_token0=np.array(
+                [float(s.volume_token0) for s in swaps], dtype=np.float64
+            ),
+            volume_token1=np.array(
+                [float(s.volume_token1) for s in swaps], dtype=np.float64
+            ),
+            liquidity=np.array([float(s.liquidity) for s in swaps], dtype=np.float64),
+            sqrt_price_x96=np.array(
+                [float(s.sqrt_price_x96) for s in swaps], dtype=np.float64
+            ),
+            timestamps=np.array([s.timestamp for s in swaps], dtype="datetime64[us]"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ticks)
@@ -0,0 +1,97 @@
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import Callable, Iterator, TypeVar
+
+from pydantic import BaseModel, validate_call
+
+M = TypeVar("M", bound=BaseModel)
+
+_setattr = object.__setattr__
+
+
+class ValidationMode(Enum):
+    """
+    How domain models are checked: strict validates every model and every
+    validated call; trusted assumes the inputs were checked once, in bulk, at
+    ingestion, and builds models without validation.
+    """
+
+    STRICT = "strict"
+    TRUSTED = "trusted"
+
+
+_mode: ContextVar[ValidationMode] = ContextVar(
+    "validation_mode", default=ValidationMode.STRICT
+)
+
+
+def current_mode() -> ValidationMode:
+    return _mode.get()
+
+
+def is_trusted() -> bool:
+    return _mode.get() is ValidationMode.TRUSTED
+
+
+@contextmanager
+def validation_mode(mode: ValidationMode | str) -> Iterator[ValidationMode]:
+    """
+    Run the block under `mode`, restoring the previous mode afterwards.
+
+    The mode is a context variable: it follows threads started with a copied
+    context and asyncio tasks, but not process-pool workers, which run strict.
+    """
+    mode = ValidationMode(mode)
+    token = _mode.set(mode)
+    try:
+        yield mode
+    finally:
+        _mode.reset(token)
+
+
+def construct(model: type[M], **fields) -> M:
+    """`model(**fields)`, or the same model built without validation when trusted."""
+    if _mode.get() is ValidationMode.TRUSTED:
+        return build(model, fields)
+    return model(**fields)
+
+
+def build(model: type[M], fields: dict) -> M:
+    """
+    Build `model` from already valid `fields`, without validation.
+
+    When `fields` sets every field of a model without private attributes,
+    the instance dict is assigned directly, which is several times cheaper
+    than `model_construct`; otherwise this is `model_construct`.
+    """
+    if fields.keys() != _plain_fields(model):
+        return model.model_construct(**fields)
+    instance = model.__new__(model)
+    _setattr(instance, "__dict__", fields)
+    _setattr(instance, "__pydantic_fields_set__", set(fields))
+    _setattr(instance, "__pydantic_extra__", None)
+    _setattr(instance, "__pydantic_private__", None)
+    return instance
+
+
+@functools.cache
+def _plain_fields(model: type[BaseModel]) -> frozenset[str] | None:
+    """Field names of `model`, or None if it has private attributes."""
+    if model.__private_attributes__:
+        return None
+    return frozenset(model.__pydantic_fields__)
+
+
+def validated_call(fn: Callable) -> Callable:
+    """Like pydantic's `validate_call`, skipped when trusted."""
+    checked = validate_call(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _mode.get() is ValidationMode.TRUSTED:
+            return fn(*args, **kwargs)
+        return checked(*args, **kwargs)
+
+    return wrapper
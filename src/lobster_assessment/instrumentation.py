@@ -0,0 +1,305 @@
+import bisect
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Callable, Iterator, TextIO
+
+from pydantic import BaseModel, PrivateAttr
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds (seconds) of the latency histogram buckets; the last is open.
+LATENCY_BUCKETS = [0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+# sqlstate Postgres reports when statement_timeout cancels a query.
+QUERY_CANCELED = "57014"
+
+EXPLAIN_PREFIXES = {
+    "postgresql": "EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+
+class QueryRecord(BaseModel):
+    """One instrumented data-access call, split into where its time went."""
+
+    name: str
+    pool: str | None = None
+    start: str | None = None
+    end: str | None = None
+    started_at: datetime
+    statements: list[str] = []
+    server_seconds: float = 0.0
+    decode_seconds: float = 0.0
+    model_seconds: float = 0.0
+    total_seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    error: str | None = None
+    timed_out: bool = False
+    explain: list[str] = []
+
+    # (engine, statement, parameters) of slow SELECTs still to be explained.
+    _pending_explains: list[tuple] = PrivateAttr(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.total_seconds if self.total_seconds else 0.0
+
+
+class LatencyHistogram(BaseModel):
+    counts: list[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+    queries: int = 0
+    errors: int = 0
+    rows: int = 0
+    bytes: int = 0
+    total_seconds: float = 0.0
+
+    def add(self, record: QueryRecord) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, record.total_seconds)] += 1
+        self.queries += 1
+        self.errors += record.error is not None
+        self.rows += record.rows
+        self.bytes += record.bytes
+        self.total_seconds += record.total_seconds
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.total_seconds if self.total_seconds else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound below which a fraction `q` of queries finished."""
+        target = q * self.queries
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + [float("inf")], self.counts):
+            seen += count
+            if seen >= target and count:
+                return bound
+        return 0.0
+
+
+class QueryRecorder:
+    """
+    Collects QueryRecords: keeps the latest `max_records`, aggregates them
+    into a histogram per (pool, start, end), and forwards each to `sinks`.
+
+    With `explain_threshold` set, SELECTs slower than that many seconds are
+    re-run under EXPLAIN (ANALYZE on Postgres) and the plan is attached to the
+    record. This runs once the traced call has finished, on a separate pooled
+    connection, so the caller's transaction is never touched; it still
+    executes the slow query a second time.
+    """
+
+    def __init__(
+        self,
+        max_records: int = 1000,
+        sinks: list[Callable[[QueryRecord], None]] | None = None,
+        explain_threshold: float | None = None,
+    ):
+        self.records: deque[QueryRecord] = deque(maxlen=max_records)
+        self.histograms: dict[tuple, LatencyHistogram] = {}
+        self.sinks = sinks or []
+        self.explain_threshold = explain_threshold
+        self._lock = threading.Lock()
+
+    def emit(self, record: QueryRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+            key = (record.pool, record.start, record.end)
+            self.histograms.setdefault(key, LatencyHistogram()).add(record)
+        for sink in self.sinks:
+            sink(record)
+
+    def histogram(
+        self, pool: str | None = None, start: str | None = None, end: str | None = None
+    ) -> LatencyHistogram:
+        """Histogram of the matching records; None matches any value."""
+        merged = LatencyHistogram()
+        with self._lock:
+            for (p, s, e), histogram in self.histograms.items():
+                if (
+                    (pool is None or p == pool.lower())
+                    and (start is None or s == start)
+                    and (end is None or e == end)
+                ):
+                    merged.counts = [
+                        a + b for a, b in zip(merged.counts, histogram.counts)
+                    ]
+                    merged.queries += histogram.queries
+                    merged.errors += histogram.errors
+                    merged.rows += histogram.rows
+                    merged.bytes += histogram.bytes
+                    merged.total_seconds += histogram.total_seconds
+        return merged
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records.clear()
+            self.histograms.clear()
+
+
+class JsonLinesSink:
+    """Writes each record as one JSON line to `stream`."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def __call__(self, record: QueryRecord) -> None:
+        self.stream.write(record.model_dump_json() + "\n")
+        self.stream.flush()
+
+
+recorder = QueryRecorder()
+
+_instrumented: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+_current: ContextVar[QueryRecord | None] = ContextVar("query_record", default=None)
+
+
+@contextmanager
+def instrumented_query(
+    name: str,
+    pool: str | None = None,
+    start: str | None = None,
+    end: str | None = None,
+    target: QueryRecorder | None = None,
+) -> Iterator[QueryRecord]:
+    """
+    Trace one data-access call. Statements executed inside, on instrumented
+    engines, add their server time to the record; `phase` times decoding and
+    model construction, and callers report rows and bytes on the record.
+    """
+    record = QueryRecord(
+        name=name,
+        pool=pool.lower() if pool else None,
+        start=str(start) if start is not None else None,
+        end=str(end) if end is not None else None,
+        started_at=datetime.now(timezone.utc),
+    )
+    token = _current.set(record)
+    began = time.perf_counter()
+    try:
+        yield record
+    except Exception as exc:
+        if record.error is None:
+            record.error = f"{type(exc).__name__}: {exc}"
+            record.timed_out = _is_timeout(exc)
+        raise
+    finally:
+        record.total_seconds = time.perf_counter() - began
+        _current.reset(token)
+        _run_explains(record)
+        (target or recorder).emit(record)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Add the time spent in the block to `<name>_seconds` of the current record,
+    less the statement time the engine hooks recorded meanwhile.
+    """
+    record = _current.get()
+    began = time.perf_counter()
+    server = record.server_seconds if record is not None else 0.0
+    try:
+        yield
+    finally:
+        if record is not None:
+            elapsed = time.perf_counter() - began - (record.server_seconds - server)
+            field = f"{name}_seconds"
+            setattr(record, field, getattr(record, field) + elapsed)
+
+
+def current_record() -> QueryRecord | None:
+    return _current.get()
+
+
+def instrument_engine(engine: Engine, target: QueryRecorder | None = None) -> None:
+    """Attach timing hooks to `engine`; idempotent."""
+    if engine in _instrumented:
+        return
+    _instrumented.add(engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        active = target or recorder
+        record = _current.get()
+        standalone = record is None
+        if standalone:
+            record = QueryRecord(
+                name="statement", started_at=datetime.now(timezone.utc)
+            )
+            record.total_seconds = elapsed
+            if cursor.rowcount and cursor.rowcount > 0:
+                record.rows = cursor.rowcount
+        record.server_seconds += elapsed
+        record.statements.append(_shorten(statement))
+
+        if (
+            active.explain_threshold is not None
+            and elapsed >= active.explain_threshold
+            and statement.lstrip().upper().startswith("SELECT")
+        ):
+            record._pending_explains.append((conn.engine, statement, parameters))
+        if standalone:
+            _run_explains(record)
+            active.emit(record)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        conn = context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+        record = _current.get()
+        if record is not None:
+            exc = context.original_exception
+            record.error = f"{type(exc).__name__}: {exc}"
+            record.timed_out = _is_timeout(exc)
+            if context.statement:
+                record.statements.append(_shorten(context.statement))
+
+
+def _run_explains(record: QueryRecord) -> None:
+    for engine, statement, parameters in record._pending_explains:
+        record.explain.append(_explain(engine, statement, parameters))
+    record._pending_explains.clear()
+
+
+def _explain(engine: Engine, statement: str, parameters) -> str:
+    prefix = EXPLAIN_PREFIXES.get(engine.dialect.name)
+    if prefix is None:
+        return f"EXPLAIN not supported for dialect {engine.dialect.name}"
+    try:
+        # A raw cursor on its own connection: no instrumentation events, and
+        # a failure rolls back that connection only.
+        with engine.connect() as connection:
+            cursor = connection.connection.dbapi_connection.cursor()
+            try:
+                cursor.execute(prefix + statement, parameters)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        return "\n".join(" ".join(str(v) for v in row) for row in rows)
+    except Exception as exc:
+        return f"EXPLAIN failed: {type(exc).__name__}: {exc}"
+
+
+def _is_timeout(exc: BaseException) -> bool:
+    sqlstate = getattr(exc, "sqlstate", None) or getattr(
+        getattr(exc, "orig", None), "sqlstate", None
+    )
+    return sqlstate == QUERY_CANCELED
+
+
+def _shorten(statement: str, limit: int = 500) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
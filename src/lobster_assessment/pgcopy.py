@@ -0,0 +1,149 @@
+import struct
+
+import numpy as np
+
+from lobster_assessment.domain.models import SwapArrays
+
+PGCOPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+PGCOPY_EPOCH = np.datetime64("2000-01-01T00:00:00", "us")
+
+# (column name, SQL expression, NumPy big-endian dtype of the binary value)
+SWAP_COPY_COLUMNS: list[tuple[str, str, str]] = [
+    ("block_number", "s.block_number::int8", ">i8"),
+    ("tick", "s.tick::int8", ">i8"),
+    ("volume_token0", "s.volume_token0::float8", ">f8"),
+    ("volume_token1", "s.volume_token1::float8", ">f8"),
+    ("liquidity", "s.liquidity::float8", ">f8"),
+    ("sqrt_price_x96", "s.sqrt_price_x96::float8", ">f8"),
+    ("timestamp", "b.block_date::timestamp", ">i8"),
+]
+
+
+def row_dtype(columns: list[tuple[str, str, str]]) -> np.dtype:
+    """Packed layout of one binary COPY tuple whose fields are all fixed-width."""
+    fields = [("field_count", ">i2")]
+    for name, _, dtype in columns:
+        fields.append((f"{name}__length", ">i4"))
+        fields.append((name, dtype))
+    return np.dtype(fields)
+
+
+class BinaryCopyParser:
+    """
+    Incremental parser for `COPY ... TO STDOUT (FORMAT BINARY)` streams.
+
+    Every selected column must be a non-null fixed-width value, so each tuple
+    has the same size and whole runs of tuples are decoded with a single
+    `np.frombuffer` call instead of per-row Python work.
+    """
+
+    def __init__(
+        self,
+        columns: list[tuple[str, str, str]] = SWAP_COPY_COLUMNS,
+        batch_bytes: int = 1 << 22,
+    ):
+        self.columns = columns
+        self.batch_bytes = batch_bytes
+        self.dtype = row_dtype(columns)
+        self._buffer = bytearray()
+        self._header_done = False
+        self._finished = False
+        self._chunks: list[np.ndarray] = []
+
+    def feed(self, data: bytes | memoryview) -> None:
+        if self._finished:
+            raise ValueError("Data received after the COPY trailer.")
+        self._buffer += data
+        if not self._header_done and not self._read_header():
+            return
+
+        if len(self._buffer) >= self.batch_bytes:
+            self._consume(len(self._buffer) // self.dtype.itemsize)
+
+    def finish(self) -> dict[str, np.ndarray]:
+        if not self._header_done:
+            raise ValueError("Incomplete binary COPY header.")
+        if len(self._buffer) >= self.dtype.itemsize:
+            self._consume(len(self._buffer) // self.dtype.itemsize)
+        if self._finished:
+            if self._buffer:
+                raise ValueError("Unexpected bytes after the COPY trailer.")
+        elif bytes(self._buffer) != b"\xff\xff":
+            raise ValueError("Binary COPY stream is truncated.")
+
+        rows = (
+            np.concatenate(self._chunks)
+            if self._chunks
+            else np.empty(0, dtype=self.dtype)
+        )
+        return {
+            name: rows[name].astype(dtype.replace(">", "="))
+            for name, _, dtype in self.columns
+        }
+
+    def _read_header(self) -> bool:
+        if len(self._buffer) < len(PGCOPY_SIGNATURE) + 8:
+            return False
+        if bytes(self._buffer[: len(PGCOPY_SIGNATURE)]) != PGCOPY_SIGNATURE:
+            raise ValueError("Not a PostgreSQL binary COPY stream.")
+        offset = len(PGCOPY_SIGNATURE) + 4
+        (extension_length,) = struct.unpack_from(">i", self._buffer, offset)
+        header_length = offset + 4 + extension_length
+        if len(self._buffer) < header_length:
+            return False
+        del self._buffer[:header_length]
+        self._header_done = True
+        return True
+
+    def _consume(self, n_rows: int) -> None:
+        size = n_rows * self.dtype.itemsize
+        rows = np.frombuffer(self._buffer, dtype=self.dtype, count=n_rows).copy()
+
+        trailer = np.flatnonzero(rows["field_count"] == -1)
+        if len(trailer):
+            end = int(trailer[0])
+            rows = rows[:end]
+            del self._buffer[: end * self.dtype.itemsize + 2]
+            self._finished = True
+        else:
+            del self._buffer[:size]
+
+        if len(rows):
+            self._validate(rows)
+            self._chunks.append(rows)
+
+    def _validate(self, rows: np.ndarray) -> None:
+        if (rows["field_count"] != len(self.columns)).any():
+            raise ValueError("Unexpected field count in binary COPY tuple.")
+        for name, _, dtype in self.columns:
+            lengths = rows[f"{name}__length"]
+            if (lengths != np.dtype(dtype).itemsize).any():
+                raise ValueError(
+                    f"Column {name!r} has NULL or variable-width values; "
+                    "COALESCE or cast it to a fixed-width type in the query."
+                )
+
+
+def parse_binary_copy(data: bytes) -> dict[str, np.ndarray]:
+    parser = BinaryCopyParser()
+    parser.feed(data)
+    return parser.finish()
+
+
+def swap_arrays_from_columns(columns: dict[str, np.ndarray]) -> SwapArrays:
+    return SwapArrays(
+        ticks=columns["tick"],
+        volume_token0=columns["volume_token0"],
+        volume_token1=columns["volume_token1"],
+        liquidity=columns["liquidity"],
+        sqrt_price_x96=columns["sqrt_price_x96"],
+        timestamps=PGCOPY_EPOCH + columns["timestamp"].astype("timedelta64[us]"),
+    )
+
+
+def read_binary_copy_file(path: str, chunk_bytes: int = 1 << 24) -> SwapArrays:
+    parser = BinaryCopyParser()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_bytes):
+            parser.feed(chunk)
+    return swap_arrays_from_columns(parser.finish())
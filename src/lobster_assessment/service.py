@@ -0,0 +1,351 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Literal
+
+from pydantic import BaseModel, Field, ValidationError
+
+from lobster_assessment.application.algo import ActivityTracker, FeeCalculator
+from lobster_assessment.application.core import (
+    BacktestResult,
+    BacktestRunner,
+    MultiPositionBacktestRunner,
+)
+from lobster_assessment.application.executors import ExecutorKind, TaskFailure
+from lobster_assessment.application.rebalancing import (
+    LogicMode,
+    MultiConditionRebalancer,
+    OutOfRangeDurationRebalancer,
+    OutOfRangeRebalancer,
+    RebalancingStrategy,
+    TimeTriggeredRebalancer,
+)
+from lobster_assessment.domain.models import Pool, Position, Swap
+from lobster_assessment.sources import SwapQuery, SwapSource
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+class RebalancerSpec(BaseModel):
+    kind: Literal["out_of_range", "time_triggered", "out_of_range_duration", "multi"]
+    interval: timedelta | None = None
+    duration: timedelta | None = None
+    mode: LogicMode = LogicMode.OR
+    strategies: list["RebalancerSpec"] = []
+
+    def build(self) -> RebalancingStrategy:
+        if self.kind == "out_of_range":
+            return OutOfRangeRebalancer()
+        if self.kind == "time_triggered":
+            return TimeTriggeredRebalancer(interval=self.interval)
+        if self.kind == "out_of_range_duration":
+            return OutOfRangeDurationRebalancer(duration=self.duration)
+        return MultiConditionRebalancer(
+            strategies=[s.build() for s in self.strategies], mode=self.mode
+        )
+
+
+class PositionSpec(BaseModel):
+    tick_lower: int
+    tick_upper: int
+    amount0: Decimal
+    amount1: Decimal
+    rebalancer: RebalancerSpec | None = None
+
+
+class SwapWindow(BaseModel):
+    pool: Pool
+    start: datetime | None = None
+    end: datetime | None = None
+    start_block: int | None = None
+    end_block: int | None = None
+
+    def query(self) -> SwapQuery:
+        return SwapQuery(
+            pool_address=self.pool.address,
+            start=self.start,
+            end=self.end,
+            start_block=self.start_block,
+            end_block=self.end_block,
+        )
+
+
+class BacktestRequest(SwapWindow):
+    position: PositionSpec
+    rebalance_bias: float = Field(default=0.5, ge=0.0, le=1.0)
+
+
+class SweepRequest(SwapWindow):
+    positions: list[PositionSpec]
+    rebalance_bias: float = Field(default=0.5, ge=0.0, le=1.0)
+    executor: ExecutorKind = ExecutorKind.SERIAL
+    max_workers: int | None = None
+
+
+class BacktestResponse(BaseModel):
+    result: BacktestResult
+    swaps: int
+    elapsed_seconds: float
+
+
+class SweepResponse(BaseModel):
+    results: list[BacktestResult | TaskFailure]
+    swaps: int
+    elapsed_seconds: float
+
+
+class SwapSeriesCache:
+    """
+    Swap series loaded from a SwapSource, kept in memory and evicted least
+    recently used first once more than `max_series` series or `max_swaps`
+    swaps are held. Concurrent requests for the same series load it once.
+    """
+
+    def __init__(
+        self, source: SwapSource, max_series: int = 8, max_swaps: int | None = None
+    ):
+        self.source = source
+        self.max_series = max_series
+        self.max_swaps = max_swaps
+        self.hits = 0
+        self.loads = 0
+        self._series: OrderedDict[tuple, list[Swap]] = OrderedDict()
+        self._loading: dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, query: SwapQuery) -> list[Swap]:
+        key = (
+            query.pool_address.lower(),
+            query.start,
+            query.end,
+            query.start_block,
+            query.end_block,
+        )
+        with self._lock:
+            if key in self._series:
+                self._series.move_to_end(key)
+                self.hits += 1
+                return self._series[key]
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        with loading:
+            with self._lock:
+                if key in self._series:
+                    self._series.move_to_end(key)
+                    self.hits += 1
+                    return self._series[key]
+            try:
+                swaps = self.source.swaps(query)
+            except BaseException:
+                with self._lock:
+                    self._loading.pop(key, None)
+                raise
+            # Publish the series and retire its loading lock together, so a
+            # request arriving in between cannot miss both and load again.
+            with self._lock:
+                self.loads += 1
+                self._series[key] = swaps
+                self._loading.pop(key, None)
+                self._evict()
+        return swaps
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    @property
+    def swap_count(self) -> int:
+        return sum(len(s) for s in self._series.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def _evict(self) -> None:
+        while len(self._series) > self.max_series or (
+            self.max_swaps is not None
+            and len(self._series) > 1
+            and self.swap_count > self.max_swaps
+        ):
+            self._series.popitem(last=False)
+
+
+class BacktestService:
+    """
+    Long-lived backtest engine that keeps swap series hot between requests.
+
+    At most `max_concurrent` requests simulate at once; a request waits up to
+    `queue_timeout` seconds for a slot and then fails with ServiceBusy.
+    """
+
+    def __init__(
+        self,
+        source: SwapSource,
+        max_series: int = 8,
+        max_swaps: int | None = None,
+        max_concurrent: int = 4,
+        queue_timeout: float = 30.0,
+    ):
+        self.series = SwapSeriesCache(source, max_series, max_swaps)
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def backtest(self, request: BacktestRequest) -> BacktestResponse:
+        with self._slot():
+            start = time.perf_counter()
+            swaps = self._swaps(request)
+            position = _build_position(request.position, request.pool)
+            rebalancer = request.position.rebalancer
+            result = BacktestRunner(
+                position=position,
+                swaps=swaps,
+                tracker=ActivityTracker(position=position),
+                calculator=FeeCalculator(position=position),
+                rebalancer=rebalancer.build() if rebalancer else None,
+                rebalance_bias=request.rebalance_bias,
+            ).run()
+            return BacktestResponse(
+                result=result,
+                swaps=len(swaps),
+                elapsed_seconds=time.perf_counter() - start,
+            )
+
+    def sweep(self, request: SweepRequest) -> SweepResponse:
+        with self._slot():
+            start = time.perf_counter()
+            swaps = self._swaps(request)
+            positions = [_build_position(p, request.pool) for p in request.positions]
+            runner = MultiPositionBacktestRunner(
+                positions=positions,
+                swap_series_list=[swaps] * len(positions),
+                trackers=[],
+                calculators=[],
+                rebalancers=[
+                    p.rebalancer.build() if p.rebalancer else None
+                    for p in request.positions
+                ],
+                rebalance_bias=request.rebalance_bias,
+            )
+            results = runner.run(
+                executor=request.executor, max_workers=request.max_workers
+            )
+            return SweepResponse(
+                results=results,
+                swaps=len(swaps),
+                elapsed_seconds=time.perf_counter() - start,
+            )
+
+    def stats(self) -> dict:
+        return {
+            "series": len(self.series),
+            "swaps": self.series.swap_count,
+            "hits": self.series.hits,
+            "loads": self.series.loads,
+        }
+
+    def _swaps(self, request: SwapWindow) -> list[Swap]:
+        swaps = self.series.get(request.query())
+        if not swaps:
+            raise ValueError("No swaps found for the requested window.")
+        return swaps
+
+    def _slot(self) -> "_Slot":
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise ServiceBusy("Too many concurrent requests.")
+        return _Slot(self._slots)
+
+
+class _Slot:
+    def __init__(self, semaphore: threading.BoundedSemaphore):
+        self.semaphore = semaphore
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> None:
+        self.semaphore.release()
+
+
+def _build_position(spec: PositionSpec, pool: Pool) -> Position:
+    return Position(
+        tick_lower=spec.tick_lower,
+        tick_upper=spec.tick_upper,
+        amount0=spec.amount0,
+        amount1=spec.amount1,
+        pool=pool,
+    )
+
+
+class BacktestRequestHandler(BaseHTTPRequestHandler):
+    service: BacktestService
+
+    routes = {
+        "/backtest": (BacktestRequest, "backtest"),
+        "/sweep": (SweepRequest, "sweep"),
+    }
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send(200, self.service.stats())
+        else:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path not in self.routes:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        model, method = self.routes[self.path]
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = model.model_validate_json(self.rfile.read(length))
+            response = getattr(self.service, method)(request)
+        except ValidationError as exc:
+            self._send(400, {"error": "invalid request", "details": exc.errors()})
+        except ValueError as exc:
+            self._send(400, {"error": str(exc)})
+        except ServiceBusy as exc:
+            self._send(503, {"error": str(exc)})
+        except Exception as exc:
+            self._send(500, {"error": f"{type(exc).__name__}: {exc}"})
+        else:
+            self._send(200, response.model_dump(mode="json"))
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(
+    service: BacktestService, host: str = "127.0.0.1", port: int = 8765
+) -> ThreadingHTTPServer:
+    handler = type(
+        "BoundBacktestRequestHandler", (BacktestRequestHandler,), {"service": service}
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    from lobster_assessment.sources import PostgresSwapSource
+
+    server = make_server(BacktestService(PostgresSwapSource.from_config()))
+    print(
+        f"Backtest service listening on http://{server.server_address[0]}:"
+        f"{server.server_address[1]}"
+    )
+    server.serve_forever()
@@ -0,0 +1,357 @@
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+from pydantic import BaseModel, Field
+from sqlalchemy.engine import Engine
+
+from lobster_assessment.config import Config
+from lobster_assessment.db import get_engine
+from lobster_assessment.domain.models import Swap, SwapArrays
+from lobster_assessment.domain.validation import build, is_trusted
+
+try:
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:  # pragma: no cover - depends on the environment
+    pc = ds = None
+
+SWAP_COLUMNS = [
+    "block_number",
+    "event_index",
+    "tick",
+    "volume_token0",
+    "volume_token1",
+    "liquidity",
+    "sqrt_price_x96",
+    "timestamp",
+]
+
+
+class SwapQuery(BaseModel):
+    """Swaps of one pool over an inclusive time and/or block range."""
+
+    pool_address: str
+    start: datetime | None = None
+    end: datetime | None = None
+    start_block: int | None = None
+    end_block: int | None = None
+    columns: list[str] | None = None
+    batch_size: int = Field(default=50_000, gt=0)
+
+    @property
+    def selected_columns(self) -> list[str]:
+        if self.columns is None:
+            return SWAP_COLUMNS
+        unknown = set(self.columns) - set(SWAP_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown swap columns: {sorted(unknown)}")
+        return self.columns
+
+
+class SwapSource:
+    """
+    Where swaps come from.
+
+    Implementations yield DataFrames of at most `query.batch_size` rows in
+    chronological order, holding only the requested columns, and push the
+    range filters and projection down to the backend where it can do them.
+    """
+
+    def iter_chunks(self, query: SwapQuery) -> Iterator[pd.DataFrame]:
+        raise NotImplementedError
+
+    def fetch(self, query: SwapQuery) -> pd.DataFrame:
+        chunks = list(self.iter_chunks(query))
+        if not chunks:
+            return pd.DataFrame(columns=query.selected_columns)
+        return pd.concat(chunks, ignore_index=True)
+
+    def swaps(self, query: SwapQuery) -> list[Swap]:
+        return swaps_from_frame(self.fetch(query))
+
+    def iter_swaps(self, query: SwapQuery) -> Iterator[Swap]:
+        """Swaps of `query`, decoded one chunk at a time."""
+        for chunk in self.iter_chunks(query):
+            yield from swaps_from_frame(chunk)
+
+
+class SqlSwapSource(SwapSource):
+    def __init__(
+        self,
+        engine: Engine,
+        swaps_table: str | None = None,
+        blocks_table: str | None = None,
+        schema: str | None = None,
+    ):
+        self.engine = engine
+        self.swaps_table = sa.table(
+            swaps_table or f"uniswap_v3_swap_{Config.CHAIN_ID}",
+            sa.column("pool_address", sa.String),
+            sa.column("block_number", sa.Integer),
+            sa.column("event_index", sa.Integer),
+            sa.column("tick", sa.Integer),
+            sa.column("volume_token0", sa.String),
+            sa.column("volume_token1", sa.String),
+            sa.column("liquidity", sa.String),
+            sa.column("sqrt_price_x96", sa.String),
+            schema=schema,
+        )
+        self.blocks_table = sa.table(
+            blocks_table or f"blocks_{Config.CHAIN_ID}",
+            sa.column("block_number", sa.Integer),
+            sa.column("block_date", sa.DateTime),
+            schema=schema,
+        )
+
+    def statement(self, query: SwapQuery) -> sa.Select:
+        s, b = self.swaps_table, self.blocks_table
+        columns = [
+            b.c.block_date.label("timestamp") if name == "timestamp" else s.c[name]
+            for name in query.selected_columns
+        ]
+        stmt = (
+            sa.select(*columns)
+            .select_from(s.join(b, s.c.block_number == b.c.block_number))
+            .where(sa.func.lower(s.c.pool_address) == query.pool_address.lower())
+            .order_by(b.c.block_date, s.c.block_number, s.c.event_index)
+        )
+        if query.start is not None:
+            stmt = stmt.where(b.c.block_date >= query.start)
+        if query.end is not None:
+            stmt = stmt.where(b.c.block_date <= query.end)
+        if query.start_block is not None:
+            stmt = stmt.where(s.c.block_number >= query.start_block)
+        if query.end_block is not None:
+            stmt = stmt.where(s.c.block_number <= query.end_block)
+        return stmt
+
+    def iter_chunks(self, query: SwapQuery) -> Iterator[pd.DataFrame]:
+        with self.engine.connect() as connection:
+            connection = connection.execution_options(
+                stream_results=True, yield_per=query.batch_size
+            )
+            result = connection.execute(self.statement(query))
+            for rows in result.partitions(query.batch_size):
+                yield pd.DataFrame.from_records(rows, columns=query.selected_columns)
+
+
+class PostgresSwapSource(SqlSwapSource):
+    def __init__(
+        self,
+        engine: Engine,
+        swaps_table: str | None = None,
+        blocks_table: str | None = None,
+    ):
+        super().__init__(engine, swaps_table, blocks_table, schema="public")
+
+    @classmethod
+    def from_config(cls) -> "PostgresSwapSource":
+        return cls(get_engine())
+
+
+class SQLiteSwapSource(SqlSwapSource):
+    def __init__(
+        self,
+        path: str | Path,
+        swaps_table: str | None = None,
+        blocks_table: str | None = None,
+    ):
+        super().__init__(
+            sa.create_engine(f"sqlite:///{path}"), swaps_table, blocks_table
+        )
+
+
+class ParquetSwapSource(SwapSource):
+    """
+    Swaps stored as Parquet (a file or a directory of files) with the columns
+    of `SWAP_COLUMNS` plus `pool_address`, written in chronological order.
+
+    Requires the optional `pyarrow` dependency.
+    """
+
+    def __init__(self, path: str | Path):
+        if ds is None:
+            raise ImportError(
+                "ParquetSwapSource requires the 'parquet' extra (pyarrow)."
+            )
+        self.dataset = ds.dataset(str(path), format="parquet")
+
+    def iter_chunks(self, query: SwapQuery) -> Iterator[pd.DataFrame]:
+        condition = pc.utf8_lower(ds.field("pool_address")) == (
+            query.pool_address.lower()
+        )
+        if query.start is not None:
+            condition &= ds.field("timestamp") >= query.start
+        if query.end is not None:
+            condition &= ds.field("timestamp") <= query.end
+        if query.start_block is not None:
+            condition &= ds.field("block_number") >= query.start_block
+        if query.end_block is not None:
+            condition &= ds.field("block_number") <= query.end_block
+
+        batches = self.dataset.to_batches(
+            columns=query.selected_columns,
+            filter=condition,
+            batch_size=query.batch_size,
+        )
+        yield from _rebatch((b.to_pandas() for b in batches), query.batch_size)
+
+    @staticmethod
+    def write(frame: pd.DataFrame, path: str | Path) -> None:
+        frame.to_parquet(path, index=False)
+
+
+class InMemorySwapSource(SwapSource):
+    """Swaps held in a DataFrame with `SWAP_COLUMNS` plus `pool_address`."""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame.sort_values(
+            ["timestamp", "block_number", "event_index"], kind="stable"
+        ).reset_index(drop=True)
+        self._pools = self.frame["pool_address"].str.lower()
+
+    def iter_chunks(self, query: SwapQuery) -> Iterator[pd.DataFrame]:
+        f = self.frame
+        mask = self._pools == query.pool_address.lower()
+        if query.start is not None:
+            mask &= f["timestamp"] >= query.start
+        if query.end is not None:
+            mask &= f["timestamp"] <= query.end
+        if query.start_block is not None:
+            mask &= f["block_number"] >= query.start_block
+        if query.end_block is not None:
+            mask &= f["block_number"] <= query.end_block
+
+        selected = f.loc[mask.to_numpy(), query.selected_columns]
+        for start in range(0, len(selected), query.batch_size):
+            yield selected.iloc[start : start + query.batch_size].reset_index(drop=True)
+
+
+def _rebatch(frames: Iterator[pd.DataFrame], size: int) -> Iterator[pd.DataFrame]:
+    """Regroup a stream of frames into frames of exactly `size` rows (bar the last)."""
+    pending: list[pd.DataFrame] = []
+    rows = 0
+    for frame in frames:
+        if frame.empty:
+            continue
+        pending.append(frame)
+        rows += len(frame)
+        while rows >= size:
+            merged = pd.concat(pending, ignore_index=True)
+            yield merged.iloc[:size].reset_index(drop=True)
+            rest = merged.iloc[size:].reset_index(drop=True)
+            pending = [rest] if len(rest) else []
+            rows = len(rest)
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
+
+
+_DECIMAL_COLUMNS = ["volume_token0", "volume_token1", "liquidity", "sqrt_price_x96"]
+
+
+def check_swap_frame(frame: pd.DataFrame) -> None:
+    """
+    Check a whole frame of swaps against the Swap schema at once.
+
+    Raises ValueError naming the column and the first offending row.
+    """
+    missing = {"tick", "timestamp", *_DECIMAL_COLUMNS} - set(frame.columns)
+    if missing:
+        raise ValueError(f"Missing swap columns: {sorted(missing)}")
+
+    def fail(column: str, bad: pd.Series, reason: str) -> None:
+        if bad.any():
+            row = frame.index[bad.to_numpy()][0]
+            raise ValueError(f"Column {column!r} {reason} at row {row}")
+
+    ticks = pd.to_numeric(frame["tick"], errors="coerce")
+    fail("tick", ticks.isna() | (ticks != ticks.round()), "is not an integer")
+    for column in _DECIMAL_COLUMNS:
+        values = pd.to_numeric(frame[column], errors="coerce")
+        fail(column, values.isna(), "is not a finite number")
+        fail(column, values.abs() == np.inf, "is not a finite number")
+        if column == "liquidity":
+            fail(column, values < 0, "is negative")
+        if column == "sqrt_price_x96":
+            fail(column, values <= 0, "is not positive")
+    timestamps = pd.to_datetime(frame["timestamp"], errors="coerce")
+    fail("timestamp", timestamps.isna(), "is not a timestamp")
+
+
+def swaps_from_frame(frame: pd.DataFrame) -> list[Swap]:
+    """
+    Decode a frame into Swap models.
+
+    Strict mode validates every Swap; trusted mode checks the frame once with
+    check_swap_frame and builds the models without validation.
+    """
+    trusted = is_trusted()
+    if trusted:
+        check_swap_frame(frame)
+    columns = ["tick", *_DECIMAL_COLUMNS]
+    timestamps = pd.to_datetime(frame["timestamp"], errors="coerce").dt.to_pydatetime()
+    if not trusted:
+        # Leave the checks to Swap, so both modes reject the same rows.
+        rows = zip(frame[columns].itertuples(index=False), timestamps)
+        return [
+            Swap(
+                tick=row.tick,
+                volume_token0=str(row.volume_token0),
+                volume_token1=str(row.volume_token1),
+                liquidity=str(row.liquidity),
+                sqrt_price_x96=str(row.sqrt_price_x96),
+                timestamp=None if pd.isna(timestamp) else timestamp,
+            )
+            for row, timestamp in rows
+        ]
+
+    ticks = pd.to_numeric(frame["tick"]).astype(np.int64).tolist()
+    decimals = [[Decimal(str(v)) for v in frame[c].tolist()] for c in _DECIMAL_COLUMNS]
+    return [
+        build(
+            Swap,
+            {
+                "tick": tick,
+                "volume_token0": volume0,
+                "volume_token1": volume1,
+                "liquidity": liquidity,
+                "timestamp": timestamp,
+                "sqrt_price_x96": sqrt_price,
+            },
+        )
+        for tick, volume0, volume1, liquidity, sqrt_price, timestamp in zip(
+            ticks, *decimals, timestamps
+        )
+    ]
+
+
+def swap_arrays_from_frame(frame: pd.DataFrame) -> SwapArrays:
+    return SwapArrays(
+        ticks=frame["tick"].to_numpy(dtype=np.int64),
+        volume_token0=frame["volume_token0"].astype(float).to_numpy(),
+        volume_token1=frame["volume_token1"].astype(float).to_numpy(),
+        liquidity=frame["liquidity"].astype(float).to_numpy(),
+        sqrt_price_x96=frame["sqrt_price_x96"].astype(float).to_numpy(),
+        timestamps=pd.to_datetime(frame["timestamp"])
+        .to_numpy()
+        .astype("datetime64[us]"),
+    )
+
+
+def benchmark_sources(
+    sources: dict[str, SwapSource], query: SwapQuery
+) -> dict[str, float]:
+    """Seconds each source takes to stream `query` end to end, fastest first."""
+    timings = {}
+    for name, source in sources.items():
+        start = time.perf_counter()
+        for _ in source.iter_chunks(query):
+            pass
+        timings[name] = time.perf_counter() - start
+    return dict(sorted(timings.items(), key=lambda item: item[1]))
@@ -0,0 +1,188 @@
+import threading
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from lobster_assessment.sources import SwapQuery, SwapSource
+
+# fetch(pool_address, start_block, end_block) -> rows with start <= block < end
+RangeFetcher = Callable[[str, int, int], pd.DataFrame]
+
+
+class SwapCacheStats(BaseModel):
+    requests: int = 0
+    full_hits: int = 0
+    gap_queries: int = 0
+    rows_fetched: int = 0
+    rows_served: int = 0
+    evictions: int = 0
+
+
+class _Segment:
+    """Rows of one pool over the half-open block range [start, end)."""
+
+    def __init__(self, start: int, end: int, frame: pd.DataFrame, key: str):
+        self.start = start
+        self.end = end
+        self.frame = frame
+        self.keys = frame[key].to_numpy()
+        self.nbytes = int(frame.memory_usage(deep=True).sum())
+        self.last_used = 0
+
+
+class SwapRangeCache:
+    """
+    In-memory cache of swap rows per pool over block ranges.
+
+    A request for [start_block, end_block) is answered from the cached
+    segments of the pool, fetching only the uncovered gaps. Overlapping and
+    adjacent segments are merged, so coverage stays one segment per
+    contiguous range. Segments are evicted least recently used first once
+    their frames exceed `max_bytes`. One lock guards the bookkeeping and is
+    never held during a fetch; gaps are fetched under a lock per pool, so a
+    slow query only holds up requests for the same pool.
+
+    `fetch` returns the rows of a pool with `start <= block < end`, with at
+    least the `key` column; rows within a segment are kept sorted by it.
+    """
+
+    def __init__(
+        self,
+        fetch: RangeFetcher,
+        max_bytes: int = 256 * 1024 * 1024,
+        key: str = "block_number",
+    ):
+        self.fetch = fetch
+        self.max_bytes = max_bytes
+        self.key = key
+        self.stats = SwapCacheStats()
+        self._segments: dict[str, list[_Segment]] = {}
+        self._clock = 0
+        self._lock = threading.Lock()
+        self._pool_locks: dict[str, threading.Lock] = {}
+
+    @classmethod
+    def from_source(
+        cls,
+        source: SwapSource,
+        max_bytes: int = 256 * 1024 * 1024,
+        columns: list[str] | None = None,
+    ) -> "SwapRangeCache":
+        def fetch(pool_address: str, start_block: int, end_block: int):
+            return source.fetch(
+                SwapQuery(
+                    pool_address=pool_address,
+                    start_block=start_block,
+                    end_block=end_block - 1,
+                    columns=columns,
+                )
+            )
+
+        return cls(fetch, max_bytes=max_bytes)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(s.nbytes for segs in self._segments.values() for s in segs)
+
+    def coverage(self, pool_address: str) -> list[tuple[int, int]]:
+        """Cached block ranges of a pool, as sorted half-open intervals."""
+        with self._lock:
+            segments = self._segments.get(pool_address.lower(), [])
+            return [(s.start, s.end) for s in segments]
+
+    def get(self, pool_address: str, start_block: int, end_block: int) -> pd.DataFrame:
+        """Rows of the pool with `start_block <= block < end_block`."""
+        if end_block <= start_block:
+            raise ValueError("end_block must be after start_block")
+        pool = pool_address.lower()
+        with self._lock:
+            self.stats.requests += 1
+            pool_lock = self._pool_locks.setdefault(pool, threading.Lock())
+
+        with pool_lock:
+            with self._lock:
+                held = list(self._segments.setdefault(pool, []))
+                gaps = _gaps(held, start_block, end_block)
+                if not gaps:
+                    self.stats.full_hits += 1
+                    return self._serve(pool, start_block, end_block)
+
+            fetched = [self._fetch_gap(pool_address, lo, hi) for lo, hi in gaps]
+
+            with self._lock:
+                self.stats.gap_queries += len(fetched)
+                self.stats.rows_fetched += sum(len(s.frame) for s in fetched)
+                segments = self._segments.setdefault(pool, [])
+                # Put back what other pools' requests evicted meanwhile, so
+                # the segments to merge still cover the range.
+                segments.extend(s for s in held if s not in segments)
+                segments.extend(fetched)
+                return self._serve(pool, start_block, end_block)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._segments.clear()
+
+    def _fetch_gap(self, pool_address: str, start: int, end: int) -> _Segment:
+        frame = self.fetch(pool_address, start, end)
+        if not frame[self.key].is_monotonic_increasing:
+            frame = frame.sort_values(self.key, kind="stable")
+        return _Segment(start, end, frame.reset_index(drop=True), self.key)
+
+    def _serve(self, pool: str, start: int, end: int) -> pd.DataFrame:
+        """Rows of [start, end) from the pool's segments, which cover it."""
+        segment = self._merge(self._segments[pool], start, end)
+        self._clock += 1
+        segment.last_used = self._clock
+        lo = int(np.searchsorted(segment.keys, start, side="left"))
+        hi = int(np.searchsorted(segment.keys, end, side="left"))
+        result = segment.frame.iloc[lo:hi].reset_index(drop=True)
+        self.stats.rows_served += len(result)
+        self._evict()
+        return result
+
+    def _merge(self, segments: list[_Segment], start: int, end: int) -> _Segment:
+        """Merge the segments touching [start, end) into one, in place."""
+        segments.sort(key=lambda s: s.start)
+        touching = [s for s in segments if s.end >= start and s.start <= end]
+        if len(touching) == 1:
+            return touching[0]
+        frames = [s.frame for s in touching if len(s.frame)]
+        frame = pd.concat(frames, ignore_index=True) if frames else touching[0].frame
+        merged = _Segment(touching[0].start, touching[-1].end, frame, self.key)
+        segments[:] = [s for s in segments if s not in touching]
+        segments.append(merged)
+        segments.sort(key=lambda s: s.start)
+        return merged
+
+    def _evict(self) -> None:
+        total = self.nbytes
+        while total > self.max_bytes:
+            pool, segment = min(
+                (
+                    (pool, segment)
+                    for pool, segments in self._segments.items()
+                    for segment in segments
+                ),
+                key=lambda item: item[1].last_used,
+            )
+            self._segments[pool].remove(segment)
+            total -= segment.nbytes
+            self.stats.evictions += 1
+
+
+def _gaps(segments: list[_Segment], start: int, end: int) -> list[tuple[int, int]]:
+    """Sub-ranges of [start, end) not covered by the sorted `segments`."""
+    gaps = []
+    cursor = start
+    for segment in segments:
+        if segment.end <= cursor or segment.start >= end:
+            continue
+        if segment.start > cursor:
+            gaps.append((cursor, segment.start))
+        cursor = max(cursor, segment.end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+import pytest
+
+from lobster_assessment.application import core
+from lobster_assessment.application.algo import ActivityTracker, FeeCalculator
+from lobster_assessment.application.cache import ResultCache
+from lobster_assessment.application.core import BacktestResult, BacktestRunner
+from lobster_assessment.application.rebalancing import (
+    LogicMode,
+    MultiConditionRebalancer,
+    OutOfRangeDurationRebalancer,
+    OutOfRangeRebalancer,
+    TimeTriggeredRebalancer,
+)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(tmp_path / "results.sqlite")
+
+
+def make_runner(position, swap_series, cache, bias=0.5):
+    pos = position.model_copy()
+    return BacktestRunner(
+        position=pos,
+        swaps=swap_series.swaps,
+        tracker=ActivityTracker(position=pos),
+        calculator=FeeCalculator(position=pos),
+        rebalancer=OutOfRangeRebalancer(),
+        rebalance_bias=bias,
+        cache=cache,
+    )
+
+
+def test_cache_hit_skips_simulation(position, swap_series, cache):
+    first = make_runner(position, swap_series, cache).run()
+    assert len(cache) == 1
+
+    runner = make_runner(position, swap_series, cache)
+    second = runner.run()
+
+    assert second == first
+    assert not hasattr(runner, "activity_series")
+    assert runner.position.tick_lower == position.tick_lower
+
+
+def test_cache_key_depends_on_config_and_data(position, swap_series, cache):
+    base = make_runner(position, swap_series, cache).cache_key()
+    assert make_runner(position, swap_series, cache, bias=0.25).cache_key() != base
+
+    shorter = swap_series.model_copy(update={"swaps": swap_series.swaps[:2]})
+    assert make_runner(position, shorter, cache).cache_key() != base
+
+
+def test_cache_persists_across_instances(position, swap_series, tmp_path):
+    path = tmp_path / "results.sqlite"
+    expected = make_runner(position, swap_series, ResultCache(path)).run()
+
+    reopened = ResultCache(path)
+    key = make_runner(position, swap_series, reopened).cache_key()
+    assert reopened.get(key, BacktestResult) == expected
+
+
+def test_cache_evicts_by_size(tmp_path):
+    result = BacktestResult(total_fees_token0=1, total_fees_token1=2, apr=3)
+    size = len(result.model_dump_json())
+    cache = ResultCache(tmp_path / "results.sqlite", max_bytes=2 * size)
+
+    for key in ("a", "b", "c"):
+        cache.put(key, result)
+
+    assert len(cache) == 2
+    assert cache.get("a", BacktestResult) is None
+    assert cache.get("c", BacktestResult) == result
+
+
+def test_cache_evicts_by_age(tmp_path):
+    result = BacktestResult(total_fees_token0=1, total_fees_token1=2, apr=3)
+    cache = ResultCache(tmp_path / "results.sqlite", max_age=timedelta(0))
+
+    cache.put("a", result)
+    assert cache.get("a", BacktestResult) is None
+
+
+def test_memory_hits_count_as_recent_use(tmp_path):
+    result = BacktestResult(total_fees_token0=1, total_fees_token1=2, apr=3)
+    size = len(result.model_dump_json())
+    cache = ResultCache(tmp_path / "results.sqlite", max_bytes=2 * size)
+
+    cache.put("a", result)
+    cache.put("b", result)
+    assert cache.get("a", BacktestResult) == result
+    cache.put("c", result)
+
+    assert cache.get("b", BacktestResult) is None
+    assert cache.get("a", BacktestResult) == result
+
+
+def test_cache_key_ignores_the_position_of_tracker_and_calculator(
+    position, swap_series, cache
+):
+    runner = make_runner(position, swap_series, cache)
+    other = position.model_copy(update={"tick_lower": 900})
+    rebound = make_runner(position, swap_series, cache)
+    rebound.tracker = ActivityTracker(position=other)
+    rebound.calculator = FeeCalculator(position=other)
+    assert rebound.cache_key() == runner.cache_key()
+
+
+def test_cache_key_depends_on_sub_strategies(position, swap_series, cache):
+    def multi(child):
+        runner = make_runner(position, swap_series, cache)
+        runner.rebalancer = MultiConditionRebalancer(
+            strategies=[OutOfRangeRebalancer(), child], mode=LogicMode.OR
+        )
+        return runner
+
+    timed = multi(TimeTriggeredRebalancer(interval=timedelta(seconds=30)))
+    lasting = multi(OutOfRangeDurationRebalancer(duration=timedelta(seconds=30)))
+    assert timed.cache_key() != lasting.cache_key()
+
+    timed.run()
+    lasting.run()
+    assert len(cache) == 2
+
+
+def test_swap_fingerprint_is_computed_once(position, swap_series, cache, monkeypatch):
+    calls = []
+    fingerprint = core.fingerprint_swaps
+    monkeypatch.setattr(
+        core, "fingerprint_swaps", lambda *args: calls.append(1) or fingerprint(*args)
+    )
+    runner = make_runner(position, swap_series, cache)
+    first = runner.run()
+    assert runner.run() == first
+    assert len(calls) == 1
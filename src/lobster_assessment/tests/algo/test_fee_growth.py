@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from lobster_assessment.application.algo import ActivityTracker, FeeCalculator
+from lobster_assessment.application.core import BacktestRunner
+from lobster_assessment.application.fee_growth import FeeGrowthIndex
+from lobster_assessment.application.math import tick_to_sqrt_price
+from lobster_assessment.domain.models import Swap, SwapArrays
+
+
+@pytest.fixture
+def swap_arrays() -> SwapArrays:
+    rng = np.random.default_rng(3)
+    n = 5000
+    liquidity = rng.uniform(1e6, 5e6, n)
+    liquidity[::97] = 0.0
+    return SwapArrays(
+        ticks=np.cumsum(rng.integers(-40, 41, n)).astype(np.int64) + 1500,
+        volume_token0=rng.uniform(0, 100, n),
+        volume_token1=rng.uniform(0, 1000, n),
+        liquidity=liquidity,
+        sqrt_price_x96=np.ones(n),
+        timestamps=np.datetime64("2024-01-01T00:00:00", "us")
+        + np.arange(n) * np.timedelta64(1, "m"),
+    )
+
+
+def brute_force(arrays, fee, tick_lower, tick_upper, i0, i1):
+    ticks = arrays.ticks[i0:i1]
+    liquidity = arrays.liquidity[i0:i1]
+    mask = (tick_lower <= ticks) & (ticks <= tick_upper) & (liquidity > 0)
+    return (
+        (arrays.volume_token0[i0:i1][mask] * fee / liquidity[mask]).sum(),
+        (arrays.volume_token1[i0:i1][mask] * fee / liquidity[mask]).sum(),
+    )
+
+
+@pytest.mark.parametrize("checkpoint_interval", [1, 64, 1000, 10_000])
+def test_growth_inside_matches_brute_force(swap_arrays, checkpoint_interval):
+    index = FeeGrowthIndex.build(
+        swap_arrays, fee=0.003, tick_spacing=60, checkpoint_interval=checkpoint_interval
+    )
+    rng = np.random.default_rng(5)
+    start = swap_arrays.timestamps[0].astype(datetime)
+    for _ in range(200):
+        tick_lower = int(rng.integers(-2000, 4000))
+        tick_upper = tick_lower + int(rng.integers(0, 3000))
+        if rng.random() < 0.3:
+            tick_lower -= tick_lower % 60
+            tick_upper -= tick_upper % 60
+        i0, i1 = sorted(rng.integers(0, len(swap_arrays) + 1, 2))
+        expected = brute_force(swap_arrays, 0.003, tick_lower, tick_upper, i0, i1)
+
+        actual = index.growth_inside(
+            tick_lower,
+            tick_upper,
+            start + timedelta(minutes=int(i0)),
+            start + timedelta(minutes=int(i1) - 1),
+        )
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-12)
+
+
+def test_fees_within_documented_bound_of_fee_calculator(position, swap_arrays):
+    swaps = [
+        Swap(
+            tick=int(t),
+            volume_token0=Decimal(repr(float(v0))),
+            volume_token1=Decimal(repr(float(v1))),
+            liquidity=Decimal(repr(float(liq))),
+            sqrt_price_x96=tick_to_sqrt_price(int(t)),
+            timestamp=ts.astype(datetime),
+        )
+        for t, v0, v1, liq, ts in zip(
+            swap_arrays.ticks,
+            swap_arrays.volume_token0,
+            swap_arrays.volume_token1,
+            swap_arrays.liquidity,
+            swap_arrays.timestamps,
+        )
+        if liq > 0
+    ]
+    exact = BacktestRunner(
+        position=position,
+        swaps=swaps,
+        tracker=ActivityTracker(position=position),
+        calculator=FeeCalculator(position=position),
+        rebalance_bias=0.5,
+    ).run()
+
+    index = FeeGrowthIndex.build(swap_arrays, fee=float(position.pool.fee))
+    fee0, fee1 = index.fees_for_position(position)
+    bound = index.relative_error_bound(float(position.liquidity))
+
+    assert index.zero_liquidity_swaps == len(swap_arrays) - len(swaps)
+    for approximate, reference in (
+        (fee0, float(exact.total_fees_token0)),
+        (fee1, float(exact.total_fees_token1)),
+    ):
+        assert reference > 0
+        assert 0 <= approximate - reference <= reference * bound * (1 + 1e-9)
+
+
+def test_error_bound_is_unbounded_without_liquidity(swap_arrays):
+    empty = swap_arrays.model_copy(
+        update={"liquidity": np.zeros(len(swap_arrays.liquidity))}
+    )
+    index = FeeGrowthIndex.build(empty, fee=0.003)
+    assert index.relative_error_bound(1e6) == float("inf")
+    assert index.fees(1000, 2000, 1e6) == (0.0, 0.0)
+
+
+def test_save_and_load_round_trip(tmp_path, swap_arrays):
+    index = FeeGrowthIndex.build(swap_arrays, fee=0.003)
+    path = tmp_path / "growth.npz"
+    index.save(str(path))
+    loaded = FeeGrowthIndex.load(str(path))
+
+    assert loaded.growth_inside(1000, 2000) == index.growth_inside(1000, 2000)
+    assert loaded.zero_liquidity_swaps == index.zero_liquidity_swaps
+
+
+def test_zero_liquidity_swaps_make_the_estimate_low(position):
+    start = datetime(2024, 1, 1)
+    swaps = [
+        Swap(
+            tick=1500,
+            volume_token0=Decimal(10),
+            volume_token1=Decimal(100),
+            liquidity=Decimal(liquidity),
+            sqrt_price_x96=tick_to_sqrt_price(1500),
+            timestamp=start + timedelta(minutes=i),
+        )
+        for i, liquidity in enumerate([10**6, 0, 10**6])
+    ]
+    exact = BacktestRunner(
+        position=position,
+        swaps=swaps,
+        tracker=ActivityTracker(position=position),
+        calculator=FeeCalculator(position=position),
+        rebalance_bias=0.5,
+    ).run()
+
+    index = FeeGrowthIndex.build(
+        SwapArrays.from_swaps(swaps), fee=float(position.pool.fee)
+    )
+    fee0, _ = index.fees_for_position(position)
+    assert index.zero_liquidity_swaps == 1
+    assert -1 <= fee0 / float(exact.total_fees_token0) - 1 < 0
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from lobster_assessment.application.algo import ActivityTracker
+from lobster_assessment.application.interval_index import PositionIntervalIndex
+
+
+def brute_force(ranges, tick):
+    return {k for k, (lower, upper) in ranges.items() if lower <= tick <= upper}
+
+
+def test_index_matches_brute_force_under_moves_and_updates():
+    rng = random.Random(7)
+    ranges = {}
+    for i in range(300):
+        lower = rng.randint(-1000, 1000)
+        ranges[i] = (lower, lower + rng.randint(1, 400))
+    index = PositionIntervalIndex(ranges)
+
+    tick = 0
+    previous = set()
+    for step in range(2000):
+        tick += rng.randint(-60, 60)
+        if step % 50 == 0:
+            key = rng.randrange(300)
+            lower = tick - rng.randint(0, 100)
+            ranges[key] = (lower, lower + rng.randint(1, 200))
+            index.update(key, *ranges[key])
+            previous = set(index.active)
+
+        change = index.move(tick)
+        expected = brute_force(ranges, tick)
+        assert index.active == expected
+        assert change.entered == expected - previous
+        assert change.exited == previous - expected
+        previous = expected
+
+
+def test_bounds_are_inclusive_like_activity_tracker(position):
+    index = PositionIntervalIndex.from_positions({"p": position})
+    tracker = ActivityTracker(position=position)
+    for tick in (999, 1000, 1500, 2000, 2001, 1000):
+        assert index.active_at(tick) == ({"p"} if tracker.is_active(tick) else set())
+
+
+def test_add_and_remove_at_cursor():
+    index = PositionIntervalIndex()
+    index.move(10)
+    index.add("a", 0, 20)
+    index.add("b", 30, 40)
+    assert index.active == {"a"}
+
+    index.remove("a")
+    assert index.active == set()
+    assert len(index) == 1
+    with pytest.raises(KeyError):
+        index.add("b", 0, 1)
+    with pytest.raises(ValueError):
+        index.add("c", 5, 5)
@@ -0,0 +1,218 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from lobster_assessment.application import kernel
+from lobster_assessment.application.algo import ActivityTracker, FeeCalculator
+from lobster_assessment.application.core import BacktestRunner
+from lobster_assessment.application.kernel import (
+    CompiledBacktestRunner,
+    encode_rebalancer,
+    rebalance_check,
+)
+from lobster_assessment.application.math import tick_to_sqrt_price
+from lobster_assessment.application.rebalancing import (
+    LogicMode,
+    MultiConditionRebalancer,
+    OutOfRangeDurationRebalancer,
+    OutOfRangeRebalancer,
+    TimeTriggeredRebalancer,
+)
+from lobster_assessment.domain.models import Swap, SwapSeries
+
+
+@pytest.fixture
+def long_series() -> SwapSeries:
+    rng = np.random.default_rng(3)
+    ticks = 1500 + np.cumsum(rng.integers(-60, 61, size=300))
+    start = datetime(2024, 1, 1)
+    return SwapSeries(
+        swaps=[
+            Swap(
+                tick=int(tick),
+                volume_token0=Decimal(str(rng.uniform(0, 10))),
+                volume_token1=Decimal(str(rng.uniform(0, 100))),
+                liquidity=Decimal(int(rng.integers(1_000, 100_000))),
+                sqrt_price_x96=tick_to_sqrt_price(int(tick)),
+                timestamp=start + timedelta(minutes=37 * i),
+            )
+            for i, tick in enumerate(ticks)
+        ]
+    )
+
+
+REBALANCERS = [
+    None,
+    OutOfRangeRebalancer(),
+    OutOfRangeDurationRebalancer(duration=timedelta(hours=2)),
+    TimeTriggeredRebalancer(interval=timedelta(hours=5)),
+    MultiConditionRebalancer(
+        strategies=[
+            TimeTriggeredRebalancer(interval=timedelta(hours=12)),
+            OutOfRangeDurationRebalancer(duration=timedelta(hours=3)),
+        ],
+        mode=LogicMode.OR,
+    ),
+    MultiConditionRebalancer(
+        strategies=[
+            OutOfRangeRebalancer(),
+            OutOfRangeDurationRebalancer(duration=timedelta(hours=6)),
+        ],
+        mode=LogicMode.AND,
+    ),
+]
+
+
+@pytest.mark.parametrize("rebalancer", REBALANCERS)
+@pytest.mark.parametrize("series", ["swap_series", "long_series"])
+def test_matches_reference_runner(request, position, rebalancer, series):
+    swap_series = request.getfixturevalue(series)
+    pos = position.model_copy()
+    reference = BacktestRunner(
+        position=pos,
+        swaps=swap_series.swaps,
+        tracker=ActivityTracker(position=pos),
+        calculator=FeeCalculator(position=pos),
+        rebalancer=rebalancer,
+        rebalance_bias=0.3,
+    )
+    expected = reference.run()
+
+    compiled = CompiledBacktestRunner(
+        position=position,
+        swaps=swap_series.to_arrays(),
+        rebalance_bias=0.3,
+        rebalancer=rebalancer,
+    )
+    result = compiled.run()
+
+    assert compiled.activity.tolist() == reference.activity_series.activity
+    assert (compiled.tick_lower, compiled.tick_upper) == (
+        reference.final_position.tick_lower,
+        reference.final_position.tick_upper,
+    )
+    np.testing.assert_allclose(
+        compiled.value_series.position_value,
+        reference.value_series.position_value,
+        rtol=1e-9,
+    )
+    for field in (
+        "total_fees_token0",
+        "total_fees_token1",
+        "apr",
+        "impermanent_loss",
+        "max_drawdown",
+    ):
+        assert float(getattr(result, field)) == pytest.approx(
+            float(getattr(expected, field)), rel=1e-9
+        )
+
+
+def test_does_not_mutate_inputs(position, swap_series):
+    rebalancer = OutOfRangeDurationRebalancer(duration=timedelta(0))
+    CompiledBacktestRunner(
+        position=position,
+        swaps=swap_series.to_arrays(),
+        rebalance_bias=0.5,
+        rebalancer=rebalancer,
+    ).run()
+    assert (position.tick_lower, position.tick_upper) == (1000, 2000)
+    assert rebalancer == OutOfRangeDurationRebalancer(duration=timedelta(0))
+
+
+def test_nested_multi_condition_is_rejected():
+    nested = MultiConditionRebalancer(
+        strategies=[
+            MultiConditionRebalancer(strategies=[], mode=LogicMode.OR),
+        ],
+        mode=LogicMode.OR,
+    )
+    with pytest.raises(TypeError):
+        encode_rebalancer(nested)
+
+
+def test_shared_config_gives_repeatable_runs(position, long_series):
+    rebalancer = TimeTriggeredRebalancer(interval=timedelta(hours=3))
+
+    def run():
+        return BacktestRunner(
+            position=position,
+            swaps=long_series.swaps,
+            tracker=ActivityTracker(position=position),
+            calculator=FeeCalculator(position=position),
+            rebalancer=rebalancer,
+            rebalance_bias=0.5,
+        ).run()
+
+    first, second = run(), run()
+    assert first == second
+    assert (position.tick_lower, position.tick_upper) == (1000, 2000)
+
+
+@pytest.mark.parametrize("rebalancer", REBALANCERS[1:])
+def test_rebalance_check_is_elementwise(rebalancer):
+    kinds, params, state, mode = encode_rebalancer(rebalancer)
+    ticks = np.array([900, 1500, 2100, 2500])
+    lower = np.full(4, 1000)
+    upper = np.full(4, 2000)
+    hour = 3_600_000_000
+    batch_state = np.repeat(state[:, None], 4, axis=1)
+
+    fired = rebalance_check(
+        kinds, params, batch_state, mode, ticks, 7 * hour, lower, upper, 0
+    )
+    for i in range(4):
+        single = rebalance_check(
+            kinds, params, state.copy(), mode, ticks[i], 7 * hour, 1000, 2000, 0
+        )
+        assert bool(single) == fired[i]
+    if isinstance(rebalancer, TimeTriggeredRebalancer):
+        assert fired.all()
+    else:
+        assert fired.tolist() == [True, False, True, True]
+
+
+@pytest.mark.skipif(not kernel.JIT_AVAILABLE, reason="needs numba")
+@pytest.mark.parametrize("rebalancer", REBALANCERS)
+def test_compiled_scan_matches_python_scan(position, long_series, rebalancer):
+    swaps = long_series.to_arrays()
+    kinds, params, state, mode = encode_rebalancer(rebalancer)
+    columns = (
+        swaps.ticks,
+        swaps.volume_token0,
+        swaps.volume_token1,
+        swaps.liquidity,
+        swaps.timestamps.astype("datetime64[us]").astype(np.int64),
+    )
+
+    def scan(fn, columns):
+        n = len(swaps)
+        outputs = (
+            np.zeros(n, dtype=np.bool_),
+            np.zeros(n),
+            np.zeros(n, dtype=np.int64),
+            np.zeros(n, dtype=np.int64),
+        )
+        final = fn(
+            *columns,
+            1000,
+            2000,
+            10.0,
+            20000.0,
+            0.3,
+            int(columns[4][0]),
+            kinds,
+            params,
+            state.copy(),
+            mode,
+            *outputs,
+        )
+        return final, outputs
+
+    compiled, compiled_out = scan(kernel._scan, columns)
+    python, python_out = scan(kernel._scan.py_func, tuple(c.tolist() for c in columns))
+    assert compiled == python
+    for a, b in zip(compiled_out, python_out):
+        np.testing.assert_allclose(a, b, rtol=1e-12)
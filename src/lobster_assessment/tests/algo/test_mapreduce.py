@@ -0,0 +1,85 @@
+from decimal import Decimal, localcontext
+
+import pytest
+
+from lobster_assessment.application.algo import ActivityTracker, FeeCalculator
+from lobster_assessment.application.core import BacktestRunner
+from lobster_assessment.application.executors import ExecutorKind
+from lobster_assessment.application.mapreduce import MapReduceFeeRunner
+
+
+@pytest.fixture
+def reference(position, swap_series):
+    runner = BacktestRunner(
+        position=position,
+        swaps=swap_series.swaps,
+        tracker=ActivityTracker(position=position),
+        calculator=FeeCalculator(position=position),
+        rebalance_bias=0.5,
+    )
+    result = runner.run()
+    return runner, result
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3])
+def test_exact_mode_sums_reference_fees_without_rounding(
+    position, swap_series, reference, chunk_size
+):
+    runner, expected = reference
+    active_fees = [
+        fee
+        for fee, active in zip(runner.fee_series.fees, runner.activity_series.activity)
+        if active
+    ]
+    with localcontext() as ctx:
+        ctx.prec = 200
+        exact0 = sum((f.token0 for f in active_fees), Decimal(0))
+    exact0 = +exact0
+
+    mapreduce = MapReduceFeeRunner(
+        position, swap_series.swaps, chunk_size=chunk_size, exact=True
+    )
+    result = mapreduce.run()
+
+    assert result.total_fees_token0 == exact0
+    assert result.total_fees_token1 == pytest.approx(
+        expected.total_fees_token1, rel=1e-25
+    )
+    assert result.apr == pytest.approx(expected.apr, rel=1e-20)
+    assert float(result.impermanent_loss) == pytest.approx(
+        float(expected.impermanent_loss), rel=1e-12
+    )
+    assert result.max_drawdown is None
+    assert sum(p.swaps for p in mapreduce.partials) == len(swap_series.swaps)
+    assert sum(p.active_swaps for p in mapreduce.partials) == len(active_fees)
+
+
+def test_float_mode_does_not_depend_on_chunking(position, swap_series, reference):
+    _, expected = reference
+    results = [
+        MapReduceFeeRunner(position, swap_series.to_arrays(), chunk_size=size).run()
+        for size in (1, 2, 3)
+    ]
+    assert results[0] == results[1] == results[2]
+    assert float(results[0].total_fees_token0) == pytest.approx(
+        float(expected.total_fees_token0), rel=1e-12
+    )
+    assert float(results[0].apr) == pytest.approx(float(expected.apr), rel=1e-9)
+
+
+@pytest.mark.parametrize("exact", [True, False])
+def test_process_pool_matches_serial(position, swap_series, exact):
+    mapreduce = MapReduceFeeRunner(
+        position, swap_series.swaps, chunk_size=1, exact=exact
+    )
+    serial = mapreduce.reduce()
+    parallel = mapreduce.reduce(executor=ExecutorKind.PROCESS, max_workers=2)
+    assert parallel == serial
+    assert parallel.swaps == len(swap_series.swaps)
+
+
+def test_exact_mode_needs_swaps(position, swap_series):
+    with pytest.raises(ValueError):
+        MapReduceFeeRunner(position, swap_series.to_arrays(), exact=True)
+    with pytest.raises(ValueError):
+        MapReduceFeeRunner(position, [])
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from lobster_assessment.application.algo import ActivityTracker, FeeCalculator
+from lobster_assessment.application.core import BacktestRunner
+from lobster_assessment.application.monte_carlo import (
+    BlockBootstrap,
+    MonteCarloRunner,
+    PathBatch,
+    RandomWalk,
+)
+from lobster_assessment.application.rebalancing import (
+    LogicMode,
+    MultiConditionRebalancer,
+    OutOfRangeDurationRebalancer,
+    OutOfRangeRebalancer,
+    TimeTriggeredRebalancer,
+)
+
+
+def run_reference(position, swap_series, rebalancer=None, bias=0.5):
+    pos = position.model_copy()
+    runner = BacktestRunner(
+        position=pos,
+        swaps=swap_series.swaps,
+        tracker=ActivityTracker(position=pos),
+        calculator=FeeCalculator(position=pos),
+        rebalancer=rebalancer,
+        rebalance_bias=bias,
+    )
+    return runner.run()
+
+
+@pytest.mark.parametrize(
+    "rebalancer",
+    [
+        None,
+        OutOfRangeRebalancer(),
+        OutOfRangeDurationRebalancer(duration=timedelta(seconds=30)),
+        MultiConditionRebalancer(
+            strategies=[
+                MultiConditionRebalancer(
+                    strategies=[
+                        OutOfRangeRebalancer(),
+                        TimeTriggeredRebalancer(interval=timedelta(seconds=30)),
+                    ],
+                    mode=LogicMode.AND,
+                ),
+                OutOfRangeDurationRebalancer(duration=timedelta(minutes=1)),
+            ],
+            mode=LogicMode.OR,
+        ),
+    ],
+)
+def test_run_batch_matches_reference_runner(position, swap_series, rebalancer):
+    expected = run_reference(position, swap_series, rebalancer, bias=0.25)
+
+    batch = PathBatch.repeat(swap_series.to_arrays(), n_paths=3)
+    mc = MonteCarloRunner(position=position, rebalance_bias=0.25, rebalancer=rebalancer)
+    result = mc.run_batch(batch)
+
+    np.testing.assert_allclose(
+        result.total_fees_token0, float(expected.total_fees_token0), rtol=1e-9
+    )
+    np.testing.assert_allclose(
+        result.total_fees_token1, float(expected.total_fees_token1), rtol=1e-9
+    )
+    np.testing.assert_allclose(result.apr, float(expected.apr), rtol=1e-9)
+
+
+def test_run_does_not_mutate_position(position, swap_series):
+    mc = MonteCarloRunner(
+        position=position, rebalance_bias=0.5, rebalancer=OutOfRangeRebalancer()
+    )
+    mc.run_batch(PathBatch.repeat(swap_series.to_arrays(), n_paths=2))
+    assert (position.tick_lower, position.tick_upper) == (1000, 2000)
+
+
+def test_block_bootstrap_paths_start_at_first_tick(swap_series):
+    swaps = swap_series.to_arrays()
+    batch = BlockBootstrap(swaps=swaps, block_size=1).generate(
+        5, np.random.default_rng(0)
+    )
+    assert batch.ticks.shape == (5, len(swaps))
+    assert (batch.ticks[:, 0] == swaps.ticks[0]).all()
+    steps = set(np.diff(swaps.ticks).tolist())
+    assert set(np.diff(batch.ticks, axis=1).ravel().tolist()) <= steps
+
+
+def test_run_is_deterministic_and_chunked(position, swap_series):
+    generator = RandomWalk(swaps=swap_series.to_arrays(), tick_volatility=300)
+
+    small = MonteCarloRunner(position=position, rebalance_bias=0.5, chunk_size=4)
+    first = small.run(generator, n_paths=10, seed=7)
+    second = small.run(generator, n_paths=10, seed=7)
+
+    assert first.n_paths == 10
+    np.testing.assert_array_equal(first.apr, second.apr)
+    assert len(first.results()) == 10
+    with pytest.raises(ValueError, match="n_paths"):
+        small.run(generator, n_paths=0)
+
+
+def test_unsupported_rebalancer_is_rejected(position):
+    class CustomRebalancer(OutOfRangeRebalancer):
+        pass
+
+    with pytest.raises(TypeError):
+        MonteCarloRunner(
+            position=position, rebalance_bias=0.5, rebalancer=CustomRebalancer()
+        )
@@ -0,0 +1,43 @@
+import pytest
+
+from lobster_assessment.application.core import MultiPositionBacktestRunner
+from lobster_assessment.application.executors import ExecutorKind, TaskFailure
+from lobster_assessment.application.rebalancing import OutOfRangeRebalancer
+
+
+class FailingRebalancer(OutOfRangeRebalancer):
+    def rebalance(self, tick, tick_lower, tick_upper, bias):
+        raise RuntimeError("boom")
+
+
+def make_runner(position, swap_series, rebalancers):
+    positions = [position.model_copy() for _ in rebalancers]
+    return MultiPositionBacktestRunner(
+        positions=positions,
+        swap_series_list=[swap_series.swaps for _ in positions],
+        trackers=[],
+        calculators=[],
+        rebalancers=rebalancers,
+        rebalance_bias=0.5,
+    )
+
+
+@pytest.mark.parametrize("executor", list(ExecutorKind))
+def test_executors_preserve_order_and_capture_failures(position, swap_series, executor):
+    rebalancers = [OutOfRangeRebalancer(), FailingRebalancer(), None]
+    expected = make_runner(position, swap_series, rebalancers).run()
+
+    seen = []
+    results = make_runner(position, swap_series, rebalancers).run(
+        executor=executor,
+        max_workers=2,
+        chunksize=1,
+        progress=lambda done, total: seen.append((done, total)),
+    )
+
+    assert isinstance(results[1], TaskFailure)
+    assert results[1].index == 1
+    assert results[1].error_type == "RuntimeError"
+    assert results[0] == expected[0]
+    assert results[2] == expected[2]
+    assert seen == [(1, 3), (2, 3), (3, 3)]
@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from lobster_assessment.application.algo import ActivityTracker, FeeCalculator
+from lobster_assessment.application.core import BacktestRunner
+from lobster_assessment.application.pipeline import (
+    PipelinedBacktestRunner,
+    PrefetchCancelled,
+    Prefetcher,
+)
+from lobster_assessment.application.rebalancing import OutOfRangeRebalancer
+from lobster_assessment.domain.validation import current_mode, validation_mode
+from lobster_assessment.sources import InMemorySwapSource, SwapQuery
+
+
+def test_pipelined_runner_matches_backtest_runner(position, swap_series):
+    reference_position = position.model_copy()
+    expected = BacktestRunner(
+        position=reference_position,
+        swaps=swap_series.swaps,
+        tracker=ActivityTracker(position=reference_position),
+        calculator=FeeCalculator(position=reference_position),
+        rebalancer=OutOfRangeRebalancer(),
+        rebalance_bias=0.5,
+    ).run()
+
+    frame = pd.DataFrame(
+        [
+            {"pool_address": position.pool.address, "block_number": i, "event_index": 0}
+            | s.model_dump()
+            for i, s in enumerate(swap_series.swaps)
+        ]
+    )
+    runner = PipelinedBacktestRunner(
+        source=InMemorySwapSource(frame),
+        query=SwapQuery(pool_address=position.pool.address, batch_size=1),
+        position=position,
+        tracker=ActivityTracker(position=position),
+        calculator=FeeCalculator(position=position),
+        rebalancer=OutOfRangeRebalancer(),
+        rebalance_bias=0.5,
+    )
+
+    assert runner.run() == expected
+    assert runner.run() == expected
+    assert runner.stats.chunks == 3
+    assert runner.stats.swaps == 3
+
+
+def test_prefetcher_propagates_producer_errors():
+    def chunks():
+        yield 1
+        raise RuntimeError("fetch failed")
+
+    with Prefetcher(chunks()) as prefetcher:
+        assert next(prefetcher) == 1
+        with pytest.raises(RuntimeError, match="fetch failed"):
+            next(prefetcher)
+
+
+def test_prefetcher_decodes_under_the_callers_validation_mode():
+    with validation_mode("trusted"):
+        with Prefetcher(range(2), decode=lambda _: current_mode()) as prefetcher:
+            modes = list(prefetcher)
+
+    assert [mode.value for mode in modes] == ["trusted", "trusted"]
+
+
+def test_prefetcher_stays_bounded_and_cancels():
+    produced = []
+    closed = threading.Event()
+
+    def chunks():
+        try:
+            for i in range(1000):
+                produced.append(i)
+                yield i
+        finally:
+            closed.set()
+
+    prefetcher = Prefetcher(chunks(), max_prefetch=2)
+    assert next(prefetcher) == 0
+    time.sleep(0.1)
+    # One item consumed, two queued, one waiting to be queued.
+    assert len(produced) <= 4
+
+    prefetcher.close()
+    assert closed.is_set()
+    with pytest.raises(PrefetchCancelled):
+        next(prefetcher)
+
+
+def test_prefetcher_overlaps_io_and_compute():
+    started = [threading.Event() for _ in range(5)]
+
+    def chunks():
+        for i in range(5):
+            started[i].set()
+            yield i
+
+    with Prefetcher(chunks()) as prefetcher:
+        for i in prefetcher:
+            # The next chunk is produced while this one is being consumed.
+            if i + 1 < len(started):
+                assert started[i + 1].wait(5)
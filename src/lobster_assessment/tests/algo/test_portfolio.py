@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from lobster_assessment.application.algo import ActivityTracker, FeeCalculator
+from lobster_assessment.application.core import BacktestRunner
+from lobster_assessment.application.math import tick_to_sqrt_price
+from lobster_assessment.application.portfolio import (
+    PortfolioBacktestRunner,
+    PortfolioLeg,
+)
+from lobster_assessment.application.rebalancing import OutOfRangeRebalancer
+from lobster_assessment.domain.models import Swap
+
+start = datetime(2024, 1, 1)
+
+
+def make_swaps(ticks, offset=timedelta(0), volume="100"):
+    return [
+        Swap(
+            tick=tick,
+            volume_token0=Decimal(volume),
+            volume_token1=Decimal(volume),
+            liquidity=Decimal("10000"),
+            sqrt_price_x96=tick_to_sqrt_price(tick),
+            timestamp=start + offset + timedelta(minutes=i),
+        )
+        for i, tick in enumerate(ticks)
+    ]
+
+
+def test_single_leg_matches_backtest_runner(position, swap_series):
+    rebalancer = OutOfRangeRebalancer()
+    runner = BacktestRunner(
+        position=position,
+        swaps=swap_series.swaps,
+        tracker=ActivityTracker(position=position),
+        calculator=FeeCalculator(position=position),
+        rebalancer=rebalancer,
+        rebalance_bias=0.3,
+    )
+    expected = runner.run()
+
+    result = PortfolioBacktestRunner(
+        legs=[
+            PortfolioLeg(position=position, rebalancer=rebalancer, rebalance_bias=0.3)
+        ],
+        streams=[iter(swap_series.swaps)],
+    ).run()
+
+    [leg] = result.legs
+    assert leg.total_fees_token0 == expected.total_fees_token0
+    assert leg.total_fees_token1 == expected.total_fees_token1
+    assert leg.swaps == len(swap_series.swaps)
+    assert result.final_value == pytest.approx(
+        runner.value_series.position_value[-1], rel=1e-9
+    )
+    assert (position.tick_lower, position.tick_upper) == (1000, 2000)
+
+
+def test_streams_are_merged_in_timestamp_order(position):
+    a = make_swaps([1100, 1200, 1300, 1400])
+    b = make_swaps([1500, 1600, 1700], offset=timedelta(seconds=30))
+    runner = PortfolioBacktestRunner(
+        legs=[
+            PortfolioLeg(position=position),
+            PortfolioLeg(position=position, token1_price=2.0),
+        ],
+        streams=[(s for s in a), (s for s in b)],
+    )
+    result = runner.run()
+
+    assert [leg.swaps for leg in result.legs] == [4, 3]
+    assert result.timestamps.tolist() == sorted(s.timestamp for s in a + b)
+    assert result.values[-1] == pytest.approx(sum(runner.state.leg_values))
+    assert runner.state.leg_values[1] == pytest.approx(result.legs[1].final_value)
+    assert result.max_drawdown <= 0.0
+
+
+def test_sampling_keeps_the_final_value(position):
+    swaps = make_swaps(range(1100, 1600, 10))
+    result = PortfolioBacktestRunner(
+        legs=[PortfolioLeg(position=position)],
+        streams=[swaps],
+        sample_interval=timedelta(minutes=7),
+    ).run()
+
+    assert len(result.values) == 8
+    assert result.timestamps[-1] == swaps[-1].timestamp
+    assert result.values[-1] == result.final_value
+
+
+def test_reallocation_moves_capital_to_target_weights(position):
+    # No volume and a repeated last tick: leg values do not move after the
+    # reallocation that precedes the last swap.
+    streams = [make_swaps([1200, 1500, 1500], volume="0") for _ in range(2)]
+    small = position.model_copy(
+        update={"amount0": Decimal("1"), "amount1": Decimal("2000")}
+    )
+    legs = [
+        PortfolioLeg(position=position, target_weight=1.0),
+        PortfolioLeg(position=small, target_weight=1.0),
+    ]
+
+    held = PortfolioBacktestRunner(legs=legs, streams=streams).run()
+    rebalanced = PortfolioBacktestRunner(
+        legs=legs, streams=streams, reallocate_every=timedelta(minutes=2)
+    ).run()
+
+    assert rebalanced.reallocations == 1
+    assert rebalanced.final_value == pytest.approx(held.final_value, rel=1e-9)
+    first, second = (leg.final_value for leg in rebalanced.legs)
+    assert first == pytest.approx(second, rel=1e-9)
+    assert position.amount0 == Decimal("10")
+
+
+def test_reallocation_conserves_value_around_empty_legs(position):
+    streams = [make_swaps([1200, 1500, 1500], volume="0") for _ in range(2)]
+    empty = position.model_copy(update={"amount0": Decimal(0), "amount1": Decimal(0)})
+    legs = [
+        PortfolioLeg(position=position, target_weight=1.0),
+        PortfolioLeg(position=empty, target_weight=1.0),
+    ]
+    runner = PortfolioBacktestRunner(
+        legs=legs, streams=streams, reallocate_every=timedelta(minutes=2)
+    )
+    result = runner.run()
+
+    held = PortfolioBacktestRunner(legs=legs, streams=streams).run()
+    assert result.reallocations == 1
+    assert result.final_value == pytest.approx(held.final_value, rel=1e-9)
+    assert result.legs[1].final_value == 0.0
+
+
+def test_invalid_streams_are_rejected(position):
+    with pytest.raises(ValueError):
+        PortfolioBacktestRunner(
+            legs=[PortfolioLeg(position=position)], streams=[[]]
+        ).run()
+    with pytest.raises(ValueError):
+        PortfolioBacktestRunner(
+            legs=[PortfolioLeg(position=position)],
+            streams=[make_swaps([1100, 1200])[::-1]],
+        ).run()
+    with pytest.raises(ValueError):
+        PortfolioBacktestRunner(
+            legs=[PortfolioLeg(position=position)],
+            streams=[[]],
+            reallocate_every=timedelta(hours=1),
+        )
@@ -10,6 +10,7 @@ from lobster_assessment.application.rebalancing import (
     RebalancingStrategy,
     TimeTriggeredRebalancer,
     compute_tick_range,
+    next_tick_range,
 )
 
 now = datetime.now()
@@ -43,17 +44,20 @@ def test_base_strategy_interface():
 
 def test_time_triggered_rebalance(position):
     strat = TimeTriggeredRebalancer(interval=timedelta(minutes=1))
+    state = strat.initial_state()
     tick, lower, upper = 1500, position.tick_lower, position.tick_upper
 
     timestamp1 = now
     timestamp2 = timestamp1 + timedelta(minutes=2)
 
-    assert not strat.should_rebalance(tick, timestamp1, lower, upper, now)
-    strat.rebalance(tick, lower, upper, 0.5)
+    assert not strat.should_rebalance(tick, timestamp1, lower, upper, now, state=state)
+    strat.rebalance(
+        tick, lower, upper, 0.5, state=state, timestamp=now + timedelta(seconds=1)
+    )
     assert not strat.should_rebalance(
-        tick, timestamp1 + timedelta(minutes=1), lower, upper, now
+        tick, timestamp1 + timedelta(minutes=1), lower, upper, now, state=state
     )
-    assert strat.should_rebalance(tick, timestamp2, lower, upper, now)
+    assert strat.should_rebalance(tick, timestamp2, lower, upper, now, state=state)
 
 
 def test_out_of_range_rebalancer(position):
@@ -70,15 +74,16 @@ def test_out_of_range_rebalancer(position):
 
 def test_out_of_range_duration_rebalancer(position):
     strat = OutOfRangeDurationRebalancer(duration=timedelta(seconds=30))
+    state = strat.initial_state()
     lower, upper = position.tick_lower, position.tick_upper
 
     timestamp_0 = now + timedelta(seconds=0)
     timestamp_1 = now + timedelta(seconds=20)
     timestamp_2 = now + timedelta(seconds=40)
 
-    assert not strat.should_rebalance(950, timestamp_0, lower, upper, now)
-    assert not strat.should_rebalance(1500, timestamp_1, lower, upper, now)
-    assert strat.should_rebalance(2100, timestamp_2, lower, upper, now)
+    assert not strat.should_rebalance(950, timestamp_0, lower, upper, now, state=state)
+    assert not strat.should_rebalance(1500, timestamp_1, lower, upper, now, state=state)
+    assert strat.should_rebalance(2100, timestamp_2, lower, upper, now, state=state)
 
 
 def test_multi_condition_or_mode(position):
@@ -90,7 +95,12 @@ def test_multi_condition_or_mode(position):
         mode=LogicMode.OR,
     )
     assert strat.should_rebalance(
-        950, now, position.tick_lower, position.tick_upper, now
+        950,
+        now,
+        position.tick_lower,
+        position.tick_upper,
+        now,
+        state=strat.initial_state(),
     )
 
 
@@ -100,9 +110,22 @@ def test_multi_condition_and_mode(position):
         strategies=[OutOfRangeRebalancer(), ttr],
         mode=LogicMode.AND,
     )
-    ttr.rebalance(950, position.tick_lower, position.tick_upper, 0.5)
+    state = strat.initial_state()
+    ttr.rebalance(
+        950,
+        position.tick_lower,
+        position.tick_upper,
+        0.5,
+        state=state.children[1],
+        timestamp=now,
+    )
     assert not strat.should_rebalance(
-        1500, now + timedelta(seconds=1), position.tick_lower, position.tick_upper, now
+        1500,
+        now + timedelta(seconds=1),
+        position.tick_lower,
+        position.tick_upper,
+        now,
+        state=state,
     )
 
 
@@ -113,11 +136,12 @@ def test_time_triggered_negative_interval():
 
 def test_time_triggered_exact_same_timestamp(position):
     strat = TimeTriggeredRebalancer(interval=timedelta(seconds=60))
+    state = strat.initial_state()
     tick, lower, upper = 1500, position.tick_lower, position.tick_upper
     timestamp = now
 
-    strat.rebalance(tick, lower, upper, 0.5)
-    assert not strat.should_rebalance(tick, timestamp, lower, upper, now)
+    strat.rebalance(tick, lower, upper, 0.5, state=state, timestamp=timestamp)
+    assert not strat.should_rebalance(tick, timestamp, lower, upper, now, state=state)
 
 
 def test_out_of_range_edge_ticks(position):
@@ -135,20 +159,24 @@ def test_out_of_range_large_range():
 
 def test_out_of_range_duration_zero_duration(position):
     strat = OutOfRangeDurationRebalancer(duration=timedelta(seconds=0))
+    state = strat.initial_state()
     lower, upper = position.tick_lower, position.tick_upper
 
-    assert strat.should_rebalance(950, now, lower, upper, now)
+    assert strat.should_rebalance(950, now, lower, upper, now, state=state)
 
 
 def test_out_of_range_never_recovers(position):
     strat = OutOfRangeDurationRebalancer(duration=timedelta(seconds=30))
+    state = strat.initial_state()
     lower, upper = position.tick_lower, position.tick_upper
     ts = now
-    assert not strat.should_rebalance(950, ts, lower, upper, now)
+    assert not strat.should_rebalance(950, ts, lower, upper, now, state=state)
     assert not strat.should_rebalance(
-        950, ts + timedelta(seconds=15), lower, upper, now
+        950, ts + timedelta(seconds=15), lower, upper, now, state=state
+    )
+    assert strat.should_rebalance(
+        950, ts + timedelta(seconds=31), lower, upper, now, state=state
     )
-    assert strat.should_rebalance(950, ts + timedelta(seconds=31), lower, upper, now)
 
 
 def test_multi_condition_empty_strategy_list(position):
@@ -156,3 +184,93 @@ def test_multi_condition_empty_strategy_list(position):
     assert not strat.should_rebalance(
         1500, now, position.tick_lower, position.tick_upper, now
     )
+
+
+def test_strategies_are_frozen():
+    strat = OutOfRangeDurationRebalancer(duration=timedelta(seconds=30))
+    with pytest.raises(ValueError):
+        strat.duration = timedelta(seconds=10)
+
+
+def test_time_triggered_state_follows_swap_time(position):
+    strat = TimeTriggeredRebalancer(interval=timedelta(minutes=1))
+    lower, upper = position.tick_lower, position.tick_upper
+    start = datetime(2024, 1, 1)
+    state = strat.initial_state()
+
+    strat.rebalance(1500, lower, upper, 0.5, state=state, timestamp=start)
+    assert state.last_rebalanced_at == start
+    assert not strat.should_rebalance(
+        1500, start + timedelta(seconds=59), lower, upper, start, state=state
+    )
+    assert strat.should_rebalance(
+        1500, start + timedelta(minutes=1), lower, upper, start, state=state
+    )
+    assert strat.initial_state().last_rebalanced_at is None
+
+
+def test_states_are_independent(position):
+    strat = MultiConditionRebalancer(
+        strategies=[
+            OutOfRangeRebalancer(),
+            OutOfRangeDurationRebalancer(duration=timedelta(seconds=30)),
+        ],
+        mode=LogicMode.AND,
+    )
+    lower, upper = position.tick_lower, position.tick_upper
+    first, second = strat.initial_state(), strat.initial_state()
+
+    first.children[1].out_of_range_since = now
+    assert not strat.should_rebalance(
+        950, now + timedelta(seconds=10), lower, upper, now, state=first
+    )
+    assert strat.should_rebalance(
+        950, now + timedelta(seconds=40), lower, upper, now, state=second
+    )
+    assert second.children[1].out_of_range_since is None
+
+
+def test_stateful_strategies_require_a_state(position):
+    strat = TimeTriggeredRebalancer(interval=timedelta(minutes=1))
+    lower, upper = position.tick_lower, position.tick_upper
+    with pytest.raises(ValueError, match="initial_state"):
+        strat.should_rebalance(1500, now, lower, upper, now)
+    with pytest.raises(ValueError, match="initial_state"):
+        strat.rebalance(1500, lower, upper, 0.5)
+    with pytest.raises(ValueError, match="timestamp"):
+        strat.rebalance(1500, lower, upper, 0.5, state=strat.initial_state())
+
+
+def test_run_state_seeds_are_not_config():
+    with pytest.raises(ValueError, match="last_rebalanced_at"):
+        TimeTriggeredRebalancer(interval=timedelta(minutes=1), last_rebalanced_at=now)
+    with pytest.raises(ValueError, match="out_of_range_since"):
+        OutOfRangeDurationRebalancer(
+            duration=timedelta(minutes=1), out_of_range_since=now
+        )
+
+
+def test_stateless_signatures_still_work(position):
+    class LegacyRebalancer(RebalancingStrategy):
+        def should_rebalance(self, tick, timestamp, tick_lower, tick_upper, created_at):
+            return not (tick_lower <= tick <= tick_upper)
+
+        def rebalance(self, tick, tick_lower, tick_upper, bias):
+            return compute_tick_range(tick, tick_upper - tick_lower, bias)
+
+    lower, upper = position.tick_lower, position.tick_upper
+    legacy = LegacyRebalancer()
+    assert next_tick_range(legacy, None, 1500, now, lower, upper, now, 0.5) == (
+        lower,
+        upper,
+    )
+    assert next_tick_range(legacy, None, 2100, now, lower, upper, now, 0.5) == (
+        1600,
+        2600,
+    )
+    multi = MultiConditionRebalancer(strategies=[legacy], mode=LogicMode.OR)
+    state = multi.initial_state()
+    assert next_tick_range(multi, state, 2100, now, lower, upper, now, 0.5) == (
+        1600,
+        2600,
+    )
@@ -0,0 +1,136 @@
+import os
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from lobster_assessment.application.algo import (
+    ActivityTimeseries,
+    ActivityTracker,
+    FeeCalculator,
+)
+from lobster_assessment.application.core import BacktestResult, BacktestRunner
+from lobster_assessment.application.rebalancing import OutOfRangeRebalancer
+from lobster_assessment.application.result_store import ResultStore
+
+
+def make_result(apr: float, drawdown: float | None = 0.1) -> BacktestResult:
+    return BacktestResult(
+        total_fees_token0=Decimal("1.5"),
+        total_fees_token1=Decimal("2"),
+        apr=Decimal(repr(apr)),
+        impermanent_loss=Decimal("-0.01"),
+        max_drawdown=None if drawdown is None else Decimal(repr(drawdown)),
+    )
+
+
+def test_run_round_trip(tmp_path, position, swap_series):
+    runner = BacktestRunner(
+        position=position,
+        swaps=swap_series.swaps,
+        tracker=ActivityTracker(position=position),
+        calculator=FeeCalculator(position=position),
+        rebalancer=OutOfRangeRebalancer(),
+        rebalance_bias=0.5,
+    )
+    result = runner.run()
+    with ResultStore(tmp_path) as store:
+        store.append_run(runner, result)
+
+    store = ResultStore(tmp_path)
+    row = store.row(runner.cache_key())
+    assert row == 0
+    assert store.result(row) == BacktestResult(
+        **{
+            name: Decimal(repr(float(value)))
+            for name, value in result.model_dump().items()
+        }
+    )
+
+    activity_series, fee_series = store.series(row).to_timeseries()
+    assert activity_series == runner.activity_series
+    assert fee_series.timestamps == runner.fee_series.timestamps
+    assert [float(f.token0) for f in fee_series.fees] == [
+        float(f.token0) for f in runner.fee_series.fees
+    ]
+
+
+def test_partitions_and_queries(tmp_path):
+    aprs = np.random.default_rng(0).normal(size=25)
+    store = ResultStore(tmp_path, partition_size=10)
+    for i, apr in enumerate(aprs):
+        store.append(f"{i:064x}", make_result(float(apr), None if i == 3 else 0.1))
+    store.flush()
+
+    assert store.partitions == 3
+    assert len(store) == 25
+    assert isinstance(store.column("apr"), np.ndarray)
+    assert store.top_k("apr", 5).tolist() == np.argsort(-aprs)[:5].tolist()
+    assert (
+        store.top_k("apr", 2, largest=False).tolist() == np.argsort(aprs)[:2].tolist()
+    )
+    assert store.top_k("max_drawdown", 25)[-1] == 3
+    assert store.result(3).max_drawdown is None
+
+    rows = store.filter(apr=(0.0, None), max_drawdown=(None, 0.5))
+    assert rows.tolist() == [i for i, a in enumerate(aprs) if a >= 0 and i != 3]
+    best = store.top_k("apr", 3, largest=False, rows=rows)
+    assert best.tolist() == sorted(rows.tolist(), key=lambda i: aprs[i])[:3]
+
+    assert store.key(17) == f"{17:064x}"
+    assert store.series(17) is None
+
+
+def test_latest_row_wins_and_unflushed_rows_are_hidden(tmp_path):
+    store = ResultStore(tmp_path)
+    store.append("a" * 64, make_result(0.1))
+    store.flush()
+    store.append("a" * 64, make_result(0.2))
+    assert len(store) == 1
+    store.flush()
+    assert store.result(store.row("a" * 64)).apr == Decimal("0.2")
+    assert "b" * 64 not in store
+    assert store.filter(apr=(None, None)).tolist() == [1]
+    assert store.top_k("apr", 2, largest=False).tolist() == [1]
+
+
+def test_keys_are_stored_whole(tmp_path):
+    keys = ["k" * 100, "pool-é", "short"]
+    with ResultStore(tmp_path) as store:
+        for i, key in enumerate(keys):
+            store.append(key, make_result(0.1 * i))
+    store = ResultStore(tmp_path)
+    assert [store.key(i) for i in range(3)] == keys
+    assert store.row("k" * 100) == 0
+    assert "k" * 64 not in store
+
+
+def test_concurrent_writers_claim_distinct_partitions(tmp_path):
+    first, second = ResultStore(tmp_path), ResultStore(tmp_path)
+    first.append("a", make_result(0.1))
+    second.append("b", make_result(0.2))
+    first.flush()
+    second.flush()
+    assert second.partitions == 2
+    assert [second.key(i) for i in range(2)] == ["a", "b"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["part-000000", "part-000001"]
+
+
+def test_stale_staging_is_removed(tmp_path):
+    stale, fresh = tmp_path / ".staging-old", tmp_path / ".staging-new"
+    stale.mkdir()
+    fresh.mkdir()
+    os.utime(stale, (0, 0))
+    ResultStore(tmp_path)
+    assert not stale.exists()
+    assert fresh.exists()
+
+
+def test_series_must_come_together(tmp_path, swap_series):
+    activity_series = ActivityTimeseries(
+        timestamps=[s.timestamp for s in swap_series.swaps],
+        activity=[True] * len(swap_series.swaps),
+    )
+    store = ResultStore(tmp_path)
+    with pytest.raises(ValueError):
+        store.append("a" * 64, make_result(0.1), activity_series=activity_series)
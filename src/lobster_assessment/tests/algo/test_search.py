@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from lobster_assessment.application.math import tick_to_sqrt_price
+from lobster_assessment.application.rebalancing import OutOfRangeRebalancer
+from lobster_assessment.application.search import (
+    SearchCandidate,
+    SearchMetric,
+    SuccessiveHalvingSearch,
+    grid_candidates,
+    sample_candidates,
+)
+from lobster_assessment.domain.models import Swap
+
+
+@pytest.fixture
+def oscillating_swaps() -> list[Swap]:
+    start = datetime(2024, 1, 1)
+    offsets = [0, 30, -25, 10, -30, 20]
+    return [
+        Swap(
+            tick=1500 + offsets[i % len(offsets)],
+            volume_token0=Decimal("10"),
+            volume_token1=Decimal("20"),
+            liquidity=Decimal("100000"),
+            sqrt_price_x96=tick_to_sqrt_price(1500 + offsets[i % len(offsets)]),
+            timestamp=start + timedelta(hours=i),
+        )
+        for i in range(240)
+    ]
+
+
+@pytest.fixture
+def candidates() -> list[SearchCandidate]:
+    return grid_candidates(
+        widths=[20, 100, 400, 2000],
+        biases=[0.0, 0.5, 1.0],
+        rebalancers=[None, OutOfRangeRebalancer()],
+    )
+
+
+def make_search(pool, swaps, candidates, **kwargs) -> SuccessiveHalvingSearch:
+    return SuccessiveHalvingSearch(
+        pool=pool,
+        amount0=Decimal("10"),
+        amount1=Decimal("20000"),
+        swaps=swaps,
+        candidates=candidates,
+        min_swaps=15,
+        **kwargs,
+    )
+
+
+def test_schedule_grows_to_full_series(pool, oscillating_swaps, candidates):
+    search = make_search(pool, oscillating_swaps, candidates)
+    assert search.schedule() == [15, 30, 60, 120, 240]
+
+
+@pytest.mark.parametrize("metric", [SearchMetric.APR, SearchMetric.FEES])
+def test_finds_full_grid_winner_at_lower_cost(
+    pool, oscillating_swaps, candidates, metric
+):
+    search = make_search(pool, oscillating_swaps, candidates, metric=metric)
+    outcome = search.run()
+
+    full_grid = sorted(
+        (search.evaluate(i, len(oscillating_swaps)) for i in range(len(candidates))),
+        key=lambda e: (-e.score, e.candidate_id),
+    )
+    assert outcome.ranking[0].candidate_id == full_grid[0].candidate_id
+    assert outcome.swaps_evaluated < outcome.full_grid_swaps / 2
+
+
+def test_audit_log_is_complete_and_deterministic(pool, oscillating_swaps, candidates):
+    first = make_search(pool, oscillating_swaps, candidates).run()
+    second = make_search(pool, oscillating_swaps, candidates).run()
+
+    assert first.audit_log == second.audit_log
+    first_rung = [e for e in first.audit_log if e.rung == 0]
+    assert len(first_rung) == len(candidates)
+    assert sum(e.kept for e in first_rung) == len(candidates) // 2
+
+
+def test_sample_candidates_is_seeded():
+    args = ([10, 20, 30], [0.25, 0.5], [None])
+    assert sample_candidates(*args, n=4, seed=1) == sample_candidates(
+        *args, n=4, seed=1
+    )
+    assert len(sample_candidates(*args, n=100, seed=1)) == 6
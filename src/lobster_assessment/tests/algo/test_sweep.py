@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from lobster_assessment.application.algo import ActivityTracker, FeeCalculator
+from lobster_assessment.application.core import BacktestRunner
+from lobster_assessment.application.math import tick_to_sqrt_price
+from lobster_assessment.application.rebalancing import (
+    LogicMode,
+    MultiConditionRebalancer,
+    OutOfRangeDurationRebalancer,
+    OutOfRangeRebalancer,
+)
+from lobster_assessment.application.sweep import ForkingSweepRunner, SweepConfig
+from lobster_assessment.domain.models import Swap
+
+
+@pytest.fixture
+def drifting_swaps() -> list[Swap]:
+    start = datetime(2024, 1, 1)
+    ticks = [1500 + (i * 7) % 90 - 45 + i * 4 for i in range(300)]
+    return [
+        Swap(
+            tick=tick,
+            volume_token0=Decimal("10"),
+            volume_token1=Decimal("20"),
+            liquidity=Decimal("100000"),
+            sqrt_price_x96=tick_to_sqrt_price(tick),
+            timestamp=start + timedelta(minutes=10 * i),
+        )
+        for i, tick in enumerate(ticks)
+    ]
+
+
+def reference(position, swaps, config):
+    position = position.model_copy()
+    return BacktestRunner(
+        position=position,
+        swaps=swaps,
+        tracker=ActivityTracker(position=position),
+        calculator=FeeCalculator(position=position),
+        rebalancer=config.rebalancer.model_copy(deep=True)
+        if config.rebalancer
+        else None,
+        rebalance_bias=config.rebalance_bias,
+    ).run()
+
+
+def test_forking_sweep_matches_independent_runs(position, drifting_swaps):
+    position = position.model_copy(update={"tick_lower": 1400, "tick_upper": 1600})
+    configs = [
+        SweepConfig(rebalance_bias=bias, rebalancer=rebalancer)
+        for bias in (0.0, 0.25, 0.5, 0.75, 1.0)
+        for rebalancer in (
+            None,
+            OutOfRangeRebalancer(),
+            OutOfRangeDurationRebalancer(duration=timedelta(hours=30)),
+            MultiConditionRebalancer(
+                strategies=[
+                    OutOfRangeRebalancer(),
+                    OutOfRangeDurationRebalancer(duration=timedelta(hours=20)),
+                ],
+                mode=LogicMode.AND,
+            ),
+        )
+    ]
+
+    runner = ForkingSweepRunner(position, drifting_swaps, configs)
+    results = runner.run()
+
+    assert results == [reference(position, drifting_swaps, c) for c in configs]
+    assert runner.stats.forks > 0
+    assert runner.stats.swaps_simulated < runner.stats.naive_swaps
+    assert position.tick_lower == 1400
+    assert configs[1].rebalancer == OutOfRangeRebalancer()
+
+
+def test_identical_configs_never_fork(position, drifting_swaps):
+    configs = [SweepConfig(rebalance_bias=0.5, rebalancer=OutOfRangeRebalancer())] * 4
+
+    runner = ForkingSweepRunner(position, drifting_swaps, configs)
+    results = runner.run()
+
+    assert runner.stats.forks == 0
+    assert runner.stats.swaps_simulated == len(drifting_swaps)
+    assert len(set(r.model_dump_json() for r in results)) == 1
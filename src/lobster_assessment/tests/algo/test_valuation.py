@@ -0,0 +1,114 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from lobster_assessment.application.algo import ActivityTracker, FeeCalculator
+from lobster_assessment.application.core import BacktestRunner
+from lobster_assessment.application.math import (
+    compute_liquidity_from_amounts,
+    compute_token0_amount,
+    compute_token1_amount,
+    tick_to_sqrt_price,
+)
+from lobster_assessment.application.valuation import compute_value_timeseries
+
+
+def test_token_amounts_match_scalar_math():
+    ticks = np.array([900, 1500, 2100])
+    lower = np.full(3, 1000)
+    upper = np.full(3, 2000)
+    series = compute_value_timeseries(
+        ticks=ticks,
+        tick_lower=lower,
+        tick_upper=upper,
+        amount0=10.0,
+        amount1=20000.0,
+        earned_fees_token0=np.zeros(3),
+        earned_fees_token1=np.zeros(3),
+        timestamps=np.arange(3).astype("datetime64[s]"),
+    )
+
+    liquidity = compute_liquidity_from_amounts(
+        1000, 2000, Decimal("10"), Decimal("20000")
+    )
+    sqrt_a, sqrt_b = tick_to_sqrt_price(1000), tick_to_sqrt_price(2000)
+    sqrt_p = tick_to_sqrt_price(1500)
+
+    assert series.amount1[0] == 0
+    assert series.amount0[2] == 0
+    assert series.amount0[1] == pytest.approx(
+        float(compute_token0_amount(liquidity, sqrt_p, sqrt_b)), rel=1e-9
+    )
+    assert series.amount1[1] == pytest.approx(
+        float(compute_token1_amount(liquidity, sqrt_a, sqrt_p)), rel=1e-9
+    )
+
+
+def test_fees_accumulate_into_value_and_drawdown_is_non_positive():
+    ticks = np.array([1500, 1500, 1400, 1600])
+    series = compute_value_timeseries(
+        ticks=ticks,
+        tick_lower=np.full(4, 1000),
+        tick_upper=np.full(4, 2000),
+        amount0=10.0,
+        amount1=20000.0,
+        earned_fees_token0=np.zeros(4),
+        earned_fees_token1=np.array([0.0, 5.0, 0.0, 0.0]),
+        timestamps=np.arange(4).astype("datetime64[s]"),
+    )
+
+    assert series.position_value[1] - series.position_value[0] == pytest.approx(5.0)
+    assert (series.drawdown <= 0).all()
+    assert series.max_drawdown == series.drawdown.min() < 0
+    assert (series.impermanent_loss <= 0).all()
+
+
+def test_runner_reports_value_metrics(position, swap_series):
+    runner = BacktestRunner(
+        position=position,
+        swaps=swap_series.swaps,
+        tracker=ActivityTracker(position=position),
+        calculator=FeeCalculator(position=position),
+        rebalance_bias=0.5,
+    )
+    result = runner.run()
+
+    assert len(runner.value_series.position_value) == len(swap_series.swaps)
+    assert result.max_drawdown == Decimal(repr(runner.value_series.max_drawdown))
+    assert result.impermanent_loss == Decimal(
+        repr(runner.value_series.final_impermanent_loss)
+    )
+
+
+def test_impermanent_loss_is_measured_from_the_initial_holdings():
+    ticks = np.array([1500, 1500, 1800, 1200, 1300, 1300])
+    lower = np.array([1000, 1000, 1000, 1000, 800, 800])
+    upper = np.array([2000, 2000, 2000, 2000, 1800, 1800])
+    series = compute_value_timeseries(
+        ticks=ticks,
+        tick_lower=lower,
+        tick_upper=upper,
+        amount0=10.0,
+        amount1=20000.0,
+        earned_fees_token0=np.zeros(6),
+        earned_fees_token1=np.zeros(6),
+        timestamps=np.arange(6).astype("datetime64[s]"),
+    )
+
+    lp_value = series.amount0 * 1.0001**ticks + series.amount1
+    assert series.hold_value[0] == pytest.approx(lp_value[0], rel=1e-12)
+    assert series.impermanent_loss[:2].tolist() == [0.0, 0.0]
+    assert series.impermanent_loss[2] < 0
+    assert series.impermanent_loss[3] < 0
+    hold_value = series.amount0[0] * 1.0001**ticks + series.amount1[0]
+    np.testing.assert_allclose(series.hold_value, hold_value, rtol=1e-12)
+    np.testing.assert_allclose(
+        series.impermanent_loss, lp_value / hold_value - 1, rtol=1e-9, atol=1e-15
+    )
+    # The rebalance at swap 4 enters a new range: only the range loss resets.
+    assert series.range_impermanent_loss[:4].tolist() == pytest.approx(
+        series.impermanent_loss[:4].tolist(), rel=1e-12
+    )
+    assert series.range_impermanent_loss[4:].tolist() == [0.0, 0.0]
+    assert series.impermanent_loss[4] != 0.0
@@ -0,0 +1,83 @@
+import gc
+import os
+import tracemalloc
+from typing import Callable
+
+import pytest
+from pydantic import BaseModel
+
+SIZES = [int(n) for n in os.getenv("MEMORY_SUITE_SIZES", "1000,4000").split(",")]
+
+
+class MemoryUsage(BaseModel):
+    swaps: int
+    peak_bytes: int
+    retained_bytes: int
+
+    @property
+    def peak_per_swap(self) -> float:
+        return self.peak_bytes / self.swaps
+
+    @property
+    def retained_per_swap(self) -> float:
+        return self.retained_bytes / self.swaps
+
+
+def measure_memory(fn: Callable[[], object], swaps: int) -> tuple[object, MemoryUsage]:
+    """
+    Run `fn` under tracemalloc and return its result with the bytes allocated
+    at peak and still held once it returns (the result is kept alive).
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = fn()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    usage = MemoryUsage(
+        swaps=swaps,
+        peak_bytes=peak - baseline,
+        retained_bytes=current - baseline,
+    )
+    return result, usage
+
+
+def budget(name: str, default: float) -> float:
+    """
+    Bytes-per-swap budget for `name`, overridable with
+    MEMORY_BUDGET_<NAME>; MEMORY_BUDGET_SCALE multiplies every budget.
+    """
+    value = float(os.getenv(f"MEMORY_BUDGET_{name.upper()}", default))
+    return value * float(os.getenv("MEMORY_BUDGET_SCALE", "1"))
+
+
+def assert_within_budget(name: str, usage: MemoryUsage, peak: float, retained: float):
+    peak_budget = budget(f"{name}_peak", peak)
+    retained_budget = budget(f"{name}_retained", retained)
+    assert usage.peak_per_swap <= peak_budget, (
+        f"{name}: peak {usage.peak_per_swap:.0f} B/swap exceeds "
+        f"budget {peak_budget:.0f} B/swap at {usage.swaps} swaps"
+    )
+    assert usage.retained_per_swap <= retained_budget, (
+        f"{name}: retained {usage.retained_per_swap:.0f} B/swap exceeds "
+        f"budget {retained_budget:.0f} B/swap at {usage.swaps} swaps"
+    )
+
+
+@pytest.fixture(params=SIZES, ids=lambda n: f"{n}swaps")
+def n_swaps(request) -> int:
+    return request.param
+
+
+@pytest.fixture
+def measure() -> Callable[[Callable[[], object], int], tuple[object, MemoryUsage]]:
+    return measure_memory
+
+
+@pytest.fixture
+def check_budget() -> Callable[[str, MemoryUsage, float, float], None]:
+    return assert_within_budget
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from lobster_assessment.application.algo import ActivityTracker, FeeCalculator
+from lobster_assessment.application.core import (
+    BacktestRunner,
+    MultiPositionBacktestRunner,
+)
+from lobster_assessment.application.math import tick_to_sqrt_price
+from lobster_assessment.application.rebalancing import OutOfRangeRebalancer
+from lobster_assessment.domain.models import Pool, Position, Swap, SwapSeries
+
+POOL = Pool(address="0xPool", token0="ETH", token1="USDC", fee=Decimal("0.003"))
+
+
+def make_position() -> Position:
+    return Position(
+        tick_lower=1000,
+        tick_upper=2000,
+        amount0=Decimal("10"),
+        amount1=Decimal("20000"),
+        pool=POOL,
+    )
+
+
+def raw_swaps(n: int) -> list[dict]:
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(n):
+        tick = 1500 + (i * 37) % 1200 - 600
+        rows.append(
+            {
+                "tick": tick,
+                "volume_token0": Decimal("1.25") + i,
+                "volume_token1": Decimal("2500.5") + i,
+                "liquidity": Decimal("100000"),
+                "sqrt_price_x96": tick_to_sqrt_price(tick),
+                "timestamp": start + timedelta(minutes=i),
+            }
+        )
+    return rows
+
+
+def make_swaps(n: int) -> list[Swap]:
+    return [Swap(**row) for row in raw_swaps(n)]
+
+
+def make_runner(swaps: list[Swap]) -> BacktestRunner:
+    position = make_position()
+    return BacktestRunner(
+        position=position,
+        swaps=swaps,
+        tracker=ActivityTracker(position=position),
+        calculator=FeeCalculator(position=position),
+        rebalancer=OutOfRangeRebalancer(),
+        rebalance_bias=0.5,
+    )
+
+
+def test_swap_series_memory(n_swaps, measure, check_budget):
+    rows = raw_swaps(n_swaps)
+
+    _, usage = measure(lambda: SwapSeries(swaps=[Swap(**row) for row in rows]), n_swaps)
+
+    check_budget("swap_series", usage, peak=1_600, retained=1_600)
+
+
+def test_backtest_run_memory(n_swaps, measure, check_budget):
+    runner = make_runner(make_swaps(n_swaps))
+
+    _, usage = measure(runner.run, n_swaps)
+
+    check_budget("backtest_run", usage, peak=1_500, retained=1_200)
+
+
+def test_multi_position_run_memory(n_swaps, measure, check_budget):
+    n_positions = 4
+    swaps = make_swaps(n_swaps)
+    positions = [make_position() for _ in range(n_positions)]
+
+    def run():
+        runner = MultiPositionBacktestRunner(
+            positions=positions,
+            swap_series_list=[swaps] * n_positions,
+            trackers=[],
+            calculators=[],
+            rebalancers=[OutOfRangeRebalancer() for _ in positions],
+            rebalance_bias=0.5,
+        )
+        return runner, runner.run()
+
+    _, usage = measure(run, n_swaps * n_positions)
+
+    check_budget("multi_position_run", usage, peak=1_300, retained=1_200)
@@ -0,0 +1,55 @@
+import pytest
+
+from lobster_assessment import db
+from lobster_assessment.config import Config
+
+
+@pytest.fixture
+def sqlite_config(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'test.sqlite'}"
+    monkeypatch.setattr(Config, "sqlalchemy_url", classmethod(lambda cls: url))
+    monkeypatch.setattr(Config, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(Config, "DB_POOL_RECYCLE", 60)
+    db.dispose_engine()
+    yield
+    db.dispose_engine()
+
+
+def test_engine_is_lazy_and_shared(sqlite_config):
+    assert db._engine is None
+
+    engine = db.get_engine()
+
+    assert db.get_engine() is engine
+    assert db.engine is engine
+    assert engine.pool.size() == 3
+    assert engine.pool._recycle == 60
+
+
+def test_warm_up_fills_the_pool(sqlite_config):
+    assert db.warm_up(0) == 0
+    assert db.warm_up(10) == 3
+    assert db.get_engine().pool.checkedin() == 3
+
+    with db.SessionLocal() as session:
+        assert session.get_bind() is db.get_engine()
+
+
+def test_reset_after_fork_replaces_the_pool(sqlite_config):
+    engine = db.get_engine()
+    db.warm_up(2)
+    pool = engine.pool
+
+    db._reset_after_fork()
+
+    assert db.get_engine() is engine
+    assert engine.pool is not pool
+    assert engine.pool.checkedin() == 0
+
+
+def test_config_reads_environment_on_access(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "12")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "off")
+
+    assert Config.DB_POOL_SIZE == 12
+    assert Config.DB_POOL_PRE_PING is False
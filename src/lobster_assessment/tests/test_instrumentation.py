@@ -0,0 +1,92 @@
+import io
+import json
+
+import pytest
+import sqlalchemy as sa
+
+from lobster_assessment.instrumentation import (
+    JsonLinesSink,
+    QueryRecorder,
+    instrument_engine,
+    instrumented_query,
+    phase,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'swaps.sqlite'}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE swaps (pool TEXT, tick INTEGER)")
+        connection.exec_driver_sql(
+            "INSERT INTO swaps VALUES " + ", ".join(f"('0xa', {i})" for i in range(50))
+        )
+    return engine
+
+
+def test_records_server_decode_and_volume_per_query(engine):
+    stream = io.StringIO()
+    recorder = QueryRecorder(sinks=[JsonLinesSink(stream)], explain_threshold=0.0)
+    instrument_engine(engine, recorder)
+    instrument_engine(engine, recorder)
+
+    with instrumented_query(
+        "ticks", "0xA", "2024-01-01", "2024-01-02", recorder
+    ) as record:
+        with engine.connect() as connection:
+            with phase("decode"):
+                rows = connection.exec_driver_sql("SELECT tick FROM swaps").fetchall()
+        record.rows = len(rows)
+        record.bytes = 8 * len(rows)
+
+    [record] = recorder.records
+    assert record.pool == "0xa"
+    assert record.rows == 50
+    assert record.statements == ["SELECT tick FROM swaps"]
+    assert record.server_seconds > 0
+    assert record.decode_seconds >= 0
+    assert record.total_seconds >= record.server_seconds + record.decode_seconds
+    assert "SCAN" in record.explain[0]
+    assert json.loads(stream.getvalue())["name"] == "ticks"
+
+    histogram = recorder.histogram(pool="0xA")
+    assert histogram.queries == 1
+    assert histogram.rows == 50
+    assert histogram.quantile(0.5) > 0
+
+
+def test_errors_and_standalone_statements(engine):
+    recorder = QueryRecorder()
+    instrument_engine(engine, recorder)
+
+    with pytest.raises(sa.exc.OperationalError):
+        with instrumented_query("broken", "0xa", target=recorder):
+            with engine.connect() as connection:
+                connection.exec_driver_sql("SELECT * FROM missing")
+
+    with engine.connect() as connection:
+        connection.exec_driver_sql("SELECT count(*) FROM swaps").fetchall()
+
+    broken, standalone = recorder.records
+    assert "no such table" in broken.error
+    assert not broken.timed_out
+    assert standalone.name == "statement"
+    assert recorder.histogram(pool="0xa").errors == 1
+
+
+def test_explain_runs_after_the_statement_outside_its_transaction(engine):
+    recorder = QueryRecorder(explain_threshold=0.0)
+    instrument_engine(engine, recorder)
+
+    with instrumented_query("write", "0xa", target=recorder) as record:
+        with engine.connect() as connection:
+            connection.exec_driver_sql("INSERT INTO swaps VALUES ('0xb', 1)")
+            connection.exec_driver_sql("SELECT tick FROM swaps").fetchall()
+            assert record.explain == []
+            assert connection.in_transaction()
+            connection.rollback()
+
+    assert "SCAN" in record.explain[0]
+    with engine.connect() as connection:
+        count = connection.exec_driver_sql("SELECT count(*) FROM swaps").scalar()
+    assert count == 50
@@ -1,15 +1,22 @@
 from decimal import Decimal
 
+import numpy as np
 import pytest
 
 from lobster_assessment.application.math import (
+    Precision,
     compute_liquidity_from_amounts,
+    compute_liquidity_from_amounts_array,
     compute_token0_amount,
     compute_token1_amount,
     compute_token_amounts_from_liquidity,
+    compute_token_amounts_from_liquidity_array,
     compute_token_native_apr,
+    compute_token_native_apr_array,
     compute_usd_apr,
+    compute_usd_apr_array,
     tick_to_sqrt_price,
+    tick_to_sqrt_price_array,
 )
 
 
@@ -185,3 +192,107 @@ def test_compute_token_native_apr_manual():
     )
 
     assert result == pytest.approx(expected_apr, 8)
+
+
+TICKS = np.array([-100_000, -887, 0, 1, 1500, 60_000])
+LOWERS = np.array([-600, 0, 1000, 1980])
+UPPERS = np.array([600, 60, 2000, 2040])
+AMOUNTS0 = [Decimal("0"), Decimal("1"), Decimal("10"), Decimal("0.5")]
+AMOUNTS1 = [Decimal("2000"), Decimal("0"), Decimal("20000"), Decimal("7.25")]
+
+
+@pytest.mark.parametrize(
+    "precision, rtol",
+    [(Precision.DECIMAL, 0), (Precision.FLOAT64, 1e-12), ("float32", 1e-4)],
+)
+def test_array_functions_agree_with_scalars(precision, rtol):
+    def check(actual, expected):
+        actual = np.asarray(actual)
+        expected = np.asarray(expected, dtype=object)
+        if precision is Precision.DECIMAL:
+            assert actual.tolist() == expected.tolist()
+        else:
+            np.testing.assert_allclose(
+                actual.astype(np.float64), expected.astype(np.float64), rtol=rtol
+            )
+
+    check(
+        tick_to_sqrt_price_array(TICKS, precision),
+        [tick_to_sqrt_price(int(t)) for t in TICKS],
+    )
+
+    amounts0 = (
+        AMOUNTS0 if precision is Precision.DECIMAL else [float(a) for a in AMOUNTS0]
+    )
+    amounts1 = (
+        AMOUNTS1 if precision is Precision.DECIMAL else [float(a) for a in AMOUNTS1]
+    )
+    liquidity = [
+        compute_liquidity_from_amounts(int(lo), int(hi), a0, a1)
+        for lo, hi, a0, a1 in zip(LOWERS, UPPERS, AMOUNTS0, AMOUNTS1)
+    ]
+    check(
+        compute_liquidity_from_amounts_array(
+            LOWERS, UPPERS, np.array(amounts0), np.array(amounts1), precision
+        ),
+        liquidity,
+    )
+
+    amounts = [
+        compute_token_amounts_from_liquidity(Decimal(500), int(lo), int(hi))
+        for lo, hi in zip(LOWERS, UPPERS)
+    ]
+    amount0, amount1 = compute_token_amounts_from_liquidity_array(
+        500, LOWERS, UPPERS, precision
+    )
+    check(amount0, [a for a, _ in amounts])
+    check(amount1, [b for _, b in amounts])
+
+    starts = [Decimal("100"), Decimal("0"), Decimal("2.5"), Decimal("100")]
+    ends = [Decimal("110"), Decimal("5"), Decimal("2"), Decimal("90")]
+    days = [365, 30, 7, 0]
+    check(
+        compute_token_native_apr_array(
+            np.array(starts, dtype=object),
+            np.array(ends, dtype=object),
+            days,
+            precision,
+        ),
+        [compute_token_native_apr(s, e, d) for s, e, d in zip(starts, ends, days)],
+    )
+
+    prices = [Decimal("2000"), Decimal("2100"), Decimal("1"), Decimal("1.1")]
+    check(
+        compute_usd_apr_array(
+            np.array(starts, dtype=object),
+            np.array(ends, dtype=object),
+            np.array(ends, dtype=object),
+            np.array(starts, dtype=object),
+            *prices,
+            np.array(days),
+            precision=precision,
+        ),
+        [
+            compute_usd_apr(s, e, e, s, *prices, d)
+            for s, e, d in zip(starts, ends, days)
+        ],
+    )
+
+
+def test_array_functions_broadcast():
+    liquidity = compute_liquidity_from_amounts_array(
+        LOWERS[:, None], UPPERS[:, None], np.array([1.0, 2.0, 4.0]), 1e9
+    )
+    assert liquidity.shape == (4, 3)
+    np.testing.assert_allclose(liquidity[:, 1], 2 * liquidity[:, 0])
+
+    amount0, amount1 = compute_token_amounts_from_liquidity_array(
+        np.array([[1.0], [2.0]]), LOWERS, UPPERS, precision=Precision.DECIMAL
+    )
+    assert amount0.shape == amount1.shape == (2, 4)
+    assert amount0.dtype == object and isinstance(amount0[0, 0], Decimal)
+
+
+def test_array_liquidity_rejects_invalid_ranges():
+    with pytest.raises(ValueError):
+        compute_liquidity_from_amounts_array(LOWERS, LOWERS, 1.0, 1.0)
@@ -0,0 +1,78 @@
+import struct
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from lobster_assessment.pgcopy import (
+    PGCOPY_SIGNATURE,
+    BinaryCopyParser,
+    parse_binary_copy,
+    read_binary_copy_file,
+    swap_arrays_from_columns,
+)
+
+ROWS = [
+    (100, -5, 1.5, 2000.0, 1e6, 7.9e28, 691_200_000_000),
+    (101, 12, 0.25, 10.0, 2e6, 8.1e28, 691_200_060_000),
+    (102, 7, 3.0, 0.5, 3e6, 8.0e28, 691_200_120_000),
+]
+
+
+def encode_copy(rows, null_at=None) -> bytes:
+    out = bytearray(PGCOPY_SIGNATURE + struct.pack(">ii", 0, 0))
+    for r, row in enumerate(rows):
+        out += struct.pack(">h", len(row))
+        for c, value in enumerate(row):
+            if (r, c) == null_at:
+                out += struct.pack(">i", -1)
+            elif isinstance(value, float):
+                out += struct.pack(">id", 8, value)
+            else:
+                out += struct.pack(">iq", 8, value)
+    out += struct.pack(">h", -1)
+    return bytes(out)
+
+
+def test_parse_binary_copy_columns():
+    columns = parse_binary_copy(encode_copy(ROWS))
+    assert columns["block_number"].tolist() == [100, 101, 102]
+    assert columns["tick"].tolist() == [-5, 12, 7]
+    assert columns["sqrt_price_x96"].tolist() == [7.9e28, 8.1e28, 8.0e28]
+    assert columns["tick"].dtype == np.int64
+
+
+def test_parser_handles_arbitrary_chunk_boundaries():
+    data = encode_copy(ROWS)
+    parser = BinaryCopyParser()
+    for i in range(0, len(data), 7):
+        parser.feed(data[i : i + 7])
+    columns = parser.finish()
+    assert columns["volume_token1"].tolist() == [2000.0, 10.0, 0.5]
+
+
+def test_timestamps_are_decoded_from_postgres_epoch():
+    swaps = swap_arrays_from_columns(parse_binary_copy(encode_copy(ROWS)))
+    assert swaps.timestamps[0] == np.datetime64(datetime(2000, 1, 9))
+    assert len(swaps) == 3
+
+
+def test_null_values_are_rejected():
+    with pytest.raises(ValueError, match="NULL"):
+        parse_binary_copy(encode_copy(ROWS, null_at=(1, 2)))
+
+
+def test_truncated_stream_is_rejected():
+    with pytest.raises(ValueError):
+        parse_binary_copy(encode_copy(ROWS)[:-10])
+
+
+def test_empty_stream():
+    assert len(parse_binary_copy(encode_copy([]))["tick"]) == 0
+
+
+def test_read_binary_copy_file(tmp_path):
+    path = tmp_path / "swaps.bin"
+    path.write_bytes(encode_copy(ROWS))
+    swaps = read_binary_copy_file(str(path), chunk_bytes=16)
+    assert swaps.ticks.tolist() == [-5, 12, 7]
@@ -0,0 +1,182 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from lobster_assessment.application.math import tick_to_sqrt_price
+from lobster_assessment.service import (
+    BacktestRequest,
+    BacktestService,
+    ServiceBusy,
+    make_server,
+)
+from lobster_assessment.sources import InMemorySwapSource, SwapQuery
+
+POOL = {"address": "0xPool", "token0": "ETH", "token1": "USDC", "fee": "0.003"}
+
+
+class CountingSource(InMemorySwapSource):
+    def __init__(self, frame):
+        super().__init__(frame)
+        self.calls = 0
+
+    def iter_chunks(self, query):
+        self.calls += 1
+        return super().iter_chunks(query)
+
+
+@pytest.fixture
+def source() -> CountingSource:
+    start = datetime(2024, 1, 1)
+    ticks = [950, 1500, 2100, 1800, 1200]
+    return CountingSource(
+        pd.DataFrame(
+            {
+                "pool_address": "0xpool",
+                "block_number": range(len(ticks)),
+                "event_index": 0,
+                "tick": ticks,
+                "volume_token0": ["100"] * len(ticks),
+                "volume_token1": ["200"] * len(ticks),
+                "liquidity": ["10000"] * len(ticks),
+                "sqrt_price_x96": [str(tick_to_sqrt_price(t)) for t in ticks],
+                "timestamp": [start + timedelta(hours=i) for i in range(len(ticks))],
+            }
+        )
+    )
+
+
+def backtest_payload(**overrides) -> dict:
+    payload = {
+        "pool": POOL,
+        "position": {
+            "tick_lower": 1000,
+            "tick_upper": 2000,
+            "amount0": "10",
+            "amount1": "20000",
+            "rebalancer": {"kind": "out_of_range"},
+        },
+    }
+    return payload | overrides
+
+
+@pytest.fixture
+def server(source):
+    server = make_server(BacktestService(source), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def post(url: str, payload: dict) -> tuple[int, dict]:
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_backtest_and_sweep_reuse_loaded_series(server, source):
+    status, first = post(f"{server}/backtest", backtest_payload())
+    assert status == 200
+    assert first["swaps"] == 5
+    assert Decimal(first["result"]["total_fees_token0"]) > 0
+
+    status, sweep = post(
+        f"{server}/sweep",
+        {
+            "pool": POOL,
+            "positions": [
+                backtest_payload()["position"],
+                {"tick_lower": 900, "tick_upper": 2200, "amount0": 1, "amount1": 2},
+            ],
+        },
+    )
+    assert status == 200
+    assert sweep["results"][0] == first["result"]
+    assert len(sweep["results"]) == 2
+    assert source.calls == 1
+
+    with urllib.request.urlopen(f"{server}/stats") as response:
+        assert json.loads(response.read())["hits"] == 1
+
+
+def test_invalid_requests_are_rejected(server):
+    status, body = post(f"{server}/backtest", {"pool": POOL})
+    assert status == 400
+
+    status, body = post(
+        f"{server}/backtest", backtest_payload(start="2030-01-01T00:00:00")
+    )
+    assert status == 400
+    assert "No swaps" in body["error"]
+
+
+def test_series_cache_evicts_least_recently_used(source):
+    service = BacktestService(source, max_series=2)
+    queries = [SwapQuery(pool_address="0xpool", end_block=i) for i in range(3)]
+    for q in queries:
+        service.series.get(q)
+    service.series.get(queries[2])
+    service.series.get(queries[0])
+
+    assert len(service.series) == 2
+    assert source.calls == 4
+
+
+def test_concurrency_limit(source):
+    service = BacktestService(source, max_concurrent=1, queue_timeout=0.01)
+    with service._slot():
+        with pytest.raises(ServiceBusy):
+            service.backtest(BacktestRequest.model_validate(backtest_payload()))
+
+
+def test_series_cache_loads_concurrent_requests_once(source):
+    release = threading.Event()
+    load = source.iter_chunks
+
+    def slow_chunks(query):
+        release.wait(5)
+        return load(query)
+
+    source.iter_chunks = slow_chunks
+    service = BacktestService(source)
+    query = SwapQuery(pool_address="0xpool")
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(service.series.get(query)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert source.calls == 1
+    assert service.series.loads == 1
+    assert all(r is results[0] for r in results)
+    assert not service.series._loading
+
+
+def test_series_cache_retries_after_failed_load(source):
+    load = source.iter_chunks
+    source.iter_chunks = lambda query: iter([pd.DataFrame({"tick": ["bad"]})])
+    service = BacktestService(source)
+    query = SwapQuery(pool_address="0xpool")
+    with pytest.raises(KeyError):
+        service.series.get(query)
+    assert not service.series._loading
+
+    source.iter_chunks = load
+    assert len(service.series.get(query)) == 5
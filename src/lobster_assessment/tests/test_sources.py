@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+from lobster_assessment.sources import (
+    SWAP_COLUMNS,
+    InMemorySwapSource,
+    ParquetSwapSource,
+    SQLiteSwapSource,
+    SwapQuery,
+    swap_arrays_from_frame,
+)
+
+POOL = "0xAbC"
+
+
+@pytest.fixture
+def swap_frame() -> pd.DataFrame:
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(25):
+        rows.append(
+            {
+                "pool_address": POOL if i % 5 else "0xother",
+                "block_number": 1000 + i,
+                "event_index": 0,
+                "tick": 1500 + i,
+                "volume_token0": f"{i}.5",
+                "volume_token1": f"{i * 10}",
+                "liquidity": "100000",
+                "sqrt_price_x96": "79228162514264337593543950336",
+                "timestamp": start + timedelta(hours=i),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def sqlite_source(tmp_path, swap_frame) -> SQLiteSwapSource:
+    path = tmp_path / "swaps.sqlite"
+    engine = sa.create_engine(f"sqlite:///{path}")
+    swap_frame.drop(columns=["timestamp"]).to_sql(
+        "uniswap_v3_swap_42161", engine, index=False
+    )
+    blocks = swap_frame[["block_number", "timestamp"]].rename(
+        columns={"timestamp": "block_date"}
+    )
+    blocks.to_sql("blocks_42161", engine, index=False)
+    return SQLiteSwapSource(path)
+
+
+@pytest.fixture
+def parquet_source(tmp_path, swap_frame) -> ParquetSwapSource:
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "swaps.parquet"
+    ParquetSwapSource.write(swap_frame, path)
+    return ParquetSwapSource(path)
+
+
+@pytest.fixture(params=["memory", "sqlite", "parquet"])
+def source(request, swap_frame):
+    if request.param == "memory":
+        return InMemorySwapSource(swap_frame)
+    return request.getfixturevalue(f"{request.param}_source")
+
+
+def test_filters_pool_and_ranges(source):
+    query = SwapQuery(
+        pool_address=POOL.lower(),
+        start=datetime(2024, 1, 1, 2),
+        end=datetime(2024, 1, 1, 20),
+        end_block=1015,
+    )
+    frame = source.fetch(query)
+    assert list(frame.columns) == SWAP_COLUMNS
+    assert frame["block_number"].tolist() == [
+        1002, 1003, 1004, 1006, 1007, 1008, 1009, 1011, 1012, 1013, 1014
+    ]  # fmt: skip
+
+
+def test_chunks_respect_batch_size_and_projection(source):
+    query = SwapQuery(pool_address=POOL, columns=["tick", "timestamp"], batch_size=6)
+    chunks = list(source.iter_chunks(query))
+
+    assert [len(c) for c in chunks] == [6, 6, 6, 2]
+    assert all(list(c.columns) == ["tick", "timestamp"] for c in chunks)
+
+
+def test_swaps_from_source(source):
+    swaps = source.swaps(SwapQuery(pool_address=POOL, start_block=1001, end_block=1002))
+    assert [s.tick for s in swaps] == [1501, 1502]
+    assert str(swaps[0].volume_token0) == "1.5"
+    assert swaps[1].timestamp == datetime(2024, 1, 1, 2)
+
+
+def test_swap_arrays_from_frame(swap_frame):
+    arrays = swap_arrays_from_frame(swap_frame)
+    assert len(arrays) == 25
+    assert arrays.volume_token0[1] == 1.5
+
+
+def test_unknown_columns_are_rejected():
+    with pytest.raises(ValueError):
+        SwapQuery(pool_address=POOL, columns=["nope"]).selected_columns
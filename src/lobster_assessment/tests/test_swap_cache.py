@@ -0,0 +1,164 @@
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from lobster_assessment import analytics
+from lobster_assessment.sources import InMemorySwapSource
+from lobster_assessment.swap_cache import SwapRangeCache
+
+POOL = "0xAbC"
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "block_number": [b for b in range(100, 200) for _ in range(2)],
+            "event_index": [0, 1] * 100,
+            "tick": range(200),
+        }
+    )
+
+
+@pytest.fixture
+def calls() -> list:
+    return []
+
+
+@pytest.fixture
+def cache(frame, calls) -> SwapRangeCache:
+    def fetch(pool_address, start_block, end_block):
+        calls.append((start_block, end_block))
+        blocks = frame["block_number"]
+        return frame[(blocks >= start_block) & (blocks < end_block)]
+
+    return SwapRangeCache(fetch)
+
+
+def expected(frame, start, end):
+    blocks = frame["block_number"]
+    return frame[(blocks >= start) & (blocks < end)].reset_index(drop=True)
+
+
+def test_overlapping_requests_fetch_only_the_gaps(cache, frame, calls):
+    pd.testing.assert_frame_equal(cache.get(POOL, 110, 120), expected(frame, 110, 120))
+    pd.testing.assert_frame_equal(cache.get(POOL, 115, 130), expected(frame, 115, 130))
+    pd.testing.assert_frame_equal(cache.get(POOL, 140, 150), expected(frame, 140, 150))
+    pd.testing.assert_frame_equal(cache.get(POOL, 105, 160), expected(frame, 105, 160))
+    assert calls == [
+        (110, 120),
+        (120, 130),
+        (140, 150),
+        (105, 110),
+        (130, 140),
+        (150, 160),
+    ]
+    assert cache.coverage(POOL) == [(105, 160)]
+
+    pd.testing.assert_frame_equal(cache.get(POOL, 120, 121), expected(frame, 120, 121))
+    assert len(calls) == 6
+    assert cache.stats.full_hits == 1
+    assert cache.stats.gap_queries == 6
+
+
+def test_adjacent_segments_merge_and_pools_are_separate(cache, calls):
+    cache.get(POOL, 100, 110)
+    cache.get(POOL.upper(), 110, 120)
+    cache.get("0xother", 100, 120)
+    assert cache.coverage(POOL) == [(100, 120)]
+    assert cache.coverage("0xother") == [(100, 120)]
+    assert len(calls) == 3
+
+
+def test_least_recently_used_segments_are_evicted(cache, calls):
+    cache.get(POOL, 100, 110)
+    one_segment = cache.nbytes
+    cache.max_bytes = 2 * one_segment
+    cache.get(POOL, 150, 160)
+    cache.get(POOL, 100, 110)
+    cache.get(POOL, 180, 190)
+
+    assert cache.coverage(POOL) == [(100, 110), (180, 190)]
+    assert cache.stats.evictions == 1
+    assert cache.nbytes <= cache.max_bytes
+
+
+def test_from_source_uses_inclusive_block_queries(frame):
+    source = InMemorySwapSource(
+        frame.assign(
+            pool_address=POOL,
+            volume_token0="1",
+            volume_token1="1",
+            liquidity="1",
+            sqrt_price_x96="1",
+            timestamp=pd.Timestamp("2024-01-01"),
+        )
+    )
+    cache = SwapRangeCache.from_source(source, columns=["block_number", "tick"])
+    result = cache.get(POOL, 120, 125)
+    assert result["block_number"].tolist() == [
+        b for b in range(120, 125) for _ in (0, 1)
+    ]
+    assert list(result.columns) == ["block_number", "tick"]
+
+
+def test_empty_ranges_are_rejected(cache):
+    with pytest.raises(ValueError):
+        cache.get(POOL, 120, 120)
+
+
+def test_fetches_do_not_block_other_pools(frame):
+    started, release = threading.Event(), threading.Event()
+
+    def fetch(pool_address, start_block, end_block):
+        if pool_address == "0xslow":
+            started.set()
+            assert release.wait(5)
+        return expected(frame, start_block, end_block)
+
+    cache = SwapRangeCache(fetch)
+    slow = threading.Thread(target=cache.get, args=("0xslow", 100, 150))
+    slow.start()
+    assert started.wait(5)
+    try:
+        pd.testing.assert_frame_equal(
+            cache.get(POOL, 120, 130), expected(frame, 120, 130)
+        )
+        assert cache.coverage("0xslow") == []
+    finally:
+        release.set()
+        slow.join()
+    assert cache.coverage("0xslow") == [(100, 150)]
+
+
+def test_full_hits_on_past_dates_issue_no_query(cache, calls, monkeypatch):
+    queries = []
+
+    class Connection:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def exec_driver_sql(self, query, params):
+            queries.append(params)
+            return type("Result", (), {"one": lambda self: (120, 149)})()
+
+    class Engine:
+        def connect(self):
+            return Connection()
+
+    monkeypatch.setattr(analytics, "get_engine", Engine)
+    monkeypatch.setattr(analytics, "_settled_block_ranges", {})
+    today = date.today().isoformat()
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+
+    for _ in range(3):
+        analytics.fetch_swaps_cached(cache, POOL, "2024-01-01", yesterday)
+        analytics.fetch_swaps_cached(cache, POOL, "2024-01-01", today)
+
+    assert queries == [("2024-01-01", yesterday)] + [("2024-01-01", today)] * 3
+    assert calls == [(120, 150)]
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from lobster_assessment.application.algo import (
+    ActivityTracker,
+    Fee,
+    FeeCalculator,
+)
+from lobster_assessment.application.core import BacktestRunner
+from lobster_assessment.application.rebalancing import OutOfRangeRebalancer
+from lobster_assessment.domain.validation import (
+    ValidationMode,
+    construct,
+    current_mode,
+    validated_call,
+    validation_mode,
+)
+from lobster_assessment.sources import check_swap_frame, swaps_from_frame
+
+
+def swap_frame(rows: int = 3) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "tick": [150 + 10 * i for i in range(rows)],
+            "volume_token0": ["1.5", 2.25, "0.000001"][:rows],
+            "volume_token1": [3000, "4500.5", "0.002"][:rows],
+            "liquidity": ["100000"] * rows,
+            "sqrt_price_x96": ["1.0075", 1.008, "1.0085"][:rows],
+            "timestamp": [
+                datetime(2024, 1, 1) + timedelta(hours=i) for i in range(rows)
+            ],
+        }
+    )
+
+
+def test_strict_is_the_default_and_restored():
+    assert current_mode() is ValidationMode.STRICT
+    with validation_mode("trusted") as mode:
+        assert mode is ValidationMode.TRUSTED
+        assert current_mode() is ValidationMode.TRUSTED
+    assert current_mode() is ValidationMode.STRICT
+
+
+def test_construct_skips_validation_only_when_trusted():
+    with pytest.raises(ValidationError):
+        construct(Fee, token0="not a number", token1=Decimal(1))
+    with validation_mode(ValidationMode.TRUSTED):
+        fee = construct(Fee, token0=Decimal(1), token1=Decimal(2))
+        unchecked = construct(Fee, token0="not a number", token1=Decimal(1))
+    assert fee == Fee(token0=Decimal(1), token1=Decimal(2))
+    assert fee.model_fields_set == {"token0", "token1"}
+    assert unchecked.token0 == "not a number"
+
+
+def test_validated_call_can_be_turned_off():
+    @validated_call
+    def double(value: int) -> int:
+        return value * 2
+
+    assert double("2") == 4
+    with validation_mode(ValidationMode.TRUSTED):
+        assert double("2") == "22"
+
+
+def test_trusted_decoding_matches_strict():
+    frame = swap_frame()
+    strict = swaps_from_frame(frame)
+    with validation_mode(ValidationMode.TRUSTED):
+        trusted = swaps_from_frame(frame)
+    assert trusted == strict
+    assert [s.model_dump() for s in trusted] == [s.model_dump() for s in strict]
+
+
+@pytest.mark.parametrize(
+    "column, value",
+    [
+        ("tick", 1.5),
+        ("tick", None),
+        ("volume_token0", "abc"),
+        ("liquidity", "-1"),
+        ("sqrt_price_x96", 0),
+        ("timestamp", "not a date"),
+    ],
+)
+def test_both_modes_reject_invalid_rows(column, value):
+    frame = swap_frame()
+    frame[column] = frame[column].astype(object)
+    frame.loc[1, column] = value
+    with pytest.raises(ValueError, match=column):
+        swaps_from_frame(frame)
+    with pytest.raises(ValueError, match=f"'{column}'.*row 1"):
+        check_swap_frame(frame)
+    with validation_mode(ValidationMode.TRUSTED):
+        with pytest.raises(ValueError, match=f"'{column}'.*row 1"):
+            swaps_from_frame(frame)
+
+
+def test_batch_check_requires_columns():
+    with pytest.raises(ValueError, match="liquidity"):
+        check_swap_frame(swap_frame().drop(columns="liquidity"))
+
+
+def test_trusted_backtest_matches_strict(basic_position, swap_series):
+    def run():
+        runner = BacktestRunner(
+            position=basic_position,
+            swaps=swap_series.swaps,
+            tracker=ActivityTracker(position=basic_position),
+            calculator=FeeCalculator(position=basic_position),
+            rebalancer=OutOfRangeRebalancer(),
+            rebalance_bias=0.5,
+        )
+        return runner.run(), runner
+
+    strict, strict_runner = run()
+    with validation_mode(ValidationMode.TRUSTED):
+        trusted, trusted_runner = run()
+    assert trusted == strict
+    assert trusted_runner.fee_series == strict_runner.fee_series
+    assert trusted_runner.activity_series == strict_runner.activity_series